@@ -0,0 +1,94 @@
+"""
+This module will benchmark the per-field CSS extraction (get_table_item)
+against the compiled single-pass extraction plans.
+
+Run it from the project directory:
+    python -m benchmarks.bench_row_extraction --rows 2000 --repeat 5
+"""
+
+import argparse
+import time
+
+from parsel import Selector
+
+from benchmarks.synthetic import build_table
+from pro_football_reference.utils.pfr_base import ProFootballReferenceBase
+from pro_football_reference.utils.pfr_row_extractor import compile_plan
+from pro_football_reference.utils.pfr_table_config import (
+    GAME_RESULTS_CONFIG,
+    PLAYER_PUNT_AND_KICK_RETURNER_CONFIG,
+    TEAM_STATS_AND_RANKINGS_CONFIG,
+)
+
+
+def legacy_extract(table, stats_config) -> dict:
+    return {
+        config.attr: ProFootballReferenceBase.get_table_item(
+            table=table,
+            data_stat=config.stat,
+            table_part=config.table_part,
+            index=config.index,
+        )
+        for config in stats_config
+    }
+
+
+def run_case(name, table_id, stats_config, rows, repeat, whole_table) -> None:
+    """
+    This method will time both extraction paths. Row tables are extracted
+    row by row, indexed team tables (2 rows each) are extracted as a whole.
+    """
+    table_rows = 2 if whole_table else rows
+    selector = Selector(text=build_table(table_id, stats_config, table_rows))
+    table = selector.css(f"#{table_id} > tbody > tr")
+    plan = compile_plan(stats_config)
+    units = [table] * (rows // 2) if whole_table else list(table)
+
+    results = {}
+    for label, extract in (
+        ("css", lambda unit: legacy_extract(unit, stats_config)),
+        ("plan", plan.extract),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for unit in units:
+                extract(unit)
+            best = min(best, time.perf_counter() - start)
+        results[label] = len(units) * (2 if whole_table else 1) / best
+
+    assert legacy_extract(units[0], stats_config) == plan.extract(units[0])
+    print(
+        f"{name:<32} css: {results['css']:>10.0f} rows/s   "
+        f"plan: {results['plan']:>10.0f} rows/s   "
+        f"speedup: {results['plan'] / results['css']:.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run_case("game_results", "games", GAME_RESULTS_CONFIG, args.rows, args.repeat, False)
+    run_case(
+        "player_punt_and_kick_returner",
+        "returns",
+        PLAYER_PUNT_AND_KICK_RETURNER_CONFIG,
+        args.rows,
+        args.repeat,
+        False,
+    )
+    run_case(
+        "team_stats_and_rankings",
+        "team_stats",
+        TEAM_STATS_AND_RANKINGS_CONFIG,
+        args.rows,
+        args.repeat,
+        True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+This module will compare how TeamsPageSpider locates its tables: the old
+regex + second HtmlResponse approach against the comment-aware single-parse
+engine in utils/pfr_tables.py. It reports per-page parse time and peak
+memory (tracemalloc) for both, each from its own pass so the time is not
+slowed down by the tracing.
+
+Run it from the project directory:
+    python -m benchmarks.bench_table_engine --pages 20
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+
+from scrapy.http import HtmlResponse
+
+from benchmarks.synthetic import build_team_page
+from pro_football_reference.spiders.teams import TeamsPageSpider
+from pro_football_reference.utils.pfr_tables import find_tables, table_rows
+
+URL = "https://www.pro-football-reference.com/teams/buf/2023.htm"
+
+
+def legacy_locate(response) -> dict:
+    table_tags = re.findall(r"(<table.*?>.*?</table>)", response.text, flags=re.DOTALL)
+    cleaned_response = HtmlResponse(
+        url=response.url, body="".join(table_tags), encoding="utf-8"
+    )
+    return {
+        c["table_id"]: cleaned_response.css(f"#{c['table_id']} > tbody > tr")
+        for c in TeamsPageSpider.config
+    }
+
+
+def engine_locate(response) -> dict:
+    tables = find_tables(response, (c["table_id"] for c in TeamsPageSpider.config))
+    return {
+        c["table_id"]: table_rows(tables.get(c["table_id"]))
+        for c in TeamsPageSpider.config
+    }
+
+
+def count_rows(locate, response) -> dict:
+    return {table_id: len(table) for table_id, table in locate(response).items()}
+
+
+def measure(locate, body, pages) -> tuple[float, int, dict]:
+    """This method will return (seconds per page, peak bytes, rows per table)."""
+    elapsed = 0.0
+    for _ in range(pages):
+        response = HtmlResponse(url=URL, body=body, encoding="utf-8")
+        start = time.perf_counter()
+        rows = count_rows(locate, response)
+        elapsed += time.perf_counter() - start
+
+    peak = 0
+    for _ in range(pages):
+        response = HtmlResponse(url=URL, body=body, encoding="utf-8")
+        tracemalloc.start()
+        count_rows(locate, response)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed / pages, peak, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--player-rows", type=int, default=40)
+    args = parser.parse_args()
+
+    body = build_team_page(player_rows=args.player_rows).encode("utf-8")
+    print(f"page size: {len(body) / 1024:.0f} KiB")
+    results = {}
+    for label, locate in (("regex", legacy_locate), ("engine", engine_locate)):
+        seconds, peak, rows = measure(locate, body, args.pages)
+        results[label] = rows
+        print(
+            f"{label:<8} parse: {seconds * 1000:>8.2f} ms/page   "
+            f"peak memory: {peak / 1024:>8.0f} KiB"
+        )
+    assert results["regex"] == results["engine"], results
+
+
+if __name__ == "__main__":
+    main()
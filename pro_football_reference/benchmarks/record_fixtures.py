@@ -0,0 +1,40 @@
+"""
+This module will replace the benchmark fixtures with real pages recorded
+in the response archive (see RESPONSE_ARCHIVE_ENABLED):
+
+    python -m benchmarks.record_fixtures --archive .pfr_state/archive
+"""
+
+import argparse
+import os
+
+from benchmarks.synthetic import ERAS, FIXTURES_DIR
+from pro_football_reference.utils.pfr_archive import ResponseArchive
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--archive", default=".pfr_state/archive")
+    parser.add_argument("--team", default="buf")
+    args = parser.parse_args()
+
+    archive = ResponseArchive(args.archive)
+    wanted = {
+        ("game_results", season, None): f"games_{season}.html" for season in ERAS
+    } | {
+        ("teams_page", season, args.team): f"team_{args.team}_{season}.html"
+        for season in ERAS
+    }
+    for spider in ("game_results", "teams_page"):
+        for entry in archive.entries(spider, ERAS):
+            name = wanted.get((spider, entry["year"], entry["team"]))
+            if name is None:
+                continue
+            with open(os.path.join(FIXTURES_DIR, name), "wb") as f:
+                f.write(archive.get(entry["content_hash"]))
+            print(f"recorded {entry['url']} -> {name}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
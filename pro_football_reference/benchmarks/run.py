@@ -0,0 +1,284 @@
+"""
+This module is the offline parse benchmark suite. It runs against the
+checked-in era fixtures in benchmarks/fixtures and measures rows/s, items/s
+and peak memory (tracemalloc) for GameResultsSpider.parse,
+TeamsPageSpider.parse, get_table_item versus the compiled extraction plans
+and pipeline flushing (coercion + serialization, no upload).
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json --tolerance 0.15
+
+With --compare the run exits with status 1 when a case got slower or used
+more memory than the baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.utils.project import get_project_settings
+
+from benchmarks.synthetic import ERAS, FIXTURES_DIR
+from pro_football_reference.pipelines import GameResultsPipeline, TeamsPagePipeline
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from pro_football_reference.spiders.teams import TeamsPageSpider
+from pro_football_reference.utils.pfr_base import ProFootballReferenceBase
+from pro_football_reference.utils.pfr_table_config import (
+    PLAYER_CONFIG,
+    PLAYER_PUNT_AND_KICK_RETURNER_CONFIG,
+    TEAM_CONVERSIONS_CONFIG,
+    TEAM_STATS_AND_RANKINGS_CONFIG,
+)
+from pro_football_reference.utils.pfr_tables import find_tables, table_rows
+
+TEAMS_PER_SEASON = 32
+
+
+def load_fixture(name) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def make_response(url, body, meta) -> HtmlResponse:
+    return HtmlResponse(
+        url=url, body=body, encoding="utf-8", request=Request(url, meta=meta)
+    )
+
+
+def measure(fn, repeat) -> tuple[float, int, object]:
+    """This method will return (best seconds, peak traced bytes, result) of fn."""
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best, peak, result
+
+
+def record(name, fixture, seconds, peak, rows, items) -> dict:
+    return {
+        "name": name,
+        "fixture": fixture,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else None,
+        "items_per_sec": items / seconds if seconds else None,
+        "peak_bytes": peak,
+        "rows": rows,
+        "items": items,
+    }
+
+
+# the StatConfig lists the legacy path queried one by one
+LEGACY_STATS_CONFIG = {
+    "team_stats": TEAM_STATS_AND_RANKINGS_CONFIG,
+    "team_conversions": TEAM_CONVERSIONS_CONFIG,
+    "passing": PLAYER_CONFIG,
+    "rushing_and_receiving": PLAYER_CONFIG,
+    "returns": PLAYER_PUNT_AND_KICK_RETURNER_CONFIG,
+    "defense": PLAYER_CONFIG,
+    "kicking": PLAYER_CONFIG,
+    "punting": PLAYER_CONFIG,
+}
+
+
+def legacy_extract_page(tables) -> int:
+    """This method will extract every configured stat with one CSS query per stat."""
+    count = 0
+    for c in TeamsPageSpider.config:
+        table = table_rows(tables.get(c["table_id"]))
+        units = list(table) if "link_stat" in c else [table]
+        for unit in units:
+            for config in LEGACY_STATS_CONFIG[c["table_id"]]:
+                ProFootballReferenceBase.get_table_item(
+                    table=unit,
+                    data_stat=config.stat,
+                    table_part=config.table_part,
+                    index=config.index,
+                )
+            count += 1
+    return count
+
+
+def plan_extract_page(tables) -> int:
+    count = 0
+    for c in TeamsPageSpider.config:
+        table = table_rows(tables.get(c["table_id"]))
+        units = list(table) if "link_stat" in c else [table]
+        for unit in units:
+            c["plan"].extract(unit)
+            count += 1
+    return count
+
+
+def flush(pipeline, items) -> None:
+    """This method will run the CPU side of close_spider: buffer, coerce and serialize."""
+    for item in items:
+        pipeline.process_item(item, None)
+    for c in pipeline.config:
+        buffer = pipeline.buffers[c["path"]]
+        if not buffer:
+            continue
+        df = pipeline.prepare_dataframe(c, buffer.to_frame())
+        buffer.clear()
+        for partition, partition_df in pipeline.iter_partitions(c, df):
+            pipeline.serialize(
+                pipeline.object_frame(partition, partition_df),
+                pipeline.compression[c["path"]],
+            )
+
+
+def run_cases(repeat, output_formats) -> list[dict]:
+    results = []
+    settings = get_project_settings()
+    games_spider = GameResultsSpider()
+    teams_spider = TeamsPageSpider()
+    for season in ERAS:
+        games_fixture = f"games_{season}.html"
+        body = load_fixture(games_fixture)
+        url = f"https://www.pro-football-reference.com/years/{season}/games.htm"
+        meta = {"year": season}
+        seconds, peak, game_items = measure(
+            lambda: list(games_spider.parse(make_response(url, body, meta))), repeat
+        )
+        rows = len(make_response(url, body, {}).css("#games > tbody > tr"))
+        results.append(
+            record(
+                "game_results.parse", games_fixture, seconds, peak, rows, len(game_items)
+            )
+        )
+
+        team_fixture = f"team_buf_{season}.html"
+        body = load_fixture(team_fixture)
+        url = f"https://www.pro-football-reference.com/teams/buf/{season}.htm"
+        meta = {"year": season, "team": "buf"}
+        seconds, peak, team_items = measure(
+            lambda: list(teams_spider.parse(make_response(url, body, meta))), repeat
+        )
+        table_ids = [c["table_id"] for c in TeamsPageSpider.config]
+        tables = find_tables(make_response(url, body, meta), table_ids)
+        rows = sum(len(table_rows(table)) for table in tables.values())
+        results.append(
+            record("teams_page.parse", team_fixture, seconds, peak, rows, len(team_items))
+        )
+
+        for name, extract in (
+            ("get_table_item", legacy_extract_page),
+            ("extraction_plan", plan_extract_page),
+        ):
+            seconds, peak, items = measure(lambda: extract(tables), repeat)
+            results.append(record(name, team_fixture, seconds, peak, rows, items))
+
+        # a season's worth of team pages and the season's games
+        season_items = team_items * TEAMS_PER_SEASON
+        for output_format in output_formats:
+            settings.set("PIPELINE_OUTPUT_FORMAT", output_format)
+            for pipeline_cls, items, fixture in (
+                (TeamsPagePipeline, season_items, team_fixture),
+                (GameResultsPipeline, game_items, games_fixture),
+            ):
+                pipeline = pipeline_cls.from_settings(settings)
+                seconds, peak, _ = measure(lambda: flush(pipeline, items), repeat)
+                results.append(
+                    record(
+                        f"{pipeline_cls.__name__}.flush[{output_format}]",
+                        fixture,
+                        seconds,
+                        peak,
+                        len(items),
+                        len(items),
+                    )
+                )
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance) -> list[str]:
+    """This method will list the cases that regressed against a baseline run."""
+    previous = {(r["name"], r["fixture"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["fixture"]))
+        if old is None:
+            continue
+        if result["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{result['name']} [{result['fixture']}]: "
+                f"{old['seconds'] * 1000:.2f} ms -> {result['seconds'] * 1000:.2f} ms"
+            )
+        if result["peak_bytes"] > old["peak_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{result['name']} [{result['fixture']}]: peak "
+                f"{old['peak_bytes'] / 1024:.0f} KiB -> "
+                f"{result['peak_bytes'] / 1024:.0f} KiB"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument(
+        "--formats", default="ndjson,parquet", help="pipeline output formats to flush"
+    )
+    args = parser.parse_args()
+
+    results = run_cases(args.repeat, args.formats.split(","))
+    for r in results:
+        print(
+            f"{r['name']:<40} {r['fixture']:<20} "
+            f"{r['rows_per_sec'] or 0:>11.0f} rows/s "
+            f"{r['items_per_sec'] or 0:>11.0f} items/s "
+            f"{r['peak_bytes'] / 1024:>9.0f} KiB peak"
+        )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
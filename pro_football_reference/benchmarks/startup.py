@@ -0,0 +1,199 @@
+"""
+This module is the startup benchmark. It times fresh interpreter processes
+for the commands that only load the project (importing the settings and the
+pipelines, scrapy list) and for the imports that are deferred to the first
+flush, and lists the heavy libraries each command actually loaded and the
+slowest imports (python -X importtime).
+
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --compare startup.json --tolerance 0.15
+    python -m benchmarks.startup --image pro-football-reference
+
+With --image every command runs in a new container of that image (built
+from the Dockerfile), so the times include the container start. With
+--compare the run exits with status 1 when a command got slower than the
+baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# libraries the crawl only needs once it reads or writes a dataset
+HEAVY_MODULES = ("polars", "s3fs", "fsspec", "aiobotocore", "botocore", "dotenv")
+
+CASES = [
+    ("import settings", ["python", "-c", "import pro_football_reference.settings"]),
+    ("import pipelines", ["python", "-c", "import pro_football_reference.pipelines"]),
+    (
+        "import spiders",
+        [
+            "python",
+            "-c",
+            "from scrapy.spiderloader import SpiderLoader; "
+            "from scrapy.utils.project import get_project_settings; "
+            "SpiderLoader.from_settings(get_project_settings())",
+        ],
+    ),
+    ("scrapy list", ["scrapy", "list"]),
+    (
+        "first flush imports",
+        ["python", "-c", "import polars, s3fs, fsspec.asyn"],
+    ),
+]
+
+
+def container_command(command, image) -> list[str]:
+    """This method will run a command in a new container, or locally with this interpreter."""
+    if image is not None:
+        return ["docker", "run", "--rm", image, *command]
+    if command[0] == "python":
+        return [sys.executable, *command[1:]]
+    return command
+
+
+def run_command(command) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        command, cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+
+
+def time_command(command, repeat) -> list[float]:
+    """This method will return the wall time of every run of a command."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_command(command)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def import_profile(command, image, top) -> tuple[list[str], list[dict]]:
+    """
+    This method will run a python command under -X importtime and return the
+    heavy libraries it loaded and its slowest imports by cumulative time.
+    """
+    if command[0] == "python":
+        command = ["python", "-X", "importtime", *command[1:]]
+    else:
+        # console scripts: run the entry point module under the same flag
+        command = ["python", "-X", "importtime", "-m", *command]
+    profile = run_command(container_command(command, image)).stderr
+    imports = []
+    for line in profile.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        imports.append({"module": name.strip(), "cumulative_us": int(cumulative)})
+    loaded = sorted(
+        {
+            imported["module"].split(".")[0]
+            for imported in imports
+            if imported["module"].split(".")[0] in HEAVY_MODULES
+        }
+    )
+    top_level = [imported for imported in imports if "." not in imported["module"]]
+    top_level.sort(key=lambda imported: imported["cumulative_us"], reverse=True)
+    return loaded, top_level[:top]
+
+
+def run_cases(repeat, image, top) -> list[dict]:
+    results = []
+    for name, command in CASES:
+        times = time_command(container_command(command, image), repeat)
+        loaded, slowest = import_profile(command, image, top)
+        results.append(
+            {
+                "name": name,
+                "seconds": statistics.median(times),
+                "best_seconds": min(times),
+                "heavy_modules": loaded,
+                "slowest_imports": slowest,
+            }
+        )
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance) -> list[str]:
+    """This method will list the commands that started slower than in a baseline run."""
+    previous = {r["name"]: r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get(result["name"])
+        if old is not None and result["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{result['name']}: {old['seconds'] * 1000:.0f} ms -> "
+                f"{result['seconds'] * 1000:.0f} ms"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--image", help="run every command in a new container of this image"
+    )
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    results = run_cases(args.repeat, args.image, args.top)
+    for r in results:
+        slowest = ", ".join(
+            f"{imported['module']} {imported['cumulative_us'] / 1000:.0f} ms"
+            for imported in r["slowest_imports"]
+        )
+        print(
+            f"{r['name']:<22} {r['seconds'] * 1000:>8.0f} ms "
+            f"heavy: {','.join(r['heavy_modules']) or '-':<28} slowest: {slowest}"
+        )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "image": args.image,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+This module will build synthetic Pro Football Reference markup for the
+benchmarks so they can run without touching the network.
+
+`python -m benchmarks.synthetic` regenerates the era fixtures in
+benchmarks/fixtures; `python -m benchmarks.record_fixtures` replaces them
+with pages recorded in the response archive.
+"""
+
+import os
+from datetime import date, timedelta
+
+from pro_football_reference.settings import (
+    TEAM_ABBREVIATIONS,
+    TEAM_FIRST_SEASONS,
+    TEAM_INACTIVE_SEASONS,
+)
+from pro_football_reference.utils.pfr_table_config import (
+    PLAYER_CONFIG,
+    PLAYER_PUNT_AND_KICK_RETURNER_CONFIG,
+    TEAM_CONVERSIONS_CONFIG,
+    TEAM_STATS_AND_RANKINGS_CONFIG,
+)
+
+PLAYER_TABLE_IDS = ["passing", "rushing_and_receiving", "defense", "kicking", "punting"]
+
+
+def build_row(stats_config, player=False) -> str:
+    """This method will build a <tr> with one cell per distinct configured data-stat."""
+    seen = []
+    for config in stats_config:
+        if (config.table_part, config.stat) not in seen:
+            seen.append((config.table_part, config.stat))
+    cells = "".join(
+        f'<{part} data-stat="{stat}">{i}</{part}>' for i, (part, stat) in enumerate(seen)
+    )
+    if player:
+        cells = (
+            '<td data-stat="name_display"><a href="/players/A/AbcdXx00.htm">'
+            "Player Name</a></td>" + cells
+        )
+    return f"<tr>{cells}</tr>"
+
+
+def build_table(table_id, stats_config, rows, player=False) -> str:
+    """This method will build a table with the given number of identical body rows."""
+    body = build_row(stats_config, player) * rows
+    return f'<table id="{table_id}"><tbody>{body}</tbody></table>'
+
+
+def build_team_page(player_rows=40, filler_blocks=200) -> str:
+    """
+    This method will build a team page shaped like the real one: a live
+    team_stats table, the rest of the tables wrapped in HTML comments and
+    plenty of unrelated markup around them.
+    """
+    filler = page_chrome(2023, blocks=filler_blocks // 40)
+    commented = [
+        build_table("team_conversions", TEAM_CONVERSIONS_CONFIG, 2),
+        build_table("returns", PLAYER_PUNT_AND_KICK_RETURNER_CONFIG, player_rows, True),
+    ] + [
+        build_table(table_id, PLAYER_CONFIG, player_rows, True)
+        for table_id in PLAYER_TABLE_IDS
+    ]
+    sections = "".join(
+        f'<div class="table_wrapper">{filler}<!--\n{table}\n--></div>'
+        for table in commented
+    )
+    return (
+        "<html><head><title>Team</title></head><body>"
+        f"{filler}{build_table('team_stats', TEAM_STATS_AND_RANKINGS_CONFIG, 2)}"
+        f"{sections}</body></html>"
+    )
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# (teams, regular season weeks, playoff games, drive stats tracked) per era
+ERAS = {
+    1978: (28, 16, 9, False),
+    1998: (30, 17, 11, True),
+    2023: (32, 18, 13, True),
+}
+# games per playoff round, by the playoff games of an era
+PLAYOFF_ROUNDS = {
+    9: (("WildCard", 2), ("Division", 4), ("ConfChamp", 2), ("SuperBowl", 1)),
+    11: (("WildCard", 4), ("Division", 4), ("ConfChamp", 2), ("SuperBowl", 1)),
+    13: (("WildCard", 6), ("Division", 4), ("ConfChamp", 2), ("SuperBowl", 1)),
+}
+# franchise names as shown on the games pages, where they changed by era
+TEAM_NAMES = {
+    "buf": "Buffalo Bills",
+    "mia": "Miami Dolphins",
+    "nwe": "New England Patriots",
+    "nyj": "New York Jets",
+    "rav": "Baltimore Ravens",
+    "pit": "Pittsburgh Steelers",
+    "cin": "Cincinnati Bengals",
+    "cle": "Cleveland Browns",
+    "htx": "Houston Texans",
+    "clt": {1978: "Baltimore Colts", 1998: "Indianapolis Colts"},
+    "jax": "Jacksonville Jaguars",
+    "oti": {1978: "Houston Oilers", 1998: "Tennessee Oilers", 2023: "Tennessee Titans"},
+    "kan": "Kansas City Chiefs",
+    "sdg": {1978: "San Diego Chargers", 2023: "Los Angeles Chargers"},
+    "den": "Denver Broncos",
+    "rai": {1978: "Oakland Raiders", 2023: "Las Vegas Raiders"},
+    "phi": "Philadelphia Eagles",
+    "was": {1978: "Washington Redskins", 2023: "Washington Commanders"},
+    "dal": "Dallas Cowboys",
+    "nyg": "New York Giants",
+    "det": "Detroit Lions",
+    "min": "Minnesota Vikings",
+    "gnb": "Green Bay Packers",
+    "chi": "Chicago Bears",
+    "tam": "Tampa Bay Buccaneers",
+    "atl": "Atlanta Falcons",
+    "car": "Carolina Panthers",
+    "nor": "New Orleans Saints",
+    "ram": {1978: "Los Angeles Rams", 1998: "St. Louis Rams", 2023: "Los Angeles Rams"},
+    "sea": "Seattle Seahawks",
+    "crd": {1978: "St. Louis Cardinals", 1998: "Arizona Cardinals"},
+    "sfo": "San Francisco 49ers",
+}
+FIRST_NAMES = ["Josh", "Tom", "Jim", "Joe", "Marcus", "Andre", "Ray", "Dan", "Chris"]
+LAST_NAMES = ["Allen", "Brady", "Kelly", "Smith", "Johnson", "Reed", "Moss", "Lewis"]
+PLAYER_TABLE_ROWS = {
+    "passing": 4,
+    "rushing_and_receiving": 24,
+    "returns": 8,
+    "defense": 38,
+    "kicking": 2,
+    "punting": 2,
+}
+DRIVE_STATS = {
+    "drives",
+    "score_pct",
+    "turnover_pct",
+    "start_avg",
+    "time_avg",
+    "plays_per_drive",
+    "yds_per_drive",
+    "points_avg",
+}
+
+
+def season_teams(season) -> list[str]:
+    """This method will return the franchises that played a season."""
+    return [
+        team
+        for team in TEAM_ABBREVIATIONS
+        if season >= TEAM_FIRST_SEASONS.get(team, 0)
+        and season not in TEAM_INACTIVE_SEASONS.get(team, ())
+    ]
+
+
+def team_name(team, season) -> str:
+    """This method will return a franchise's name in a season."""
+    names = TEAM_NAMES[team]
+    if isinstance(names, str):
+        return names
+    return names[max(year for year in names if year <= season)]
+
+
+def player_name_and_link(i) -> tuple[str, str]:
+    """This method will return a distinct (name, link) for the i-th player of a page."""
+    first = FIRST_NAMES[i % len(FIRST_NAMES)]
+    last = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return f"{first} {last}", f"/players/{last[0]}/{last[:4]}{first[:2]}{i:02d}.htm"
+
+
+def page_chrome(season, blocks=5) -> str:
+    """
+    This method will build the navigation markup that surrounds the tables
+    of a real page: links to every team and to the neighbouring seasons.
+    """
+    teams = "".join(
+        f'<li><a href="/teams/{team}/{season}.htm">{team_name(team, season)}</a></li>'
+        for team in season_teams(season)
+    )
+    seasons = "".join(
+        f'<li><a href="/years/{year}/">{year} NFL Season</a></li>'
+        for year in range(season - 2, season + 3)
+    )
+    block = (
+        f'<div class="section_wrapper"><div class="section_heading"><h2>{season} '
+        f'Teams</h2></div><ul class="nav">{teams}</ul><ul class="seasons">{seasons}'
+        "</ul></div>"
+    )
+    return block * blocks
+
+
+def sample_value(config, i) -> str:
+    """This method will return a plausible cell text for the dtype of a StatConfig."""
+    if config.dtype == "float":
+        return f"{(i % 50) / 7:.1f}"
+    if config.dtype == "pct":
+        return f"{(i * 7) % 100:.1f}%"
+    if config.dtype == "clock":
+        return f"{2 + i % 2}:{(i * 13) % 60:02d}"
+    if config.dtype == "field_position":
+        return f"Own {20 + i % 15}.{i % 10}"
+    if config.dtype == "str":
+        return ["QB", "WR", "RB", "TE", "LB", "CB"][i % 6]
+    return str((i * 37) % 400)
+
+
+def build_era_row(stats_config, i, skip=(), player=False) -> str:
+    seen = {}
+    for config in stats_config:
+        if config.stat not in skip:
+            seen.setdefault((config.table_part, config.stat), config)
+    cells = "".join(
+        f'<{part} data-stat="{stat}">{sample_value(config, i + n)}</{part}>'
+        for n, ((part, stat), config) in enumerate(seen.items())
+    )
+    if player:
+        name, link = player_name_and_link(i)
+        cells = f'<td data-stat="name_display"><a href="{link}">{name}</a></td>{cells}'
+    return f"<tr>{cells}</tr>"
+
+
+def round_robin(teams, week) -> list[tuple[str, str]]:
+    """
+    This method will pair every team once for a week (circle method), the
+    first team of each pair being the visitor.
+    """
+    shift = week % (len(teams) - 1)
+    rotated = [teams[0], *teams[1:][shift:], *teams[1:][:shift]]
+    half = len(rotated) // 2
+    pairs = zip(rotated[:half], reversed(rotated[half:]))
+    return [(first, second) if week % 2 else (second, first) for first, second in pairs]
+
+
+def build_games_page(season) -> str:
+    """
+    This method will build a games.htm page for an era: every franchise of
+    the season plays once a week (a few have a bye in later seasons), then
+    the playoff rounds between the best teams.
+    """
+    teams = season_teams(season)
+    _, weeks, playoff_games, _ = ERAS[season]
+    kickoff = date(season, 9, 1)
+    kickoff += timedelta(days=(6 - kickoff.weekday()) % 7)
+    wins = dict.fromkeys(teams, 0)
+    header = (
+        '<tr class="thead"><th data-stat="week_num">Week</th>'
+        '<td data-stat="winner">Winner/tie</td><td data-stat="loser">Loser/tie</td></tr>'
+    )
+    rows = []
+    game = 0
+    for week in range(1, weeks + 1):
+        if week % 4 == 1 and week > 1:
+            rows.append(header)
+        games = round_robin(teams, week)
+        # one pair has a bye week in the 17 and 18 week seasons
+        if weeks > 16 and week % 3 == 0:
+            games = games[1:]
+        game_date = kickoff + timedelta(weeks=week - 1)
+        for visitor, home in games:
+            winner, loser = (visitor, home) if game % 3 == 0 else (home, visitor)
+            wins[winner] += 1
+            rows.append(
+                build_game_row(season, str(week), game, game_date, winner, loser, home)
+            )
+            game += 1
+
+    seeds = sorted(teams, key=lambda team: (-wins[team], team))
+    byes = seeds[: 8 - PLAYOFF_ROUNDS[playoff_games][0][1]]
+    alive = seeds[len(byes) : len(byes) + 2 * PLAYOFF_ROUNDS[playoff_games][0][1]]
+    game_date = kickoff + timedelta(weeks=weeks)
+    for label, count in PLAYOFF_ROUNDS[playoff_games]:
+        winners = []
+        for n in range(count):
+            home, visitor = alive[n], alive[-1 - n]
+            winners.append(home)
+            rows.append(
+                build_game_row(season, label, game, game_date, home, visitor, home)
+            )
+            game += 1
+        alive = byes + winners if label == "WildCard" else winners
+        alive = sorted(alive, key=seeds.index)
+        game_date += timedelta(weeks=1)
+    return (
+        f"<html><head><title>{season} NFL Weekly League Schedule</title></head><body>"
+        f"{page_chrome(season)}<h1>{season} NFL Weekly League Schedule</h1>"
+        f'<table id="games"><thead>{header}</thead><tbody>{"".join(rows)}</tbody>'
+        f"</table>{page_chrome(season)}</body></html>"
+    )
+
+
+def build_game_row(season, week, game, game_date, winner, loser, home) -> str:
+    """This method will build the row of a played game, the winner in bold."""
+    location = "" if winner == home else "@"
+    return (
+        f'<tr><th data-stat="week_num">{week}</th>'
+        f'<td data-stat="game_day_of_week">Sun</td>'
+        f'<td data-stat="game_date">{game_date.isoformat()}</td>'
+        f'<td data-stat="gametime">{["1:00PM", "4:25PM", "8:20PM"][game % 3]}</td>'
+        f'<td data-stat="winner"><strong><a href="/teams/{winner}/{season}.htm">'
+        f"{team_name(winner, season)}</a></strong></td>"
+        f'<td data-stat="game_location">{location}</td>'
+        f'<td data-stat="loser"><a href="/teams/{loser}/{season}.htm">'
+        f"{team_name(loser, season)}</a></td>"
+        f'<td data-stat="boxscore_word"><a href="/boxscores/'
+        f'{game_date:%Y%m%d}0{home}.htm">boxscore</a></td>'
+        f'<td data-stat="pts_win"><strong>{17 + game * 7 % 24}</strong></td>'
+        f'<td data-stat="pts_lose">{3 + game * 5 % 14}</td>'
+        f'<td data-stat="yards_win">{280 + game * 13 % 170}</td>'
+        f'<td data-stat="to_win">{game % 3}</td>'
+        f'<td data-stat="yards_lose">{220 + game * 11 % 160}</td>'
+        f'<td data-stat="to_lose">{game % 4}</td></tr>'
+    )
+
+
+def build_season_team_page(season) -> str:
+    """
+    This method will build a team page for an era: team_stats is live
+    markup, the other tables are wrapped in HTML comments and older eras
+    have no drive stats.
+    """
+    skip = () if ERAS[season][3] else DRIVE_STATS
+    filler = page_chrome(season)
+    team_stats = "".join(
+        build_era_row(TEAM_STATS_AND_RANKINGS_CONFIG, i, skip) for i in range(3)
+    )
+    tables = [
+        f'<table id="team_conversions"><tbody>'
+        f'{"".join(build_era_row(TEAM_CONVERSIONS_CONFIG, i) for i in range(3))}'
+        f"</tbody></table>"
+    ]
+    for table_id, rows in PLAYER_TABLE_ROWS.items():
+        stats_config = PLAYER_CONFIG
+        if table_id == "returns":
+            stats_config = PLAYER_PUNT_AND_KICK_RETURNER_CONFIG
+        body = "".join(
+            build_era_row(stats_config, i, player=True) for i in range(rows)
+        )
+        tables.append(f'<table id="{table_id}"><tbody>{body}</tbody></table>')
+    sections = "".join(
+        f'<div class="table_wrapper">{filler}<!--\n{table}\n--></div>' for table in tables
+    )
+    return (
+        f"<html><head><title>{season} Buffalo Bills</title></head><body>{filler}"
+        f'<table id="team_stats"><tbody>{team_stats}</tbody></table>'
+        f"{sections}</body></html>"
+    )
+
+
+def write_fixtures(directory=FIXTURES_DIR) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for season in ERAS:
+        for name, page in (
+            (f"games_{season}.html", build_games_page(season)),
+            (f"team_buf_{season}.html", build_season_team_page(season)),
+        ):
+            with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+                f.write(page)
+
+
+if __name__ == "__main__":
+    write_fixtures()
@@ -0,0 +1,525 @@
+# Define here the extensions for your crawls
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import Counter
+from datetime import timedelta
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+# sent by spiders and pipelines with name, value and labels for CrawlMetrics
+metric_observed = object()
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10_000, 50_000, 100_000)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class BackfillProgress:
+    """
+    This extension will log how many of the scheduled season pages have
+    been crawled, the page rate and an ETA every BACKFILL_PROGRESS_INTERVAL
+    seconds. The total comes from the spider's expected_pages.
+    """
+
+    def __init__(self, stats, interval):
+        self.stats = stats
+        self.interval = interval
+        self.pages_done = 0
+        self.started = None
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        interval = crawler.settings.getfloat("BACKFILL_PROGRESS_INTERVAL")
+        if not interval:
+            raise NotConfigured
+        ext = cls(crawler.stats, interval)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.monotonic()
+        self.task = task.LoopingCall(self.log, spider)
+        self.task.start(self.interval, now=False)
+
+    def response_received(self, response, request, spider):
+        # only count the season pages scheduled by the spider (not robots.txt)
+        if "year" in request.meta:
+            self.pages_done += 1
+
+    def log(self, spider):
+        total = getattr(spider, "expected_pages", None)
+        elapsed = time.monotonic() - self.started
+        rate = self.pages_done / elapsed if elapsed else 0.0
+        self.stats.set_value("backfill/pages_done", self.pages_done, spider=spider)
+        if not total:
+            return
+        remaining = max(total - self.pages_done, 0)
+        eta = timedelta(seconds=round(remaining / rate)) if rate else "unknown"
+        self.stats.set_value("backfill/pages_total", total, spider=spider)
+        spider.logger.info(
+            "Backfill progress: %d/%d pages (%.1f%%), %.2f pages/min, ETA %s",
+            self.pages_done,
+            total,
+            100 * self.pages_done / total,
+            rate * 60,
+            eta,
+        )
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        self.log(spider)
+
+
+class Histogram:
+    """A Prometheus style histogram: per-bucket counts, a sum and a count."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """This method will return the (le, cumulative count) pairs including +Inf."""
+        pairs = []
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            pairs.append((str(bound), total))
+        return pairs
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CrawlMetrics:
+    """
+    This extension will collect latency and size histograms for a crawl
+    and export them at close to METRICS_PROMETHEUS_PATH (textfile collector
+    format) and METRICS_JSON_PATH, together with the numeric crawl stats.
+
+    From the request signals it records, per callback, how long a request
+    waited in the scheduler, in the token bucket (throttle_wait_seconds),
+    in the downloader and the download latency itself. Spiders, pipelines
+    and CallbackMetricsMiddleware add their own observations (parse time,
+    rows per table, buffered items, flush and upload durations) through
+    the metric_observed signal.
+    """
+
+    def __init__(self, stats, prometheus_path, json_path):
+        self.stats = stats
+        self.prometheus_path = prometheus_path
+        self.json_path = json_path
+        self.histograms = {}
+        self.spider_name = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("METRICS_ENABLED"):
+            raise NotConfigured
+        ext = cls(
+            crawler.stats,
+            settings.get("METRICS_PROMETHEUS_PATH"),
+            settings.get("METRICS_JSON_PATH"),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(
+            ext.request_reached_downloader, signal=signals.request_reached_downloader
+        )
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.metric_observed, signal=metric_observed)
+        return ext
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        if key not in self.histograms:
+            buckets = SECONDS_BUCKETS if name.endswith("_seconds") else COUNT_BUCKETS
+            self.histograms[key] = Histogram(buckets)
+        self.histograms[key].observe(value)
+
+    def metric_observed(self, name, value, labels):
+        self.observe(name, value, **labels)
+
+    @staticmethod
+    def callback_name(request) -> str:
+        return getattr(request.callback, "__name__", "parse")
+
+    def spider_opened(self, spider):
+        self.spider_name = spider.name
+
+    def request_scheduled(self, request, spider):
+        request.meta["metrics_scheduled_at"] = time.monotonic()
+
+    def request_reached_downloader(self, request, spider):
+        now = time.monotonic()
+        request.meta["metrics_downloader_at"] = now
+        throttle_wait = request.meta.get("token_bucket_wait", 0.0)
+        callback = self.callback_name(request)
+        self.observe("throttle_wait_seconds", throttle_wait, callback=callback)
+        if "metrics_scheduled_at" in request.meta:
+            queued = now - request.meta["metrics_scheduled_at"] - throttle_wait
+            self.observe("scheduler_wait_seconds", max(queued, 0.0), callback=callback)
+
+    def response_received(self, response, request, spider):
+        callback = self.callback_name(request)
+        if "metrics_downloader_at" in request.meta:
+            # slot queue (concurrency limits) plus the transfer itself
+            in_downloader = time.monotonic() - request.meta["metrics_downloader_at"]
+            self.observe("download_seconds", in_downloader, callback=callback)
+        if "download_latency" in request.meta:
+            self.observe(
+                "download_latency_seconds",
+                request.meta["download_latency"],
+                callback=callback,
+            )
+
+    def spider_closed(self, spider, reason):
+        crawl_stats = self.stats.get_stats(spider)
+        if self.prometheus_path:
+            self.write(
+                self.prometheus_path.format(spider=spider.name),
+                self.render_prometheus(spider.name, crawl_stats),
+            )
+        if self.json_path:
+            self.write(
+                self.json_path.format(spider=spider.name),
+                json.dumps(
+                    {
+                        "spider": spider.name,
+                        "reason": reason,
+                        "histograms": self.render_json(),
+                        "stats": crawl_stats,
+                    },
+                    default=str,
+                    indent=2,
+                ),
+            )
+
+    @staticmethod
+    def write(path, text):
+        """This method will replace a metrics file atomically for the textfile collector."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            f.write(text)
+        os.replace(temporary, path)
+
+    def render_json(self) -> list[dict]:
+        return [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": histogram.count,
+                "sum": histogram.sum,
+                "buckets": dict(histogram.cumulative()),
+            }
+            for (name, labels), histogram in sorted(self.histograms.items())
+        ]
+
+    def render_prometheus(self, spider_name, crawl_stats) -> str:
+        lines = []
+        described = set()
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            metric = f"pfr_{name}"
+            if metric not in described:
+                described.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            label_text = ",".join(
+                f'{key}="{_escape(value)}"'
+                for key, value in (("spider", spider_name), *labels)
+            )
+            for bound, count in histogram.cumulative():
+                lines.append(f'{metric}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum{{{label_text}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{label_text}}} {histogram.count}")
+        lines.append("# TYPE pfr_crawl_stat gauge")
+        for stat, value in sorted(crawl_stats.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(
+                    f'pfr_crawl_stat{{spider="{_escape(spider_name)}",'
+                    f'stat="{_escape(stat)}"}} {value}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+def rss_bytes() -> int | None:
+    """
+    This method will return the resident set size of the process from
+    /proc/self/statm, or the peak RSS from resource where there is no /proc.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def buffer_bytes(buffer) -> int:
+    """This method will measure the column lists of a ColumnBuffer and their values."""
+    return sum(
+        sys.getsizeof(column) + sum(sys.getsizeof(v) for v in column if v is not None)
+        for column in buffer.columns.values()
+    )
+
+
+class MemoryProfiler:
+    """
+    This extension will sample the memory of a crawl every
+    MEMORY_PROFILE_INTERVAL seconds and write a report at close to
+    MEMORY_PROFILE_PATH. It is meant for sizing containers and checking
+    that memory stays flat across the seasons of a backfill, not for
+    production runs: tracemalloc slows the crawl down.
+
+    Every sample records the RSS, the memory traced by tracemalloc and the
+    season of the latest page, and attributes the traced memory that is
+    still held:
+
+        callbacks   to the spider method that allocated it (the innermost
+                    frame of the allocation in a method of the spider class)
+        components  to the project module (spiders, pipelines, utils) or
+                    library that allocated it
+        datasets    the rows and measured bytes held by each pipeline buffer,
+                    which keeps values allocated by the callbacks
+                    (reported at close as the largest of the samples, since
+                    the pipelines have flushed their buffers by then)
+
+    The report also lists the allocation sites that grew the most since
+    the crawl started. Memory of the dataframe and storage libraries outside
+    the Python allocator, and of PARSE_PROCESSES workers, only shows in the
+    RSS of the process that holds it.
+    """
+
+    def __init__(self, stats, interval, path, frames=25, top=20):
+        self.stats = stats
+        self.interval = interval
+        self.path = path
+        self.frames = frames
+        self.top = top
+        self.crawler = None
+        self.task = None
+        self.started = None
+        self.started_tracing = False
+        self.baseline = None
+        # filename -> [(first line, last line, qualified name)] of spider methods
+        self.callbacks = {}
+        self.season = None
+        self.pages = 0
+        self.samples = []
+        self.seasons = {}
+        # dataset -> largest buffered rows and bytes of any sample
+        self.datasets = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("MEMORY_PROFILE_ENABLED"):
+            raise NotConfigured
+        ext = cls(
+            crawler.stats,
+            settings.getfloat("MEMORY_PROFILE_INTERVAL", 60),
+            settings.get("MEMORY_PROFILE_PATH"),
+            settings.getint("MEMORY_PROFILE_FRAMES", 25),
+            settings.getint("MEMORY_PROFILE_TOP", 20),
+        )
+        ext.crawler = crawler
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        return ext
+
+    def spider_opened(self, spider):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started_tracing = True
+        self.callbacks = self.callback_lines(type(spider))
+        self.started = time.monotonic()
+        self.baseline = self.snapshot()
+        self.task = task.LoopingCall(self.sample, spider)
+        self.task.start(self.interval, now=False)
+
+    @staticmethod
+    def callback_lines(spider_class) -> dict:
+        """This method will map the source lines of every spider method to its name."""
+        callbacks = {}
+        for _, function in inspect.getmembers(spider_class, inspect.isfunction):
+            code = function.__code__
+            lines = [line for _, _, line in code.co_lines() if line is not None]
+            if lines:
+                callbacks.setdefault(code.co_filename, []).append(
+                    (code.co_firstlineno, max(lines), function.__qualname__)
+                )
+        return callbacks
+
+    def response_received(self, response, request, spider):
+        if "year" in request.meta:
+            self.season = request.meta["year"]
+            self.pages += 1
+
+    @staticmethod
+    def snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+    def callback_of(self, frames) -> str:
+        for frame in frames:
+            for first, last, name in self.callbacks.get(frame.filename, ()):
+                if first <= frame.lineno <= last:
+                    return name
+        return "(outside callbacks)"
+
+    @staticmethod
+    def component_of(frames) -> str:
+        for frame in frames:
+            if frame.filename.startswith(PACKAGE_DIR):
+                return os.path.relpath(frame.filename, PACKAGE_DIR).replace(os.sep, "/")
+        filename = frames[0].filename.replace(os.sep, "/")
+        if "-packages/" in filename:
+            library = filename.split("-packages/", 1)[1].split("/", 1)[0]
+            return library.removesuffix(".py")
+        return filename if filename.startswith("<") else "stdlib"
+
+    def attribute(self, snapshot) -> tuple[Counter, Counter]:
+        """This method will total the traced bytes per spider callback and component."""
+        callbacks = Counter()
+        components = Counter()
+        for stat in snapshot.statistics("traceback"):
+            # tracebacks are ordered from the oldest frame, start at the allocation
+            frames = list(reversed(stat.traceback))
+            callbacks[self.callback_of(frames)] += stat.size
+            components[self.component_of(frames)] += stat.size
+        return callbacks, components
+
+    def buffered(self) -> dict:
+        """This method will measure the dataset buffers of the running pipelines."""
+        scraper = getattr(self.crawler.engine, "scraper", None)
+        pipelines = scraper.itemproc.middlewares if scraper is not None else ()
+        datasets = {}
+        for pipeline in pipelines:
+            for dataset, buffer in getattr(pipeline, "buffers", {}).items():
+                datasets[dataset] = {"rows": len(buffer), "bytes": buffer_bytes(buffer)}
+        return datasets
+
+    def top_counts(self, counter) -> dict:
+        return dict(counter.most_common(self.top))
+
+    def sample(self, spider):
+        snapshot = self.snapshot()
+        callbacks, components = self.attribute(snapshot)
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        rss = rss_bytes()
+        sample = {
+            "elapsed_seconds": round(time.monotonic() - self.started, 1),
+            "season": self.season,
+            "pages": self.pages,
+            "rss_bytes": rss,
+            "traced_bytes": traced,
+            "traced_peak_bytes": traced_peak,
+            "callbacks": self.top_counts(callbacks),
+            "components": self.top_counts(components),
+            "datasets": self.buffered(),
+        }
+        self.samples.append(sample)
+        for dataset, held in sample["datasets"].items():
+            peak = self.datasets.setdefault(dataset, {"max_rows": 0, "max_bytes": 0})
+            peak["max_rows"] = max(peak["max_rows"], held["rows"])
+            peak["max_bytes"] = max(peak["max_bytes"], held["bytes"])
+        if self.season is not None:
+            season = self.seasons.setdefault(
+                self.season, {"max_rss_bytes": 0, "max_traced_bytes": 0}
+            )
+            season["max_rss_bytes"] = max(season["max_rss_bytes"], rss or 0)
+            season["max_traced_bytes"] = max(season["max_traced_bytes"], traced)
+        if rss is not None:
+            self.stats.max_value("memory/max_rss_bytes", rss, spider=spider)
+        self.stats.max_value("memory/max_traced_bytes", traced, spider=spider)
+        spider.logger.info(
+            "Memory: rss %.0f MiB, traced %.0f MiB, %d buffered rows",
+            (rss or 0) / 2**20,
+            traced / 2**20,
+            sum(dataset["rows"] for dataset in sample["datasets"].values()),
+        )
+        return snapshot
+
+    def growth(self, snapshot) -> list[dict]:
+        """This method will list the allocation sites that grew most since the start."""
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "bytes": stat.size,
+                "growth_bytes": stat.size_diff,
+                "blocks": stat.count,
+            }
+            for stat in snapshot.compare_to(self.baseline, "lineno")[: self.top]
+        ]
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        # the pipelines have flushed by now, so this is what the crawl still holds
+        snapshot = self.sample(spider)
+        report = {
+            "spider": spider.name,
+            "reason": reason,
+            "interval_seconds": self.interval,
+            "frames": self.frames,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "traced_peak_bytes": tracemalloc.get_traced_memory()[1],
+            "callbacks": self.samples[-1]["callbacks"],
+            "components": self.samples[-1]["components"],
+            "datasets": self.datasets,
+            "top_growth": self.growth(snapshot),
+            "seasons": self.seasons,
+            "samples": self.samples,
+        }
+        if self.started_tracing:
+            tracemalloc.stop()
+        if self.path:
+            CrawlMetrics.write(
+                self.path.format(spider=spider.name),
+                json.dumps(report, default=str, indent=2),
+            )
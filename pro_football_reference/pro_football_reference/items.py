@@ -3,6 +3,8 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+from dataclasses import dataclass
+
 import scrapy
 
 
@@ -23,6 +25,22 @@ class GameResultItem(scrapy.Item):
     loser_turnovers = scrapy.Field()
 
 
+class TeamRatingItem(scrapy.Item):
+    """A team's ratings after a week, derived from the game results (pfr_ratings)."""
+
+    year = scrapy.Field()
+    week = scrapy.Field()
+    week_order = scrapy.Field()
+    team = scrapy.Field()
+    elo = scrapy.Field()
+    elo_change = scrapy.Field()
+    season_elo = scrapy.Field()
+    games = scrapy.Field()
+    point_differential_per_game = scrapy.Field()
+    season_games = scrapy.Field()
+    season_point_differential_per_game = scrapy.Field()
+
+
 class TeamStatsAndRankingsItem(scrapy.Item):
     team = scrapy.Field()
     year = scrapy.Field()
@@ -142,3 +160,50 @@ class PlayerPunterItem(PlayerItem):
 
 class PlayerDefenseAndFumblesItem(PlayerItem):
     pass
+
+
+class BoxscoreTeamStatsItem(scrapy.Item):
+    year = scrapy.Field()
+    boxscore_link = scrapy.Field()
+    vis_team = scrapy.Field()
+    home_team = scrapy.Field()
+    stat = scrapy.Field()
+    vis_stat = scrapy.Field()
+    home_stat = scrapy.Field()
+
+
+class BoxscoreScoringItem(scrapy.Item):
+    year = scrapy.Field()
+    boxscore_link = scrapy.Field()
+    quarter = scrapy.Field()
+    time_remaining = scrapy.Field()
+    team = scrapy.Field()
+    description = scrapy.Field()
+    vis_team_score = scrapy.Field()
+    home_team_score = scrapy.Field()
+
+
+class PlayerBioItem(scrapy.Item):
+    year = scrapy.Field()
+    player_link = scrapy.Field()
+    player_name = scrapy.Field()
+    position = scrapy.Field()
+    height = scrapy.Field()
+    weight = scrapy.Field()
+    birth_date = scrapy.Field()
+    college = scrapy.Field()
+    draft = scrapy.Field()
+
+
+@dataclass(slots=True)
+class RowRecord:
+    """
+    A compact table row for the high volume spiders: the values of one row
+    in the order of columns (a tuple shared by every row of the table), for
+    the item class named by item_class. The pipelines append the values
+    straight into per-column buffers.
+    """
+
+    item_class: str
+    columns: tuple
+    values: tuple
@@ -3,11 +3,28 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from pro_football_reference.extensions import metric_observed
+from pro_football_reference.utils.pfr_archive import ResponseArchive
+from pro_football_reference.utils.pfr_offline import plain_values
+from pro_football_reference.utils.pfr_fingerprints import (
+    FingerprintStore,
+    content_hash,
+    season_is_final,
+)
+
 
 class ProFootballReferenceSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +118,306 @@ class ProFootballReferenceDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ConditionalRecrawlMiddleware:
+    """
+    This middleware will skip season pages that have not changed since the
+    last successful crawl. Pages of finished seasons that were fetched before
+    are not requested again (CONDITIONAL_RECRAWL_SKIP_FINAL_SEASONS), the rest
+    are sent with If-None-Match / If-Modified-Since and dropped before parsing
+    on a 304 or when the body hash matches the stored fingerprint.
+
+    New fingerprints are only saved when the crawl finishes cleanly, so pages
+    from a failed run are fetched again next time. Skipped pages are recorded
+    on spider.unchanged_pages; their rows stay in the datasets because the
+    pipelines only upsert the rows they receive.
+    """
+
+    def __init__(self, store, stats, skip_final_seasons=True):
+        self.store = store
+        self.stats = stats
+        self.skip_final_seasons = skip_final_seasons
+        self.pending = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("CONDITIONAL_RECRAWL_ENABLED"):
+            raise NotConfigured
+        s = cls(
+            store=FingerprintStore(crawler.settings.get("FINGERPRINT_STORE_PATH")),
+            stats=crawler.stats,
+            skip_final_seasons=crawler.settings.getbool(
+                "CONDITIONAL_RECRAWL_SKIP_FINAL_SEASONS", True
+            ),
+        )
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def skip(self, request, spider, reason):
+        self.stats.inc_value(f"conditional_recrawl/{reason}", spider=spider)
+        spider.mark_unchanged(request)
+        raise IgnoreRequest(f"{reason}: {request.url}")
+
+    def process_request(self, request, spider):
+        if "year" not in request.meta:
+            return None
+        fingerprint = self.store.get_page(request.url)
+        if fingerprint is None:
+            return None
+        # only pages fetched after their season ended hold the final numbers
+        fetched_on = date.fromtimestamp(fingerprint["fetched_at"])
+        if self.skip_final_seasons and season_is_final(request.meta["year"], fetched_on):
+            self.skip(request, spider, "skipped_final_season")
+        if fingerprint["etag"]:
+            request.headers.setdefault("If-None-Match", fingerprint["etag"])
+        if fingerprint["last_modified"]:
+            request.headers.setdefault("If-Modified-Since", fingerprint["last_modified"])
+        return None
+
+    def process_response(self, request, response, spider):
+        if "year" not in request.meta:
+            return response
+        if response.status == 304:
+            self.skip(request, spider, "not_modified")
+        if response.status != 200:
+            return response
+        digest = content_hash(response.body)
+        fingerprint = self.store.get_page(request.url)
+        self.pending[request.url] = (
+            request.url,
+            digest,
+            response.headers.get("ETag", b"").decode() or None,
+            response.headers.get("Last-Modified", b"").decode() or None,
+        )
+        if fingerprint and fingerprint["content_hash"] == digest:
+            self.skip(request, spider, "unchanged_content")
+        return response
+
+    def spider_closed(self, spider, reason):
+        if reason == "finished":
+            self.store.set_pages(self.pending.values())
+        self.store.close()
+
+
+class ResponseArchiveMiddleware:
+    """
+    This middleware will store the body of every fetched season page in the
+    local ResponseArchive (RESPONSE_ARCHIVE_DIR) so the spiders can be re-run
+    offline with `python -m pro_football_reference.reparse`.
+    """
+
+    def __init__(self, archive, stats):
+        self.archive = archive
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("RESPONSE_ARCHIVE_ENABLED"):
+            raise NotConfigured
+        s = cls(
+            archive=ResponseArchive(crawler.settings.get("RESPONSE_ARCHIVE_DIR")),
+            stats=crawler.stats,
+        )
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def process_response(self, request, response, spider):
+        if response.status == 200 and "year" in request.meta:
+            self.archive.put(
+                request.url,
+                response.body,
+                spider=spider.name,
+                year=request.meta["year"],
+                team=request.meta.get("team"),
+                encoding=getattr(response, "encoding", None),
+                meta=plain_values(request.meta),
+            )
+            self.stats.inc_value("response_archive/stored", spider=spider)
+        return response
+
+    def spider_closed(self, spider):
+        self.archive.close()
+
+
+def parse_retry_after(value, default) -> float:
+    """This method will read a Retry-After value given in seconds or as an HTTP date."""
+    if not value:
+        return default
+    value = value.decode("latin-1").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucketMiddleware:
+    """
+    This middleware will pace every request through a token bucket that
+    refills at TOKEN_BUCKET_RATE_PER_MINUTE, replacing DOWNLOAD_DELAY and
+    AutoThrottle. On a 429 (or a 503 with Retry-After) the bucket pauses for
+    Retry-After seconds and halves its rate; after TOKEN_BUCKET_RECOVER_AFTER
+    successful responses in a row the rate climbs back by
+    TOKEN_BUCKET_RECOVERY_STEP per minute up to the configured rate. The
+    retry itself is left to RetryMiddleware, which runs after this one.
+    It sits after HttpCacheMiddleware, so pages the cache serves take no
+    token, and their responses do not count towards a recovery.
+
+    The current rate and the time requests spent waiting for a token are
+    exposed in the crawl stats under token_bucket/.
+    """
+
+    def __init__(
+        self,
+        stats,
+        rate_per_minute,
+        burst=1,
+        min_rate_per_minute=1,
+        recover_after=20,
+        recovery_step=1,
+        default_retry_after=60,
+    ):
+        self.stats = stats
+        self.max_rate = rate_per_minute / 60
+        self.min_rate = min_rate_per_minute / 60
+        self.rate = self.max_rate
+        self.burst = burst
+        self.recover_after = recover_after
+        self.recovery_step = recovery_step / 60
+        self.default_retry_after = default_retry_after
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.successes = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("TOKEN_BUCKET_ENABLED"):
+            raise NotConfigured
+        s = cls(
+            stats=crawler.stats,
+            rate_per_minute=settings.getfloat("TOKEN_BUCKET_RATE_PER_MINUTE", 18),
+            burst=settings.getint("TOKEN_BUCKET_BURST", 1),
+            min_rate_per_minute=settings.getfloat(
+                "TOKEN_BUCKET_MIN_RATE_PER_MINUTE", 1
+            ),
+            recover_after=settings.getint("TOKEN_BUCKET_RECOVER_AFTER", 20),
+            recovery_step=settings.getfloat("TOKEN_BUCKET_RECOVERY_STEP", 1),
+            default_retry_after=settings.getfloat(
+                "TOKEN_BUCKET_DEFAULT_RETRY_AFTER", 60
+            ),
+        )
+        crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        return s
+
+    def reserve(self) -> float:
+        """This method will take a token and return how long to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # tokens go negative while requests are queued behind each other
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    async def process_request(self, request, spider):
+        wait = self.reserve()
+        request.meta["token_bucket_wait"] = wait
+        if wait > 0:
+            self.stats.inc_value("token_bucket/wait_seconds", wait, spider=spider)
+            await maybe_deferred_to_future(deferLater(reactor, wait, lambda: None))
+        return None
+
+    def process_response(self, request, response, spider):
+        if "cached" in response.flags:
+            return response
+        retry_after = response.headers.get("Retry-After")
+        if response.status == 429 or (response.status == 503 and retry_after):
+            pause = parse_retry_after(retry_after, self.default_retry_after)
+            self.back_off(pause, spider)
+        elif response.status < 400:
+            self.recover(spider)
+        return response
+
+    def back_off(self, pause, spider):
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + pause)
+        self.rate = max(self.min_rate, self.rate / 2)
+        # drop the queued reservations' credit so nothing fires right after the pause
+        self.tokens = min(self.tokens, 0.0)
+        self.updated = max(now, self.paused_until)
+        self.successes = 0
+        self.stats.inc_value("token_bucket/throttled", spider=spider)
+        self.record_rate(spider)
+        spider.logger.warning(
+            "Throttled by the site: pausing %.0fs, rate lowered to %.1f requests/min",
+            pause,
+            self.rate * 60,
+        )
+
+    def recover(self, spider):
+        self.successes += 1
+        if self.rate < self.max_rate and self.successes >= self.recover_after:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+            self.successes = 0
+            self.record_rate(spider)
+
+    def record_rate(self, spider):
+        self.stats.set_value(
+            "token_bucket/rate_per_minute", self.rate * 60, spider=spider
+        )
+
+    def spider_opened(self, spider):
+        self.record_rate(spider)
+
+
+class CallbackMetricsMiddleware:
+    """
+    This spider middleware will time how long each callback spends
+    producing its output for a page and how many items it yielded, and
+    send both to CrawlMetrics. It sits closest to the spider so the time of
+    the other spider middlewares is not counted.
+    """
+
+    def __init__(self, signals):
+        self.signals = signals
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("METRICS_ENABLED"):
+            raise NotConfigured
+        return cls(crawler.signals)
+
+    def observe(self, response, elapsed, item_count):
+        labels = {"callback": getattr(response.request.callback, "__name__", "parse")}
+        for name, value in (("parse_seconds", elapsed), ("items_per_page", item_count)):
+            self.signals.send_catch_log(
+                signal=metric_observed, name=name, value=value, labels=labels
+            )
+
+    def process_spider_output(self, response, result, spider):
+        elapsed = 0.0
+        item_count = 0
+        started = time.perf_counter()
+        for output in result:
+            elapsed += time.perf_counter() - started
+            item_count += is_item(output)
+            yield output
+            started = time.perf_counter()
+        self.observe(response, elapsed + time.perf_counter() - started, item_count)
+
+    async def process_spider_output_async(self, response, result, spider):
+        # for async callbacks (parse_in_pool) this includes the wait for the pool
+        elapsed = 0.0
+        item_count = 0
+        started = time.perf_counter()
+        async for output in result:
+            elapsed += time.perf_counter() - started
+            item_count += is_item(output)
+            yield output
+            started = time.perf_counter()
+        self.observe(response, elapsed + time.perf_counter() - started, item_count)
@@ -3,10 +3,37 @@ This module will process each scraped item and
 upload them to the appropriate path in an S3 bucket.
 """
 
-import boto3
-import polars as pl
-import s3fs
+from __future__ import annotations
+
+import io
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from functools import cached_property
+
+from scrapy.utils.misc import load_object
+from pro_football_reference.extensions import metric_observed
+from pro_football_reference.utils.pfr_catalog import Catalog, row_filter
+from pro_football_reference.utils.pfr_coercion import coerce_columns
+from pro_football_reference.utils.pfr_columns import ColumnBuffer
+from pro_football_reference.utils.pfr_fingerprints import content_hash
+from pro_football_reference.utils.pfr_lazy import lazy_import
+from pro_football_reference.utils.pfr_ratings import empty_state, replay_ratings
+from pro_football_reference.utils.pfr_storage import (
+    COMPRESSION_SUFFIXES,
+    CountingWriter,
+    S3Storage,
+    check_compression,
+    compress_stream,
+    decompress,
+    strip_compression_suffix,
+)
+from pro_football_reference.utils.pfr_table_config import STAT_DTYPES
+from pro_football_reference.utils.pfr_validation import DatasetValidator
 from pro_football_reference.items import (
+    BoxscoreScoringItem,
+    BoxscoreTeamStatsItem,
     GameResultItem,
     TeamConversionsItem,
     TeamStatsAndRankingsItem,
@@ -16,48 +43,680 @@ from pro_football_reference.items import (
     PlayerRusherAndReceivingItem,
     PlayerPuntAndKickReturnerItem,
     PlayerDefenseAndFumblesItem,
+    PlayerBioItem,
+    RowRecord,
+    TeamRatingItem,
 )
 
+pl = lazy_import("polars")
+
+logger = logging.getLogger(__name__)
+
+
+def game_matchup():
+    """
+    This method will return the two teams of a game row in name order. An
+    unplayed game lists the visitor as the winner and the home team as the
+    loser, so a key on the winner and loser would change once the home team
+    wins.
+    """
+    return pl.concat_list("winning_team", "losing_team").list.sort().list.join(" / ")
+
 
 class ProFootballReferencePipeline:
-    def __init__(self, s3_bucket_name, aws_access_key_id, aws_secret_access_key):
-        self.s3 = boto3.client(
-            "s3",
-            region_name="us-east-1",
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
+    """
+    Items and RowRecords are buffered per dataset on the pipeline instance,
+    column by column (see ColumnBuffer). By default a
+    dataset is written once in close_spider. With PIPELINE_STREAMING enabled
+    each dataset is flushed every PIPELINE_FLUSH_ROWS rows, and every buffer
+    is flushed as soon as the buffered items pass PIPELINE_MAX_BUFFER_BYTES.
+
+    Writes are keyed upserts. Every dataset has a "merge_key"; a flush
+    compares its rows with the partition's current state (the base object
+    plus its deltas) and writes only the rows of new or changed keys, as a
+    delta object next to the base. Rows missing from a crawl (a page that
+    timed out, a partial run) are never removed. A key's rows are taken from
+    the newest object holding that key, so a boxscore's scoring rows are
+    replaced as a group. A "key_columns" entry derives key columns from the
+    scraped ones, e.g. the matchup of a game whose winner is not known yet.
+    Once a partition has PIPELINE_COMPACT_AFTER_DELTAS deltas they are
+    merged into a new base object and removed.
+
+    PIPELINE_OUTPUT_FORMAT selects NDJSON (s3://bucket/dataset/year/file.json)
+    or typed, zstd compressed Parquet partitioned as
+    s3://bucket/dataset/year=YYYY/team=XXX/file.parquet.
+
+    Objects are kept by the storage backend of STORAGE_CLASS (see
+    pfr_storage): S3, a local directory or memory. PIPELINE_COMPRESSION
+    compresses NDJSON objects as they are serialized (gzip -> file.json.gz,
+    zstd -> file.json.zst), and can be set per dataset with
+    PIPELINE_DATASET_COMPRESSION. Objects are read according to their suffix,
+    so changing the compression keeps older objects readable. Raw and
+    written bytes are counted per dataset and logged at close.
+
+    Parquet columns are always coerced to the dtypes declared in STAT_DTYPES;
+    NDJSON output is only coerced when PIPELINE_COERCE_TYPES is enabled.
+
+    Objects written at close are uploaded concurrently, at most
+    PIPELINE_UPLOAD_CONCURRENCY at a time (over the shared connection pool of
+    the s3fs client for S3), and each one is retried up to
+    PIPELINE_UPLOAD_RETRIES times. S3_ENDPOINT_URL points the client at an S3
+    stand-in (moto server).
+
+    Every upload is recorded in the dataset's catalog manifest (see
+    pfr_catalog), which is saved after each batch of uploads. Writers find a
+    partition's objects and read_dataset prunes partitions through the
+    manifest instead of listing the bucket; a dataset without a manifest has
+    one built from its existing objects on first use.
+
+    With PFR_WORKER_ID set (a distributed crawl, see scheduler.py) every
+    write is a delta named after the worker and recorded in the worker's own
+    manifest, and compaction is left to the next single process run, so
+    workers writing the same partition never replace each other's objects.
+
+    With VALIDATION_ENABLED every flushed batch is checked before it is
+    written (see pfr_validation): duplicate keys, stat columns that are
+    almost all null, teams playing twice in a week and, once every dataset
+    was flushed, seasons missing a team. Failures are logged and counted as
+    validation/* stats, and a JSON report is written at close. With
+    VALIDATION_FAIL_FAST a failed check raises DataValidationError before
+    the batch is uploaded.
+    """
+
+    config = []
+
+    def __init__(
+        self,
+        s3_bucket_name,
+        aws_access_key_id,
+        aws_secret_access_key,
+        streaming=False,
+        flush_rows=5000,
+        max_buffer_bytes=64 * 1024 * 1024,
+        output_format="ndjson",
+        row_group_size=50_000,
+        coerce_types=False,
+        stats=None,
+        signals=None,
+        endpoint_url=None,
+        upload_concurrency=8,
+        upload_retries=3,
+        compact_after=8,
+        worker_id=None,
+        storage=None,
+        compression=None,
+        dataset_compression=None,
+        validator=None,
+    ):
+        self.storage = storage or S3Storage(
+            s3_bucket_name,
+            aws_access_key_id,
+            aws_secret_access_key,
+            endpoint_url,
+            max(upload_concurrency, 10),
         )
-        self.s3_bucket_name = s3_bucket_name
-        self.s3_fs = s3fs.S3FileSystem()
+        self.upload_concurrency = upload_concurrency
+        self.upload_retries = upload_retries
+        # (path, data, dataset, content hash, partition, kind, df, raw bytes)
+        # written by upload_pending
+        self.pending_uploads = []
+        # (dataset, path) of objects merged into a new base, removed once it is uploaded
+        self.pending_removals = []
+        self.worker_id = worker_id
+        self.compact_after = compact_after
+        self.streaming = streaming
+        self.flush_rows = flush_rows
+        self.max_buffer_bytes = max_buffer_bytes
+        if output_format not in ("ndjson", "parquet"):
+            raise ValueError(f"Unsupported PIPELINE_OUTPUT_FORMAT: {output_format}")
+        self.output_format = output_format
+        dataset_compression = dataset_compression or {}
+        self.compression = {
+            c["path"]: dataset_compression.get(c["path"], compression) or None
+            for c in self.config
+        }
+        for name in set(self.compression.values()):
+            check_compression(name)
+        # dataset -> [raw bytes, written bytes] of the uploaded objects
+        self.written_bytes = {}
+        self.row_group_size = row_group_size
+        self.coerce_types = coerce_types or output_format == "parquet"
+        self.stats = stats
+        self.signals = signals
+        # per-instance buffers so a second crawl in the same process starts empty
+        self.buffers = {c["path"]: ColumnBuffer() for c in self.config}
+        self.datasets_by_item_class = {c["item_class"].__name__: c for c in self.config}
+        self.buffered_bytes = 0
+        self.validator = validator
+
+    @cached_property
+    def catalog(self) -> Catalog:
+        return Catalog(self.storage, self.storage.bucket_name, self.worker_id)
 
     @classmethod
     def from_crawler(cls, crawler):
+        return cls.from_settings(
+            crawler.settings, stats=crawler.stats, signals=crawler.signals
+        )
+
+    @classmethod
+    def from_settings(cls, settings, stats=None, signals=None):
+        """This method will build the pipeline outside of a crawl (e.g. offline reparse)."""
+        storage_class = settings.get("STORAGE_CLASS")
         return cls(
-            s3_bucket_name=crawler.settings.get("S3_BUCKET_NAME"),
-            aws_access_key_id=crawler.settings.get("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=crawler.settings.get("AWS_SECRET_ACCESS_KEY"),
+            s3_bucket_name=settings.get("S3_BUCKET_NAME"),
+            aws_access_key_id=settings.get("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=settings.get("AWS_SECRET_ACCESS_KEY"),
+            streaming=settings.getbool("PIPELINE_STREAMING"),
+            flush_rows=settings.getint("PIPELINE_FLUSH_ROWS", 5000),
+            max_buffer_bytes=settings.getint(
+                "PIPELINE_MAX_BUFFER_BYTES", 64 * 1024 * 1024
+            ),
+            output_format=settings.get("PIPELINE_OUTPUT_FORMAT", "ndjson"),
+            row_group_size=settings.getint("PIPELINE_PARQUET_ROW_GROUP_SIZE", 50_000),
+            coerce_types=settings.getbool("PIPELINE_COERCE_TYPES"),
+            stats=stats,
+            signals=signals,
+            endpoint_url=settings.get("S3_ENDPOINT_URL") or None,
+            upload_concurrency=settings.getint("PIPELINE_UPLOAD_CONCURRENCY", 8),
+            upload_retries=settings.getint("PIPELINE_UPLOAD_RETRIES", 3),
+            compact_after=settings.getint("PIPELINE_COMPACT_AFTER_DELTAS", 8),
+            worker_id=settings.get("PFR_WORKER_ID") or None,
+            storage=(
+                load_object(storage_class).from_settings(settings)
+                if storage_class
+                else None
+            ),
+            compression=settings.get("PIPELINE_COMPRESSION"),
+            dataset_compression=settings.getdict("PIPELINE_DATASET_COMPRESSION"),
+            validator=(
+                DatasetValidator.from_settings(settings, STAT_DTYPES, stats)
+                if settings.getbool("VALIDATION_ENABLED")
+                else None
+            ),
         )
 
-    def upload_items_to_s3(self, df, path):
-        with self.s3_fs.open(path, "w") as f:
-            df.write_ndjson(f)
+    def observe(self, name, value, **labels):
+        """This method will send a metric observation to CrawlMetrics during a crawl."""
+        if self.signals is not None:
+            self.signals.send_catch_log(
+                signal=metric_observed, name=name, value=value, labels=labels
+            )
+
+    def serialize(self, df, compression=None) -> tuple[bytes, int]:
+        """
+        This method will render a DataFrame as NDJSON, streamed through the
+        compressor when one is given, or as typed, zstd compressed Parquet
+        with row-group statistics, and return the object with its raw size:
+        the uncompressed NDJSON bytes, or the in-memory size of the frame for
+        Parquet.
+        """
+        buffer = io.BytesIO()
+        if self.output_format == "parquet":
+            df.write_parquet(
+                buffer,
+                compression="zstd",
+                statistics=True,
+                row_group_size=self.row_group_size,
+            )
+            return buffer.getvalue(), df.estimated_size()
+        # write_ndjson can drop rows of a frame left in several chunks by a
+        # merge, so the frame is made contiguous first (a no-op otherwise)
+        df = df.rechunk()
+        if compression is None:
+            data = df.write_ndjson().encode("utf-8")
+            return data, len(data)
+        with compress_stream(buffer, compression) as stream:
+            counter = CountingWriter(stream)
+            df.write_ndjson(counter)
+        return buffer.getvalue(), counter.nbytes
+
+    def upload_items_to_s3(self, df, path, dataset, partition, kind="base"):
+        """
+        This method will queue a dataset object for upload_pending. Unchanged
+        rows never get here: write_partition only writes the changed rows.
+        """
+        data, raw = self.serialize(df, self.compression[dataset])
+        digest = content_hash(data)
+        self.pending_uploads.append(
+            (path, data, dataset, digest, partition, kind, df, raw)
+        )
+
+    def upload_pending(self):
+        """
+        This method will write every queued object through the storage
+        backend (concurrently for S3) and record the latency and size of each
+        upload, then remove the objects replaced by compaction.
+        """
+        uploads, self.pending_uploads = self.pending_uploads, []
+        removals, self.pending_removals = self.pending_removals, []
+        results = self.storage.pipe_files(
+            [(path, data) for path, data, *_ in uploads],
+            self.upload_concurrency,
+            self.upload_retries,
+        )
+        updated = set()
+        for upload, (seconds, retries) in zip(uploads, results):
+            path, data, dataset, digest, partition, kind, df, raw = upload
+            self.observe("upload_seconds", seconds, dataset=dataset)
+            sizes = self.written_bytes.setdefault(dataset, [0, 0])
+            sizes[0] += raw
+            sizes[1] += len(data)
+            if self.stats is not None:
+                self.stats.inc_value("pipeline/uploads")
+                self.stats.inc_value("pipeline/upload_retries", retries)
+                self.stats.max_value("pipeline/upload_seconds_max", seconds)
+                self.stats.inc_value("pipeline/bytes_raw", raw)
+                self.stats.inc_value("pipeline/bytes_written", len(data))
+            self.catalog.record(dataset, path, partition, kind, df, len(data), digest)
+            updated.add(dataset)
+        if removals:
+            self.storage.rm([path for _, path in removals])
+            for dataset, path in removals:
+                self.catalog.remove(dataset, [path])
+                updated.add(dataset)
+        for dataset in updated:
+            self.catalog.save(dataset)
+
+    def object_kind(self, c, path) -> str | None:
+        """
+        This method will classify an object of a dataset partition as its
+        "base" (including part files written by older versions) or a "delta".
+        """
+        stem, extension = c["file_name"].rsplit(".", 1)
+        if self.output_format == "parquet":
+            extension = "parquet"
+        name = strip_compression_suffix(path.rsplit("/", 1)[-1])
+        if not name.endswith(f".{extension}"):
+            return None
+        if name.startswith(f"{stem}.delta-"):
+            return "delta"
+        if name == f"{stem}.{extension}" or name.startswith(f"{stem}-part-"):
+            return "base"
+        return None
+
+    def ensure_manifest(self, c):
+        """
+        This method will load the catalog manifest of a dataset or, for data
+        written before manifests existed, build it from the stored objects.
+        """
+        if self.catalog.load(c["path"]) is not None:
+            return
+        self.catalog.create(c["path"])
+        stem = c["file_name"].rsplit(".", 1)[0]
+        if self.output_format == "parquet":
+            pattern = f"{self.storage.bucket_name}/{c['path']}/**/{stem}*.parquet"
+        else:
+            pattern = f"{self.storage.bucket_name}/{c['path']}/*/{stem}*"
+        found = False
+        for path in sorted(self.storage.glob(pattern)):
+            kind = self.object_kind(c, path)
+            if kind is None:
+                continue
+            data = self.storage.cat_file(path)
+            self.catalog.record(
+                c["path"],
+                path,
+                self.partition_from_path(c["path"], path),
+                kind,
+                self.deserialize(data, path),
+                len(data),
+                content_hash(data),
+                inherited=True,
+            )
+            found = True
+        if found:
+            self.catalog.save(c["path"])
+
+    def partition_objects(self, c, partition) -> tuple[list, list]:
+        """This method will return the base and delta objects (oldest first) of a partition."""
+        self.ensure_manifest(c)
+        return self.catalog.partition_objects(c["path"], partition)
+
+    def deserialize(self, data, path) -> pl.DataFrame:
+        if self.output_format == "parquet":
+            return pl.read_parquet(io.BytesIO(data))
+        return pl.read_ndjson(io.BytesIO(decompress(data, path)))
+
+    def read_object(self, path, partition) -> pl.DataFrame:
+        df = self.deserialize(self.storage.cat_file(path), path)
+        if self.output_format == "parquet":
+            # partition columns live in the path of Parquet objects
+            return df.with_columns(
+                pl.lit(value).alias(key) for key, value in partition.items()
+            )
+        return df
+
+    def with_key_columns(self, c, df) -> pl.DataFrame:
+        """
+        This method will (re)derive the key columns a dataset builds from its
+        scraped columns (its "key_columns"), for new rows and for stored
+        objects written before the key existed.
+        """
+        if not c.get("key_columns") or df.is_empty():
+            return df
+        return df.with_columns(
+            expression().alias(name) for name, expression in c["key_columns"].items()
+        )
+
+    def merge_frames(self, c, frames) -> pl.DataFrame:
+        """
+        This method will merge frames ordered oldest first, taking the rows of
+        each key from the newest frame that holds the key.
+        """
+        frames = [frame for frame in frames if not frame.is_empty()]
+        if not frames:
+            return pl.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+        merged = pl.concat(
+            [
+                frame.with_columns(pl.lit(version).alias("_version"))
+                for version, frame in enumerate(frames)
+            ],
+            how="diagonal_relaxed",
+        )
+        newest = pl.col("_version").max().over(c["merge_key"])
+        return merged.filter(pl.col("_version") == newest).drop("_version")
+
+    def read_partition(self, c, partition, bases, deltas, keys=None) -> pl.DataFrame:
+        """
+        This method will return the current rows of a partition: its bases
+        plus its deltas. Given a frame of merge keys, each object is cut down
+        to the rows of those keys as it is read, so only one whole object is
+        held in memory at a time.
+        """
+
+        def read(path):
+            df = self.with_key_columns(c, self.read_object(path, partition))
+            if keys is None or not set(c["merge_key"]) <= set(df.columns):
+                return df
+            wanted = keys.cast(
+                {key: df.schema[key] for key in c["merge_key"]}, strict=False
+            )
+            return df.join(wanted, on=c["merge_key"], how="semi", join_nulls=True)
+
+        base = [read(path) for path in bases]
+        if len(base) > 1:
+            base = [pl.concat(base, how="diagonal_relaxed")]
+        return self.merge_frames(c, base + [read(path) for path in deltas])
+
+    def changed_rows(self, c, state, df) -> pl.DataFrame:
+        """
+        This method will return the rows of df whose key is new or whose rows
+        differ from the current state. Both sides are compared on the columns
+        of df, after a relaxed concat gives them one schema.
+        """
+        if state.is_empty():
+            return df
+        key = c["merge_key"]
+        columns = df.columns
+        combined = pl.concat([state, df], how="diagonal_relaxed").select(columns)
+        signatures = (
+            combined.with_columns(
+                (pl.int_range(pl.len()) >= state.height).alias("_new"),
+                pl.struct(columns).hash().alias("_row"),
+            )
+            .group_by([*key, "_new"])
+            .agg(pl.col("_row").sort().cast(pl.String).str.join(",").alias("_rows"))
+        )
+        changed_keys = (
+            signatures.filter(pl.col("_new"))
+            .join(
+                signatures.filter(~pl.col("_new")),
+                on=key,
+                how="left",
+                suffix="_old",
+                join_nulls=True,
+            )
+            .filter(
+                pl.col("_rows_old").is_null() | (pl.col("_rows") != pl.col("_rows_old"))
+            )
+            .select(key)
+        )
+        return combined.slice(state.height).join(
+            changed_keys, on=key, how="semi", join_nulls=True
+        )
+
+    def write_partition(self, c, partition, df):
+        """
+        This method will queue the changed rows of a partition as a delta, as
+        the first base object of a new partition, or, once the partition has
+        enough deltas, as a compacted base replacing the old objects.
+
+        Only the state rows of the batch's keys are kept to find the changed
+        rows; a compaction needs the whole partition, so it reads it all.
+        """
+        bases, deltas = self.partition_objects(c, partition)
+        compact = not self.worker_id and len(deltas) + 1 >= self.compact_after
+        keys = None if compact else df.select(c["merge_key"]).unique()
+        state = self.read_partition(c, partition, bases, deltas, keys)
+        changed = self.changed_rows(c, state, df)
+        if self.stats is not None:
+            self.stats.inc_value("pipeline/rows_unchanged", df.height - changed.height)
+            self.stats.inc_value("pipeline/rows_written", changed.height)
+        if changed.is_empty():
+            return
+        base_path = self.get_path(c, partition)
+        if self.worker_id:
+            # other workers may be writing this partition
+            self.upload_items_to_s3(
+                self.object_frame(partition, changed),
+                self.get_path(c, partition, delta=True),
+                c["path"],
+                partition,
+                kind="delta",
+            )
+        elif not bases and not deltas:
+            self.upload_items_to_s3(
+                self.object_frame(partition, changed), base_path, c["path"], partition
+            )
+        elif compact:
+            merged = self.merge_frames(c, [state, changed])
+            self.upload_items_to_s3(
+                self.object_frame(partition, merged), base_path, c["path"], partition
+            )
+            self.pending_removals.extend(
+                (c["path"], path)
+                for path in bases + deltas
+                if path.rsplit("/", 1)[-1] != base_path.rsplit("/", 1)[-1]
+            )
+            if self.stats is not None:
+                self.stats.inc_value("pipeline/compactions")
+        else:
+            self.upload_items_to_s3(
+                self.object_frame(partition, changed),
+                self.get_path(c, partition, delta=True),
+                c["path"],
+                partition,
+                kind="delta",
+            )
+            if self.stats is not None:
+                self.stats.inc_value("pipeline/deltas_written")
+
+    def get_path(self, c, partition, delta=False):
+        """
+        This method will return the base object path of a partition or, with
+        delta=True, a new delta object path named after the current time (and
+        the worker of a distributed crawl).
+        """
+        stem, extension = c["file_name"].rsplit(".", 1)
+        if self.output_format == "parquet":
+            directories = [f"{key}={value}" for key, value in partition.items()]
+            extension = "parquet"
+        else:
+            directories = [str(partition["year"])] if "year" in partition else []
+            extension += COMPRESSION_SUFFIXES.get(self.compression[c["path"]], "")
+        if delta:
+            stem = f"{stem}.delta-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}"
+            if self.worker_id:
+                stem = f"{stem}-{self.worker_id}"
+        return self.storage.url("/".join([c["path"], *directories, f"{stem}.{extension}"]))
+
+    def iter_partitions(self, c, df):
+        """
+        This method will split a dataset into its output partitions. NDJSON
+        objects are only partitioned by season, and a dataset with an empty
+        "partition_by" is written as a single partition.
+        """
+        keys = c.get("partition_by", ["year"])
+        if self.output_format != "parquet":
+            keys = [key for key in keys if key == "year"]
+        if not keys:
+            yield {}, df
+            return
+        for values, partition in df.partition_by(keys, as_dict=True).items():
+            yield dict(zip(keys, values)), partition
+
+    def object_frame(self, partition, df) -> pl.DataFrame:
+        """This method will drop the partition columns Parquet objects keep in their path."""
+        if self.output_format == "parquet":
+            return df.drop(partition.keys())
+        return df
+
+    def read_dataset(self, dataset, years=None, **filters) -> pl.DataFrame:
+        """
+        This method will read back the current rows of a dataset (bases plus
+        deltas), optionally only for some seasons and only the rows matching
+        column filters (see Catalog.prune). Partitions that cannot match are
+        pruned through the manifest before any object is opened. Parquet
+        partition values are added back as columns.
+        """
+        c = next(c for c in self.config if c["path"] == dataset)
+        if years is not None:
+            filters["year"] = set(years)
+        self.ensure_manifest(c)
+        frames = [
+            self.read_partition(c, partition, bases, deltas)
+            for partition, bases, deltas in self.catalog.prune(dataset, **filters)
+        ]
+        frames = [frame for frame in frames if not frame.is_empty()]
+        if not frames:
+            return pl.DataFrame()
+        df = pl.concat(frames, how="diagonal_relaxed")
+        predicate = row_filter(filters)
+        return df if predicate is None else df.filter(predicate)
+
+    def partition_from_path(self, dataset, path) -> dict:
+        """This method will parse the partition values out of an object path."""
+        segments = path.split(f"/{dataset}/", 1)[1].split("/")[:-1]
+        if self.output_format != "parquet":
+            return {"year": int(segments[0])} if segments else {}
+        partition = dict(segment.split("=", 1) for segment in segments)
+        if "year" in partition:
+            partition["year"] = int(partition["year"])
+        return partition
+
+    def prepare_dataframe(self, c, df):
+        """
+        This method will coerce the scraped strings of a dataset to their
+        declared dtypes and record the null and failure counts per column.
+        """
+        if not self.coerce_types:
+            return df
+        df, report = coerce_columns(df, STAT_DTYPES)
+        for column, counts in report.items():
+            if self.stats is not None:
+                prefix = f"pipeline/coercion/{c['path']}/{column}"
+                self.stats.inc_value(f"{prefix}/nulls", counts["nulls"])
+                self.stats.inc_value(f"{prefix}/failures", counts["failures"])
+            if counts["failures"]:
+                logger.warning(
+                    "%s.%s: %d value(s) could not be coerced to %s",
+                    c["path"],
+                    column,
+                    counts["failures"],
+                    counts["dtype"],
+                )
+        return df
+
+    @staticmethod
+    def approximate_size(values) -> int:
+        """This method will estimate the memory held by the values of a buffered row."""
+        return 64 + sum(len(v) + 49 for v in values if isinstance(v, str))
 
     def process_item(self, item, spider):
-        """This method will determine the item type and add it to the appropriate list."""
-        for c in self.config:
-            if isinstance(item, c["item_class"]):
-                c["items"].append(item)
+        """This method will determine the item type and add it to the appropriate buffer."""
+        if isinstance(item, RowRecord):
+            c = self.datasets_by_item_class.get(item.item_class)
+            if c is None:
+                return item
+            values = item.values
+            self.buffers[c["path"]].append(item.columns, values)
+        else:
+            c = self.datasets_by_item_class.get(type(item).__name__)
+            if c is None:
+                return item
+            values = item.values()
+            self.buffers[c["path"]].append_item(item)
+        if not self.streaming:
+            return item
+        buffer = self.buffers[c["path"]]
+        size = self.approximate_size(values)
+        buffer.nbytes += size
+        self.buffered_bytes += size
+        if len(buffer) >= self.flush_rows:
+            self.flush_dataset(c)
+            self.upload_pending()
+        if self.buffered_bytes >= self.max_buffer_bytes:
+            for dataset in self.config:
+                self.flush_dataset(dataset)
+            self.upload_pending()
         return item
 
+    def flush_dataset(self, c):
+        """
+        This method will queue the changed rows of every partition in the
+        buffer of a dataset for upload_pending.
+        """
+        buffer = self.buffers[c["path"]]
+        if not buffer:
+            return
+        started = time.monotonic()
+        self.observe("buffered_items", len(buffer), dataset=c["path"])
+        self.buffered_bytes -= buffer.nbytes
+        df = self.with_key_columns(c, self.prepare_dataframe(c, buffer.to_frame()))
+        buffer.clear()
+        if self.validator is not None:
+            self.validator.check_batch(c, df)
+        for partition, partition_df in self.iter_partitions(c, df):
+            self.write_partition(c, partition, partition_df)
+        self.observe("flush_seconds", time.monotonic() - started, dataset=c["path"])
+
     def close_spider(self, spider):
         """This method will determine call the upload method for each item type."""
-        # upload the items to the S3 bucket
+        started = time.monotonic()
+        try:
+            self.write_datasets(spider)
+        finally:
+            # the report is written when fail-fast stopped the writes as well
+            if self.validator is not None:
+                self.validator.write_report(spider.name)
+        for dataset, (raw, written) in self.written_bytes.items():
+            logger.info(
+                "%s: wrote %d bytes for %d raw bytes (%.0f%%)",
+                dataset,
+                written,
+                raw,
+                100 * written / raw if raw else 100,
+            )
+        self.observe(
+            "close_spider_seconds",
+            time.monotonic() - started,
+            pipeline=type(self).__name__,
+        )
+
+    def write_datasets(self, spider):
+        """This method will write whatever each dataset still holds, all datasets at once."""
         for c in self.config:
-            df = pl.DataFrame(dict(item) for item in c["items"])
-            if not df.is_empty():
-                year = df["year"].first()
-                path = f"s3://{self.s3_bucket_name}/{c['path']}/{year}/{c['file_name']}"
-                self.upload_items_to_s3(df=df, path=path)
+            self.flush_dataset(c)
+        # a worker only sees its share of the team pages
+        if self.validator is not None and not self.worker_id:
+            self.validator.check_teams(
+                getattr(spider, "unchanged_pages", ()),
+                getattr(spider, "scheduled_pages", ()),
+            )
+        self.upload_pending()
 
 
 class TeamsPagePipeline(ProFootballReferencePipeline):
@@ -69,63 +728,230 @@ class TeamsPagePipeline(ProFootballReferencePipeline):
     config = [
         {
             "item_class": TeamStatsAndRankingsItem,
-            "items": [],
             "path": "team_stats_and_rankings",
             "file_name": "team_stats_and_rankings.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year"],
+            "expect_all_teams": True,
         },
         {
             "item_class": TeamConversionsItem,
-            "items": [],
             "path": "team_conversions",
             "file_name": "team_conversions.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year"],
+            "expect_all_teams": True,
         },
         {
             "item_class": PlayerPasserItem,
-            "items": [],
             "path": "player_passer",
             "file_name": "player_passer.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year", "player_link"],
         },
         {
             "item_class": PlayerRusherAndReceivingItem,
-            "items": [],
             "path": "player_rusher_and_receiver",
             "file_name": "player_rusher_and_receiver.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year", "player_link"],
         },
         {
             "item_class": PlayerPuntAndKickReturnerItem,
-            "items": [],
             "path": "player_punt_and_kick_returner",
             "file_name": "player_punt_and_kick_returner.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year", "player_link"],
         },
         {
             "item_class": PlayerDefenseAndFumblesItem,
-            "items": [],
             "path": "player_defense_and_fumbles",
             "file_name": "player_defense_and_fumbles.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year", "player_link"],
         },
         {
             "item_class": PlayerKickerItem,
-            "items": [],
             "path": "player_kicker",
             "file_name": "player_kicker.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year", "player_link"],
         },
         {
             "item_class": PlayerPunterItem,
-            "items": [],
             "path": "player_punter",
             "file_name": "player_punter.json",
+            "partition_by": ["year", "team"],
+            "merge_key": ["team", "year", "player_link"],
         },
     ]
 
 
 class GameResultsPipeline(ProFootballReferencePipeline):
-    """This class will upload the game results items to a given S3 bucket key."""
+    """
+    This class will upload the game results items to a given S3 bucket key.
+    With RATINGS_ENABLED the team ratings are brought up to date from the
+    written games at close (not by the workers of a distributed crawl).
+    """
 
     config = [
         {
             "item_class": GameResultItem,
-            "items": [],
             "path": "game_results",
             "file_name": "game_results.json",
+            "partition_by": ["year"],
+            "merge_key": ["year", "week", "matchup"],
+            "key_columns": {"matchup": game_matchup},
+            # games not played yet have no stats
+            "null_check_rows": "winner_points",
         }
     ]
+    ratings = None
+
+    @classmethod
+    def from_settings(cls, settings, stats=None, signals=None):
+        pipeline = super().from_settings(settings, stats=stats, signals=signals)
+        if settings.getbool("RATINGS_ENABLED") and not pipeline.worker_id:
+            pipeline.ratings = TeamRatingsPipeline.from_settings(
+                settings, stats=stats, signals=signals
+            )
+        return pipeline
+
+    def close_spider(self, spider):
+        super().close_spider(spider)
+        if self.ratings is not None:
+            self.ratings.update_ratings(self)
+            self.ratings.close_spider(spider)
+
+
+class TeamRatingsPipeline(ProFootballReferencePipeline):
+    """
+    This class will keep the team_ratings dataset derived from game_results
+    (see pfr_ratings): season and all-time Elo and point differential per
+    team and week. update_ratings replays only the weeks stored after its
+    last saved state (team_ratings/_state.json) and writes their rows as
+    keyed upserts next to the scraped datasets.
+    """
+
+    config = [
+        {
+            "item_class": TeamRatingItem,
+            "path": "team_ratings",
+            "file_name": "team_ratings.json",
+            "partition_by": ["year"],
+            "merge_key": ["year", "week", "team"],
+        }
+    ]
+    k = 20.0
+    initial = 1500.0
+    reversion = 1 / 3
+
+    @classmethod
+    def from_settings(cls, settings, stats=None, signals=None):
+        pipeline = super().from_settings(settings, stats=stats, signals=signals)
+        pipeline.k = settings.getfloat("RATINGS_K", cls.k)
+        pipeline.initial = settings.getfloat("RATINGS_INITIAL", cls.initial)
+        pipeline.reversion = settings.getfloat("RATINGS_REVERSION", cls.reversion)
+        return pipeline
+
+    def state_path(self) -> str:
+        return f"{self.storage.bucket_name}/{self.config[0]['path']}/_state.json"
+
+    def load_state(self) -> dict | None:
+        try:
+            return json.loads(self.storage.cat_file(self.state_path()))
+        except FileNotFoundError:
+            return None
+
+    def update_ratings(self, games_pipeline, rebuild=False) -> int:
+        """
+        This method will replay the game weeks after the saved state (every
+        week with rebuild=True), write the new rating rows, save the state
+        and return the number of rows written.
+        """
+        started = time.monotonic()
+        saved = None if rebuild else self.load_state()
+        if saved is None:
+            games = games_pipeline.read_dataset("game_results")
+            state, season, through = None, None, None
+        else:
+            # the weeks after the state are all in its season or later ones
+            games = games_pipeline.read_dataset(
+                "game_results", year=(saved["season"], None)
+            )
+            state = pl.DataFrame(saved["teams"], schema=empty_state().schema)
+            season, through = saved["season"], tuple(saved["through"])
+        rows, state, season, through = replay_ratings(
+            games, state, season, through, self.k, self.initial, self.reversion
+        )
+        if rows.is_empty():
+            return 0
+        c = self.config[0]
+        for partition, partition_df in self.iter_partitions(c, rows):
+            self.write_partition(c, partition, partition_df)
+        self.upload_pending()
+        self.storage.pipe_file(
+            self.state_path(),
+            json.dumps(
+                {
+                    "season": season,
+                    "through": through,
+                    "teams": state.to_dicts(),
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                }
+            ).encode("utf-8"),
+        )
+        if self.stats is not None:
+            self.stats.inc_value("ratings/rows", rows.height)
+        logger.info(
+            "Updated team ratings through %s week %s: %d rows in %.1fs",
+            through[0],
+            rows["week"][-1],
+            rows.height,
+            time.monotonic() - started,
+        )
+        return rows.height
+
+
+class BoxscorePipeline(ProFootballReferencePipeline):
+    """This class will upload the boxscore items to a given S3 bucket key."""
+
+    config = [
+        {
+            "item_class": BoxscoreTeamStatsItem,
+            "path": "boxscore_team_stats",
+            "file_name": "boxscore_team_stats.json",
+            "partition_by": ["year"],
+            "merge_key": ["boxscore_link"],
+            # a boxscore's rows share its key
+            "unique_key": False,
+        },
+        {
+            "item_class": BoxscoreScoringItem,
+            "path": "boxscore_scoring",
+            "file_name": "boxscore_scoring.json",
+            "partition_by": ["year"],
+            "merge_key": ["boxscore_link"],
+            # a boxscore's rows share its key
+            "unique_key": False,
+        },
+    ]
+
+
+class PlayersPipeline(ProFootballReferencePipeline):
+    """
+    This class will upload the player bio items to a given S3 bucket key.
+    Bios are one unpartitioned dataset keyed on the player, so a player seen
+    again in a later season replaces their row and "year" holds the latest
+    season they were scraped for.
+    """
+
+    config = [
+        {
+            "item_class": PlayerBioItem,
+            "path": "player_bio",
+            "file_name": "player_bio.json",
+            "partition_by": [],
+            "merge_key": ["player_link"],
+        },
+    ]
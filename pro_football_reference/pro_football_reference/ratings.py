@@ -0,0 +1,35 @@
+"""
+This module will bring the team_ratings dataset up to date from the stored
+game_results, without crawling:
+
+    python -m pro_football_reference.ratings
+    python -m pro_football_reference.ratings --rebuild
+
+Only the weeks after the saved rating state are replayed; --rebuild
+replays every stored game from the first season.
+"""
+
+import argparse
+
+from scrapy.utils.project import get_project_settings
+
+from pro_football_reference.pipelines import GameResultsPipeline, TeamRatingsPipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rebuild", action="store_true", help="replay every game, ignoring the state"
+    )
+    args = parser.parse_args(argv)
+
+    settings = get_project_settings()
+    ratings = TeamRatingsPipeline.from_settings(settings)
+    rows = ratings.update_ratings(
+        GameResultsPipeline.from_settings(settings), rebuild=args.rebuild
+    )
+    print(f"Wrote {rows} team rating rows")
+
+
+if __name__ == "__main__":
+    main()
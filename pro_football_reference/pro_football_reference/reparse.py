@@ -0,0 +1,92 @@
+"""
+This module will re-derive the datasets of a spider from the local
+response archive on all cores, without touching the network:
+
+    python -m pro_football_reference.reparse teams_page --seasons 1970-2023
+
+Pages are parsed in a process pool and the resulting items are fed, in
+archive order, through the spider's ITEM_PIPELINES.
+"""
+
+import argparse
+import os
+import time
+from multiprocessing import Pool
+
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.misc import load_object
+from scrapy.utils.project import get_project_settings
+
+from pro_football_reference.utils.pfr_archive import ResponseArchive
+from pro_football_reference.utils.pfr_base import parse_seasons
+from pro_football_reference.utils.pfr_offline import item_from_record, parse_records
+
+_archive = None
+
+
+def _init_worker(archive_dir):
+    global _archive
+    _archive = ResponseArchive(archive_dir)
+
+
+def _parse_entry(task) -> list[tuple]:
+    spider_name, entry = task
+    # outside of a crawl there are no metrics or seen indexes to update
+    records, _, _ = parse_records(
+        spider_name,
+        entry["url"],
+        _archive.get(entry["content_hash"]),
+        entry["meta"],
+        entry["encoding"],
+    )
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("spider", help="spider name, e.g. teams_page or game_results")
+    parser.add_argument("--seasons", help="season range or list, e.g. 1970-2023")
+    parser.add_argument("--archive", help="archive directory (RESPONSE_ARCHIVE_DIR)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    settings = get_project_settings().copy()
+    spidercls = SpiderLoader.from_settings(settings).load(args.spider)
+    spidercls.update_settings(settings)
+    spider = spidercls(seasons=args.seasons)
+    archive_dir = args.archive or settings.get("RESPONSE_ARCHIVE_DIR")
+
+    archive = ResponseArchive(archive_dir)
+    seasons = parse_seasons(args.seasons) if args.seasons else None
+    entries = archive.entries(spidercls.name, seasons)
+    archive.close()
+    # the archived team pages are the pages this run expects
+    spider.scheduled_pages = {
+        (entry["year"], entry["team"]) for entry in entries if entry["team"]
+    }
+
+    pipelines = [
+        load_object(path).from_settings(settings)
+        for path in build_component_list(settings.getwithbase("ITEM_PIPELINES"))
+    ]
+    started = time.monotonic()
+    item_count = 0
+    with Pool(args.processes, initializer=_init_worker, initargs=(archive_dir,)) as pool:
+        tasks = ((spidercls.name, entry) for entry in entries)
+        for records in pool.imap(_parse_entry, tasks, chunksize=4):
+            for record in records:
+                item = item_from_record(record)
+                for pipeline in pipelines:
+                    item = pipeline.process_item(item, spider)
+                item_count += 1
+    for pipeline in pipelines:
+        pipeline.close_spider(spider)
+    print(
+        f"Reparsed {len(entries)} archived pages into {item_count} items "
+        f"with {args.processes} processes in {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+This module will let several crawl processes (workers) share one crawl.
+Set SCHEDULER to SharedQueueScheduler and give every worker its own
+PFR_WORKER_ID; each worker then enqueues the same start requests and
+leases the work units (season or team-season pages) from the shared queue.
+"""
+
+import re
+from datetime import datetime, timezone
+
+from scrapy import Request
+from scrapy.core.scheduler import BaseScheduler, Scheduler
+from scrapy.utils.misc import load_object
+from twisted.internet import task
+
+WORKER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class SharedQueueScheduler(BaseScheduler):
+    """
+    Requests with a season in their meta are work units: they go to the
+    shared queue (WORK_QUEUE_CLASS), which also acts as the dupefilter, so
+    the first worker to enqueue a unit wins and every unit is crawled once.
+    Everything else (retries, dont_filter requests) stays on the worker's
+    local Scrapy scheduler.
+
+    A worker renews its leases while it runs. When it finishes cleanly its
+    units are marked done; otherwise they go back to the queue, and the units
+    of a worker that died are handed out again once their lease expires.
+    The queue is named by WORK_QUEUE_NAME, formatted with the spider name
+    and today's date, so a new crawl does not inherit the units of the last.
+    """
+
+    def __init__(
+        self, crawler, queue, fallback, worker_id, queue_name, lease_seconds
+    ):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.queue = queue
+        self.fallback = fallback
+        self.worker_id = worker_id
+        self.queue_name = queue_name
+        self.lease_seconds = lease_seconds
+        self.spider = None
+        self.heartbeat = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        worker_id = settings.get("PFR_WORKER_ID")
+        if not worker_id or not WORKER_ID_PATTERN.match(worker_id):
+            raise ValueError(
+                "SharedQueueScheduler needs a PFR_WORKER_ID made of letters, "
+                f"digits, '-' and '_' (got {worker_id!r})"
+            )
+        return cls(
+            crawler,
+            load_object(settings.get("WORK_QUEUE_CLASS")).from_settings(settings),
+            Scheduler.from_crawler(crawler),
+            worker_id,
+            settings.get("WORK_QUEUE_NAME", "{spider}-{date}"),
+            settings.getfloat("WORK_QUEUE_LEASE_SECONDS", 600),
+        )
+
+    def open(self, spider):
+        self.spider = spider
+        self.queue_name = self.queue_name.format(
+            spider=spider.name, date=datetime.now(timezone.utc).date().isoformat()
+        )
+        self.heartbeat = task.LoopingCall(
+            self.queue.renew, self.queue_name, self.worker_id
+        )
+        self.heartbeat.start(self.lease_seconds / 3, now=False)
+        return self.fallback.open(spider)
+
+    def close(self, reason):
+        if self.heartbeat is not None and self.heartbeat.running:
+            self.heartbeat.stop()
+        if reason == "finished":
+            self.queue.complete(self.queue_name, self.worker_id)
+        else:
+            self.queue.release(self.queue_name, self.worker_id)
+        for state, count in self.queue.counts(self.queue_name).items():
+            self.stats.set_value(f"work_queue/{state}", count, spider=self.spider)
+        self.queue.close()
+        return self.fallback.close(reason)
+
+    def enqueue_request(self, request) -> bool:
+        if "year" not in request.meta or request.dont_filter:
+            return self.fallback.enqueue_request(request)
+        added = self.queue.put(
+            self.queue_name,
+            self.crawler.request_fingerprinter.fingerprint(request).hex(),
+            request.url,
+            request.callback.__name__ if request.callback else None,
+            {
+                key: value
+                for key, value in request.meta.items()
+                if isinstance(value, (str, int, float, bool))
+            },
+            request.priority,
+        )
+        self.stats.inc_value(
+            "work_queue/enqueued" if added else "work_queue/duplicates",
+            spider=self.spider,
+        )
+        return added
+
+    def next_request(self) -> Request | None:
+        request = self.fallback.next_request()
+        if request is not None:
+            return request
+        unit = self.queue.lease(self.queue_name, self.worker_id, self.lease_seconds)
+        if unit is None:
+            return None
+        self.stats.inc_value("work_queue/leased", spider=self.spider)
+        return Request(
+            unit["url"],
+            callback=(
+                getattr(self.spider, unit["callback"]) if unit["callback"] else None
+            ),
+            meta=unit["meta"],
+            priority=unit["priority"],
+            dont_filter=True,
+        )
+
+    def has_pending_requests(self) -> bool:
+        return self.fallback.has_pending_requests() or self.queue.has_available(
+            self.queue_name, self.lease_seconds
+        )
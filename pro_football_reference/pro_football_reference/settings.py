@@ -1,4 +1,3 @@
-from dotenv import load_dotenv
 import os
 
 # Scrapy settings for pro_football_reference project
@@ -10,7 +9,12 @@ import os
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
-load_dotenv()
+# Containers pass the credentials in the environment; python-dotenv is only
+# imported (and a .env file searched for) when they are not set.
+if "S3_BUCKET_NAME" not in os.environ:
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 BOT_NAME = "pro_football_reference"
 
@@ -25,12 +29,14 @@ NEWSPIDER_MODULE = "pro_football_reference.spiders"
 ROBOTSTXT_OBEY = True
 
 # Configure maximum concurrent requests performed by Scrapy (default: 16)
+# The request rate itself is set by the token bucket below
 CONCURRENT_REQUESTS = 1
 
 # Configure a delay for requests for the same website (default: 0)
 # See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
 # See also autothrottle settings and docs
-DOWNLOAD_DELAY = 15
+# Pacing is done by TokenBucketMiddleware; set back to 15 if it is disabled
+DOWNLOAD_DELAY = 0
 # The download delay setting will honor only one of:
 # CONCURRENT_REQUESTS_PER_DOMAIN = 1
 CONCURRENT_REQUESTS_PER_IP = 1
@@ -49,21 +55,30 @@ CONCURRENT_REQUESTS_PER_IP = 1
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-# SPIDER_MIDDLEWARES = {
-#    "pro_football_reference.middlewares.ProFootballReferenceSpiderMiddleware": 543,
-# }
+SPIDER_MIDDLEWARES = {
+    #    "pro_football_reference.middlewares.ProFootballReferenceSpiderMiddleware": 543,
+    # closest to the spider so only the callback itself is timed
+    "pro_football_reference.middlewares.CallbackMetricsMiddleware": 950,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-# DOWNLOADER_MIDDLEWARES = {
-#    "pro_football_reference.middlewares.ProFootballReferenceDownloaderMiddleware": 543,
-# }
+DOWNLOADER_MIDDLEWARES = {
+    # after HttpCacheMiddleware (900) so pages served from the cache never wait
+    # for a token; the response chain still reaches it before RetryMiddleware
+    "pro_football_reference.middlewares.TokenBucketMiddleware": 950,
+    # after HttpCompressionMiddleware (590) so decompressed bodies are archived
+    "pro_football_reference.middlewares.ResponseArchiveMiddleware": 580,
+    "pro_football_reference.middlewares.ConditionalRecrawlMiddleware": 543,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-# EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-# }
+EXTENSIONS = {
+    "pro_football_reference.extensions.BackfillProgress": 500,
+    "pro_football_reference.extensions.CrawlMetrics": 510,
+    "pro_football_reference.extensions.MemoryProfiler": 520,
+}
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -73,7 +88,8 @@ CONCURRENT_REQUESTS_PER_IP = 1
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-AUTOTHROTTLE_ENABLED = True
+# Disabled in favour of TokenBucketMiddleware
+AUTOTHROTTLE_ENABLED = False
 # The initial download delay
 AUTOTHROTTLE_START_DELAY = 10
 # The maximum download delay to be set in case of high latencies
@@ -100,6 +116,35 @@ FEED_EXPORT_ENCODING = "utf-8"
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+# optional S3 compatible endpoint, e.g. http://localhost:5000 for moto server
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+# where the datasets are kept: S3Storage (S3_BUCKET_NAME), LocalStorage (a
+# folder per bucket under LOCAL_STORAGE_PATH) or MemoryStorage (tests)
+STORAGE_CLASS = (
+    os.getenv("STORAGE_CLASS") or "pro_football_reference.utils.pfr_storage.S3Storage"
+)
+LOCAL_STORAGE_PATH = os.getenv("LOCAL_STORAGE_PATH") or ".pfr_state/storage"
+
+# pipeline buffering
+# Stream each dataset to S3 in batches instead of holding every item until close
+PIPELINE_STREAMING = False
+# Number of buffered rows that triggers a flush of a dataset when streaming
+PIPELINE_FLUSH_ROWS = 5000
+# Approximate memory cap for all buffered items; every dataset is flushed once reached
+PIPELINE_MAX_BUFFER_BYTES = 64 * 1024 * 1024
+# Output format of the datasets: "ndjson" or "parquet" (typed, zstd, hive partitioned)
+PIPELINE_OUTPUT_FORMAT = "ndjson"
+# Rows per Parquet row group (each row group carries min/max statistics)
+PIPELINE_PARQUET_ROW_GROUP_SIZE = 50_000
+# Coerce NDJSON columns to their declared dtypes too (Parquet output is always typed)
+PIPELINE_COERCE_TYPES = False
+# Compression of NDJSON objects: None, "gzip" or "zstd" (needs the zstandard
+# package). Compressed objects are renamed (file.json.gz), so readers of the
+# bucket must expect the suffix before a deployment opts in. Parquet objects are
+# always zstd compressed
+PIPELINE_COMPRESSION = os.getenv("PIPELINE_COMPRESSION") or None
+# per dataset overrides, e.g. {"player_passer": "zstd", "game_results": None}
+PIPELINE_DATASET_COMPRESSION = {}
 
 # team abbreviations
 TEAM_ABBREVIATIONS = [
@@ -136,3 +181,121 @@ TEAM_ABBREVIATIONS = [
     "crd",
     "sfo",
 ]
+
+# first season of each franchise that joined after 1960 (AFL and NFL); team pages
+# before these seasons do not exist and are skipped when backfilling
+TEAM_FIRST_SEASONS = {
+    "min": 1961,
+    "mia": 1966,
+    "atl": 1966,
+    "nor": 1967,
+    "cin": 1968,
+    "sea": 1976,
+    "tam": 1976,
+    "car": 1995,
+    "jax": 1995,
+    "rav": 1996,
+    "htx": 2002,
+}
+# seasons a franchise did not play (the Browns were suspended from 1996 to 1998)
+TEAM_INACTIVE_SEASONS = {
+    "cle": range(1996, 1999),
+}
+
+# log backfill progress and ETA every N seconds (0 disables the extension)
+BACKFILL_PROGRESS_INTERVAL = 60
+
+# conditional re-crawl: skip unchanged pages (unchanged rows are never rewritten)
+CONDITIONAL_RECRAWL_ENABLED = False
+# do not request pages of finished seasons that were already fetched once
+CONDITIONAL_RECRAWL_SKIP_FINAL_SEASONS = True
+# sqlite file keeping page fingerprints between runs
+FINGERPRINT_STORE_PATH = ".pfr_state/fingerprints.sqlite"
+
+# keep every fetched season page in a local compressed archive for offline reparsing
+RESPONSE_ARCHIVE_ENABLED = False
+RESPONSE_ARCHIVE_DIR = ".pfr_state/archive"
+
+# index of the boxscores already scraped by the boxscores spider
+BOXSCORE_INDEX_PATH = ".pfr_state/boxscores.sqlite"
+
+# latest season each player page was scraped for by the players spider
+PLAYER_INDEX_PATH = ".pfr_state/players.sqlite"
+
+# token bucket request pacing (replaces DOWNLOAD_DELAY and AutoThrottle)
+TOKEN_BUCKET_ENABLED = True
+# Sports Reference allows 20 requests per minute; keep a small margin
+TOKEN_BUCKET_RATE_PER_MINUTE = 18
+TOKEN_BUCKET_BURST = 1
+# lowest rate the bucket backs off to after repeated 429s
+TOKEN_BUCKET_MIN_RATE_PER_MINUTE = 1
+# consecutive successful responses before the rate is raised again, and by how much
+TOKEN_BUCKET_RECOVER_AFTER = 20
+TOKEN_BUCKET_RECOVERY_STEP = 1
+# pause used when a 429 has no Retry-After header
+TOKEN_BUCKET_DEFAULT_RETRY_AFTER = 60
+
+# worker processes the parse callbacks run in (0 parses on the reactor thread);
+# worth enabling for backfills served from the HTTP cache or the archive
+PARSE_PROCESSES = 0
+
+# opt-in latency and size histograms, exported at close for the Prometheus
+# node exporter textfile collector and as JSON ({spider} is the spider name)
+METRICS_ENABLED = False
+METRICS_PROMETHEUS_PATH = ".pfr_state/metrics/{spider}.prom"
+METRICS_JSON_PATH = ".pfr_state/metrics/{spider}.json"
+
+# opt-in memory profiling: RSS and tracemalloc samples attributed to spider
+# callbacks, project modules and pipeline buffers (slows the crawl down)
+MEMORY_PROFILE_ENABLED = False
+MEMORY_PROFILE_INTERVAL = 60
+# report written at close ({spider} is the spider name)
+MEMORY_PROFILE_PATH = ".pfr_state/memory/{spider}.json"
+# frames kept per allocation, and entries kept per breakdown in the report
+MEMORY_PROFILE_FRAMES = 25
+MEMORY_PROFILE_TOP = 20
+
+# objects uploaded at once when the datasets are written at close, and the
+# retries per object
+PIPELINE_UPLOAD_CONCURRENCY = 8
+PIPELINE_UPLOAD_RETRIES = 3
+
+# derived team_ratings dataset (season and all-time Elo, point differential),
+# updated from the new game_results weeks when the game_results crawl closes;
+# off by default since it reads and writes beyond the crawled datasets
+RATINGS_ENABLED = False
+# Elo K factor, starting rating and the share of the distance to the starting
+# rating the all-time Elo gives back between seasons
+RATINGS_K = 20
+RATINGS_INITIAL = 1500
+RATINGS_REVERSION = 1 / 3
+
+# opt-in checks of every flushed batch before it is written
+# (see utils/pfr_validation.py)
+VALIDATION_ENABLED = False
+# raise and stop the writes on a failed check instead of only logging it
+VALIDATION_FAIL_FAST = False
+# JSON report of the checks written at close ({spider} is the spider name)
+VALIDATION_REPORT_PATH = ".pfr_state/validation/{spider}.json"
+# a stat column null in more than this share of a batch fails the batch;
+# only batches of at least VALIDATION_MIN_ROWS rows are judged
+VALIDATION_MAX_NULL_RATE = 0.99
+VALIDATION_MIN_ROWS = 32
+# first season checked for team pages missing from the team datasets
+VALIDATION_TEAMS_SINCE = 1960
+
+# datasets are written as keyed upserts: each flush writes the changed rows of
+# a partition as a delta object; after this many deltas they are compacted
+PIPELINE_COMPACT_AFTER_DELTAS = 8
+
+# distributed crawl: run the same crawl in several containers with
+# -s SCHEDULER=pro_football_reference.scheduler.SharedQueueScheduler and a
+# distinct PFR_WORKER_ID each; every worker keeps its own token bucket rate
+PFR_WORKER_ID = os.getenv("PFR_WORKER_ID")
+# shared queue backend; the sqlite stand-in needs a path every worker can open
+WORK_QUEUE_CLASS = "pro_football_reference.utils.pfr_work_queue.SqliteWorkQueue"
+WORK_QUEUE_PATH = os.getenv("WORK_QUEUE_PATH", ".pfr_state/work_queue.sqlite")
+# units are shared between workers of the same queue name ({spider}, {date})
+WORK_QUEUE_NAME = "{spider}-{date}"
+# a unit whose worker stopped renewing it for this long is handed out again
+WORK_QUEUE_LEASE_SECONDS = 600
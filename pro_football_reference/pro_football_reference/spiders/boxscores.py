@@ -0,0 +1,115 @@
+"""
+This module will scrape the team stats and scoring summary of every game
+boxscore linked from the game_results dataset. Boxscores that were already
+scraped are recorded in a persistent SeenIndex (BOXSCORE_INDEX_PATH), so each
+run only requests games that are new since the last successful crawl.
+"""
+
+import scrapy
+from collections.abc import Iterable, Generator
+from typing import Any
+from urllib.parse import urlparse
+
+from pro_football_reference.items import BoxscoreScoringItem, BoxscoreTeamStatsItem
+from pro_football_reference.pipelines import GameResultsPipeline
+from pro_football_reference.utils.pfr_base import ProFootballReferenceBase
+from pro_football_reference.utils.pfr_row_extractor import compile_plan, index_cells
+from pro_football_reference.utils.pfr_seen_index import SeenIndex
+from pro_football_reference.utils.pfr_table_config import (
+    BOXSCORE_SCORING_CONFIG,
+    BOXSCORE_TEAM_STATS_CONFIG,
+)
+from pro_football_reference.utils.pfr_tables import find_tables, table_rows
+
+TEAM_STATS_PLAN = compile_plan(BOXSCORE_TEAM_STATS_CONFIG)
+SCORING_PLAN = compile_plan(BOXSCORE_SCORING_CONFIG)
+
+
+class BoxscoreSpider(ProFootballReferenceBase):
+    name = "boxscores"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = None
+
+    def start_requests(self) -> Iterable[scrapy.Request]:
+        import polars as pl
+
+        self.index = SeenIndex(self.settings.get("BOXSCORE_INDEX_PATH"))
+        games = GameResultsPipeline.from_settings(self.settings).read_dataset(
+            "game_results", set(self.get_season_years())
+        )
+        if games.is_empty():
+            self.logger.warning("No game_results found to follow")
+            return []
+        # games that have not been played yet have no score and only a preview link
+        links = (
+            games.filter(
+                pl.col("winner_points").is_not_null()
+                & pl.col("boxscore_link").str.starts_with("/boxscores/")
+            )
+            .select("year", "boxscore_link")
+            .unique(maintain_order=True)
+            .iter_rows()
+        )
+        return self.schedule(
+            scrapy.Request(
+                f"https://www.pro-football-reference.com{link}",
+                meta={"year": year, "boxscore_link": link},
+            )
+            for year, link in links
+            if link not in self.index
+        )
+
+    @classmethod
+    def update_settings(cls, settings):
+        """This method will set the ITEM_PIPELINES setting for the current spider."""
+        settings.set(
+            "ITEM_PIPELINES",
+            {"pro_football_reference.pipelines.BoxscorePipeline": 300},
+        )
+        return settings
+
+    def parse(self, response) -> Generator[scrapy.Item, Any, None]:
+        year = self.get_response_year(response)
+        # pages archived before their request meta was kept only have the URL
+        link = response.meta.get("boxscore_link") or urlparse(response.url).path
+        tables = find_tables(response, ("team_stats", "scoring"))
+
+        team_stats = tables.get("team_stats")
+        if team_stats is not None:
+            header = team_stats.xpath("./thead/tr")
+            vis_team = header.xpath("./th[@data-stat='vis_stat']/text()").get()
+            home_team = header.xpath("./th[@data-stat='home_stat']/text()").get()
+            for row in table_rows(team_stats):
+                item = BoxscoreTeamStatsItem(
+                    year=year,
+                    boxscore_link=link,
+                    vis_team=vis_team,
+                    home_team=home_team,
+                )
+                item.update(TEAM_STATS_PLAN.extract_cells(index_cells(row)))
+                yield item
+
+        quarter = None
+        for row in table_rows(tables.get("scoring")):
+            cells = index_cells(row)
+            item = BoxscoreScoringItem(year=year, boxscore_link=link)
+            item.update(SCORING_PLAN.extract_cells(cells))
+            # the quarter is only printed on the first score of each quarter
+            quarter = item["quarter"] or quarter
+            item["quarter"] = quarter
+            description = cells.get(("td", "description"))
+            if description is not None:
+                item["description"] = "".join(description.itertext()).strip()
+            yield item
+
+        self.scraped.append((link, year))
+
+    def closed(self, reason):
+        # only remember boxscores once the crawl (and the upload) finished cleanly
+        if self.index is None:
+            return
+        if reason == "finished":
+            self.index.add_many(self.scraped)
+        self.index.close()
@@ -1,50 +1,119 @@
 """
-This module will scrape the game results for a given season from Pro Football Reference.
+This module will scrape the game results for a given season (or, with
+-a seasons=1970-2023, a range of seasons) from Pro Football Reference.
 The results are stored in a JSON Lines file in an S3 bucket.
+
+In season (-a in_season=1) the weeks whose games all have a final score in
+the stored game_results are passed over, so a game-day refresh only parses
+and writes the rows of the open and upcoming weeks.
 """
 
 import scrapy
 from collections.abc import Iterable, Generator
 from typing import Any
-from pro_football_reference.items import GameResultItem
+from pro_football_reference.items import GameResultItem, RowRecord
+from pro_football_reference.pipelines import GameResultsPipeline
 from pro_football_reference.utils.pfr_base import ProFootballReferenceBase
 from pro_football_reference.utils.pfr_table_config import GAME_RESULTS_CONFIG
+from pro_football_reference.utils.pfr_row_extractor import (
+    cell_link,
+    child_text,
+    compile_plan,
+    first_text,
+    header_cell_text,
+    index_cells,
+)
 from pro_football_reference.settings import S3_BUCKET_NAME
 
+GAME_RESULTS_PLAN = compile_plan(GAME_RESULTS_CONFIG)
+GAME_RESULTS_COLUMNS = (
+    "year",
+    "game_date",
+    "boxscore_link",
+    "winner_points",
+    *GAME_RESULTS_PLAN.fields,
+)
+
 
 class GameResultsSpider(ProFootballReferenceBase):
     name = "game_results"
+    # only parse the weeks that are not final yet, e.g. -a in_season=1
+    in_season: int = 0
 
-    def parse(self, response) -> Generator[GameResultItem, Any, None]:
+    def parse(self, response) -> Generator[RowRecord, Any, None]:
+        year = self.get_response_year(response)
+        final_weeks = set(filter(None, response.meta.get("final_weeks", "").split(",")))
+        skipped = 0
         for row in response.css("#games > tbody > tr"):
-            if game_date := row.css("td[data-stat='game_date']::text").get():
-                game_result_item = GameResultItem(
-                    year=self.season_year,
-                    game_date=game_date,
-                    boxscore_link=row.css(
-                        "td[data-stat='boxscore_word'] a::attr(href)"
-                    ).get(),
-                    winner_points=row.css(
-                        "td[data-stat='pts_win'] > strong::text"
-                    ).get()
-                    or row.css("td[data-stat='pts_win']::text").get(),
+            if final_weeks and header_cell_text(row, "week_num") in final_weeks:
+                skipped += 1
+                continue
+            cells = index_cells(row)
+            if game_date := first_text(cells.get(("td", "game_date"))):
+                winner_points = cells.get(("td", "pts_win"))
+                yield RowRecord(
+                    GameResultItem.__name__,
+                    GAME_RESULTS_COLUMNS,
+                    (
+                        year,
+                        game_date,
+                        cell_link(cells.get(("td", "boxscore_word"))),
+                        child_text(winner_points, "strong")
+                        or first_text(winner_points),
+                        *GAME_RESULTS_PLAN.extract_cell_values(cells),
+                    ),
                 )
-                for config in GAME_RESULTS_CONFIG:
-                    game_result_item[config.attr] = self.get_table_item(
-                        table=row,
-                        data_stat=config.stat,
-                        table_part=config.table_part,
-                        index=config.index,
-                    )
-                yield game_result_item
+        if final_weeks:
+            self.observe("final_week_rows_skipped", skipped)
+
+    def get_final_weeks(self) -> dict[int, list[str]]:
+        """
+        This method will return the weeks of each season to crawl whose
+        stored games all have a final score.
+        """
+        import polars as pl
+
+        games = GameResultsPipeline.from_settings(self.settings).read_dataset(
+            "game_results", set(self.get_season_years())
+        )
+        if games.is_empty():
+            return {}
+        weeks = (
+            games.group_by("year", "week")
+            .agg(
+                (
+                    pl.col("winner_points").is_not_null()
+                    & pl.col("loser_points").is_not_null()
+                )
+                .all()
+                .alias("final")
+            )
+            .filter(pl.col("final"))
+            .sort("year", "week")
+        )
+        final_weeks = {}
+        for year, week in weeks.select("year", "week").iter_rows():
+            final_weeks.setdefault(int(year), []).append(str(week))
+        return final_weeks
 
     def start_requests(self) -> Iterable[scrapy.Request]:
-        self.update_season_year()
-        self.start_urls = [
-            f"https://www.pro-football-reference.com/years/{self.season_year}/games.htm"
-        ]
-        for url in self.start_urls:
-            yield scrapy.Request(url)
+        final_weeks = self.get_final_weeks() if int(self.in_season) else {}
+        requests = []
+        for year in self.get_season_years():
+            meta = {"year": year}
+            if year in final_weeks:
+                # a plain string so the weeks travel to parse pool workers too
+                meta["final_weeks"] = ",".join(final_weeks[year])
+                self.logger.info(
+                    "%s: skipping final weeks %s", year, meta["final_weeks"]
+                )
+            requests.append(
+                scrapy.Request(
+                    f"https://www.pro-football-reference.com/years/{year}/games.htm",
+                    meta=meta,
+                )
+            )
+        return self.schedule(requests)
 
     @classmethod
     def update_settings(cls, settings):
@@ -0,0 +1,129 @@
+"""
+This module will scrape the page of every player linked from the player
+tables of the teams_page datasets. A player appears in several tables
+(passing and rushing, returns and defense, ...) and with several teams, so
+links are deduplicated across tables, teams and seasons first. A persistent
+SeenIndex (PLAYER_INDEX_PATH) keeps the latest season each player was
+scraped for, and a player is only revisited when the datasets hold a newer
+season for them.
+"""
+
+from __future__ import annotations
+
+import re
+import scrapy
+from collections.abc import Iterable, Generator
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlparse
+
+from pro_football_reference.items import PlayerBioItem
+from pro_football_reference.pipelines import TeamsPagePipeline
+from pro_football_reference.utils.pfr_base import ProFootballReferenceBase
+from pro_football_reference.utils.pfr_seen_index import SeenIndex
+
+if TYPE_CHECKING:
+    import polars as pl
+
+PLAYER_DATASETS = [
+    "player_passer",
+    "player_rusher_and_receiver",
+    "player_punt_and_kick_returner",
+    "player_defense_and_fumbles",
+    "player_kicker",
+    "player_punter",
+]
+
+
+class PlayersSpider(ProFootballReferenceBase):
+    name = "players"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = None
+
+    def get_player_seasons(self) -> pl.DataFrame:
+        """This method will return one (player_link, latest year) row per distinct player."""
+        import polars as pl
+
+        pipeline = TeamsPagePipeline.from_settings(self.settings)
+        seasons = set(self.get_season_years())
+        frames = [
+            pipeline.read_dataset(dataset, seasons).select("player_link", "year")
+            for dataset in PLAYER_DATASETS
+        ]
+        frames = [frame for frame in frames if not frame.is_empty()]
+        if not frames:
+            return pl.DataFrame(schema={"player_link": pl.String, "year": pl.Int64})
+        return (
+            pl.concat(frames, how="vertical_relaxed")
+            .drop_nulls()
+            .group_by("player_link")
+            .agg(pl.col("year").cast(pl.Int64).max())
+            .sort("year", "player_link", descending=[True, False])
+        )
+
+    def start_requests(self) -> Iterable[scrapy.Request]:
+        self.index = SeenIndex(self.settings.get("PLAYER_INDEX_PATH"))
+        players = self.get_player_seasons()
+        requests = [
+            scrapy.Request(
+                f"https://www.pro-football-reference.com{link}",
+                meta={"year": year, "player_link": link},
+            )
+            for link, year in players.iter_rows()
+            if self.index.get(link, -1) < year
+        ]
+        self.logger.info(
+            "%d distinct players in the datasets, %d with a new season to scrape",
+            players.height,
+            len(requests),
+        )
+        return self.schedule(requests)
+
+    @classmethod
+    def update_settings(cls, settings):
+        """This method will set the ITEM_PIPELINES setting for the current spider."""
+        settings.set(
+            "ITEM_PIPELINES",
+            {"pro_football_reference.pipelines.PlayersPipeline": 300},
+        )
+        return settings
+
+    @staticmethod
+    def get_meta_line(meta, label) -> str | None:
+        """This method will return the text of the #meta line starting with a label."""
+        line = meta.xpath(f"./p[strong[starts-with(normalize-space(), '{label}')]]")
+        if not line:
+            return None
+        return " ".join(" ".join(line[0].xpath(".//text()").getall()).split())
+
+    def parse(self, response) -> Generator[PlayerBioItem, Any, None]:
+        meta = response.css("#meta > div:not(.media-item)")
+        position = re.search(
+            r"Position\s*:\s*([\w/-]+)", self.get_meta_line(meta, "Position") or ""
+        )
+        draft = self.get_meta_line(meta, "Draft")
+        item = PlayerBioItem(
+            year=self.get_response_year(response),
+            # pages archived before their request meta was kept only have the URL
+            player_link=response.meta.get("player_link") or urlparse(response.url).path,
+            player_name=meta.css("h1 span::text").get(),
+            position=position.group(1) if position else None,
+            height=meta.css("span[itemprop='height']::text").get(),
+            weight=meta.css("span[itemprop='weight']::text").get(),
+            birth_date=response.css("#necro-birth::attr(data-birth)").get(),
+            college=meta.xpath(
+                "./p[strong[starts-with(normalize-space(), 'College')]]/a/text()"
+            ).get(),
+            draft=draft.split(":", 1)[1].strip() if draft else None,
+        )
+        self.scraped.append((item["player_link"], item["year"]))
+        yield item
+
+    def closed(self, reason):
+        # only remember players once the crawl (and the upload) finished cleanly
+        if self.index is None:
+            return
+        if reason == "finished":
+            self.index.add_many(self.scraped)
+        self.index.close()
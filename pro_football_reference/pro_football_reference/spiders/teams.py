@@ -1,10 +1,8 @@
-import re
 import scrapy
 from collections.abc import Iterable, Generator
 from typing import Any
 from datetime import datetime
 
-import scrapy.http
 from pro_football_reference.utils.pfr_base import ProFootballReferenceBase
 from pro_football_reference.utils.pfr_table_config import (
     TEAM_STATS_AND_RANKINGS_CONFIG,
@@ -12,8 +10,20 @@ from pro_football_reference.utils.pfr_table_config import (
     PLAYER_CONFIG,
     PLAYER_PUNT_AND_KICK_RETURNER_CONFIG
 )
-from pro_football_reference.settings import TEAM_ABBREVIATIONS
+from pro_football_reference.utils.pfr_row_extractor import (
+    cell_link,
+    child_text,
+    compile_plan,
+    index_cells,
+)
+from pro_football_reference.utils.pfr_tables import find_tables, table_rows
+from pro_football_reference.settings import (
+    TEAM_ABBREVIATIONS,
+    TEAM_FIRST_SEASONS,
+    TEAM_INACTIVE_SEASONS,
+)
 from pro_football_reference.items import (
+    RowRecord,
     TeamStatsAndRankingsItem,
     TeamConversionsItem,
     PlayerPasserItem,
@@ -30,61 +40,81 @@ class TeamsPageSpider(ProFootballReferenceBase):
     config = [
         {
             "item_class": TeamStatsAndRankingsItem,
-            "table_selector": "#team_stats > tbody > tr",
-            "stats_config": TEAM_STATS_AND_RANKINGS_CONFIG,
+            "table_id": "team_stats",
+            "plan": compile_plan(TEAM_STATS_AND_RANKINGS_CONFIG),
         },
         {
             "item_class": TeamConversionsItem,
-            "table_selector": "#team_conversions > tbody > tr",
-            "stats_config": TEAM_CONVERSIONS_CONFIG,
+            "table_id": "team_conversions",
+            "plan": compile_plan(TEAM_CONVERSIONS_CONFIG),
         },
         {
             "item_class": PlayerPasserItem,
-            "table_selector": "#passing > tbody > tr",
-            "stats_config": PLAYER_CONFIG,
-            "link_selector": "td[data-stat='name_display'] a::attr(href)",
+            "table_id": "passing",
+            "plan": compile_plan(PLAYER_CONFIG),
+            "link_stat": "name_display",
         },
         {
             "item_class": PlayerRusherAndReceivingItem,
-            "table_selector": "#rushing_and_receiving > tbody > tr",
-            "stats_config": PLAYER_CONFIG,
-            "link_selector": "td[data-stat='name_display'] a::attr(href)",
+            "table_id": "rushing_and_receiving",
+            "plan": compile_plan(PLAYER_CONFIG),
+            "link_stat": "name_display",
         },
         {
             "item_class": PlayerPuntAndKickReturnerItem,
-            "table_selector": "#returns > tbody > tr",
-            "stats_config": PLAYER_PUNT_AND_KICK_RETURNER_CONFIG,
-            "link_selector": "td[data-stat='name_display'] a::attr(href)",
+            "table_id": "returns",
+            "plan": compile_plan(PLAYER_PUNT_AND_KICK_RETURNER_CONFIG),
+            "link_stat": "name_display",
         },
         {
             "item_class": PlayerDefenseAndFumblesItem,
-            "table_selector": "#defense > tbody > tr",
-            "stats_config": PLAYER_CONFIG,
-            "link_selector": "td[data-stat='name_display'] a::attr(href)",
+            "table_id": "defense",
+            "plan": compile_plan(PLAYER_CONFIG),
+            "link_stat": "name_display",
         },
         {
             "item_class": PlayerKickerItem,
-            "table_selector": "#kicking > tbody > tr",
-            "stats_config": PLAYER_CONFIG,
-            "link_selector": "td[data-stat='name_display'] a::attr(href)",
+            "table_id": "kicking",
+            "plan": compile_plan(PLAYER_CONFIG),
+            "link_stat": "name_display",
         },
         {
             "item_class": PlayerPunterItem,
-            "table_selector": "#punting > tbody > tr",
-            "stats_config": PLAYER_CONFIG,
-            "link_selector": "td[data-stat='name_display'] a::attr(href)",
+            "table_id": "punting",
+            "plan": compile_plan(PLAYER_CONFIG),
+            "link_stat": "name_display",
         },
     ]
 
-    def start_requests(self) -> Iterable[scrapy.Request]:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # column order of the RowRecords of each table
+        self.columns = {c["table_id"]: self.record_columns(c) for c in self.config}
+
+    @staticmethod
+    def record_columns(c) -> tuple[str, ...]:
+        """This method will return the column order of the RowRecords of a table."""
+        if "link_stat" in c:
+            return ("team", "year", "player_link", "player_name", *c["plan"].fields)
+        return ("team", "year", *c["plan"].fields)
 
-        self.update_season_year()
-        start_urls = [
-            f"https://www.pro-football-reference.com/teams/{team}/{self.season_year}.htm"
+    def start_requests(self) -> Iterable[scrapy.Request]:
+        return self.schedule(
+            scrapy.Request(
+                f"https://www.pro-football-reference.com/teams/{team}/{year}.htm",
+                meta={"team": team, "year": year},
+            )
+            for year in self.get_season_years()
             for team in TEAM_ABBREVIATIONS
-        ]
-        for url in start_urls:
-            yield scrapy.Request(url, meta={"team": url.split("/")[-2]})
+            if self.team_played_season(team, year)
+        )
+
+    @staticmethod
+    def team_played_season(team, year) -> bool:
+        """This method will tell whether a franchise has a team page for a season."""
+        return year >= TEAM_FIRST_SEASONS.get(team, 0) and year not in (
+            TEAM_INACTIVE_SEASONS.get(team, ())
+        )
 
     @classmethod
     def update_settings(cls, settings):
@@ -95,44 +125,37 @@ class TeamsPageSpider(ProFootballReferenceBase):
         )
         return settings
 
-    def populate_item_fields(self, item, table, stats_config):
-        for config in stats_config:
-            item[config.attr] = self.get_table_item(
-                table=table,
-                data_stat=config.stat,
-                index=config.index,
-                table_part=config.table_part,
-            )
-
-    def parse(self, response) -> Generator[TeamStatsAndRankingsItem, Any, None]:
+    def parse(self, response) -> Generator[RowRecord, Any, None]:
         team = response.meta["team"]
-        year = self.season_year
+        year = self.get_response_year(response)
 
-        # Extract table tags
-        table_tags = re.findall(
-            r"(<table.*?>.*?</table>)", response.text, flags=re.DOTALL
-        )
-
-        # Join the extracted table tags into a single string
-        cleaned_response_text = "".join(table_tags)
-
-        # Create a new response object with the cleaned response text
-        cleaned_response = scrapy.http.HtmlResponse(
-            url=response.url, body=cleaned_response_text, encoding="utf-8"
-        )
+        # Locate the live and comment-wrapped tables in one parse of the page
+        tables = find_tables(response, (c["table_id"] for c in self.config))
         for c in self.config:
-            table = cleaned_response.css(c["table_selector"])
-            if "link_selector" in c:
+            table = table_rows(tables.get(c["table_id"]))
+            self.observe("table_rows", len(table), table=c["table_id"])
+            item_class = c["item_class"].__name__
+            columns = self.columns[c["table_id"]]
+            plan = c["plan"]
+            if "link_stat" in c:
                 for row in table:
-                    item = c["item_class"](team=team, year=year)
-                    player_page_link = row.css(c["link_selector"]).get()
-                    item["player_link"] = player_page_link
-                    item["player_name"] = row.css(
-                        "td[data-stat='name_display'] > a::text"
-                    ).get()
-                    self.populate_item_fields(item, row, c["stats_config"])
-                    yield item
+                    cells = index_cells(row)
+                    name_cell = cells.get(("td", c["link_stat"]))
+                    yield RowRecord(
+                        item_class,
+                        columns,
+                        (
+                            team,
+                            year,
+                            cell_link(name_cell),
+                            child_text(name_cell, "a"),
+                            *plan.extract_cell_values(cells),
+                        ),
+                    )
             else:
-                item = c["item_class"](team=team, year=year)
-                self.populate_item_fields(item, table, c["stats_config"])
-                yield item
+                values = plan.extract(table)
+                yield RowRecord(
+                    item_class,
+                    columns,
+                    (team, year, *(values[field] for field in plan.fields)),
+                )
@@ -0,0 +1,112 @@
+"""
+This module will keep every fetched page in a compressed, content-addressed
+local archive so spiders can be re-run offline after a parser or config fix.
+
+Bodies are gzip compressed under objects/<sha256[:2]>/<sha256>.html.gz, so
+identical pages are stored once, and index.sqlite maps each URL to the
+latest body together with the spider, season and team it was fetched for
+and the plain values of its request meta (as JSON), which reparse hands back
+to the callback.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import time
+
+from pro_football_reference.utils.pfr_fingerprints import content_hash
+
+
+class ResponseArchive:
+    def __init__(self, directory, compress_level=6):
+        self.directory = directory
+        self.compress_level = compress_level
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(directory, "index.sqlite"))
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                spider TEXT NOT NULL,
+                year INTEGER,
+                team TEXT,
+                content_hash TEXT NOT NULL,
+                encoding TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_spider_year
+                ON responses (spider, year);
+            """
+        )
+        # archives written before the request meta was kept
+        columns = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(responses)")
+        }
+        if "meta" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE responses ADD COLUMN meta TEXT")
+
+    def object_path(self, digest) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.html.gz")
+
+    def put(
+        self, url, body, spider, year=None, team=None, encoding=None, meta=None
+    ) -> str:
+        """This method will store a body (once per content hash) and index it by URL."""
+        digest = content_hash(body)
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file first so a crash never leaves a truncated object
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=self.compress_level))
+            os.replace(temporary_path, path)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (url, spider, year, team, "
+                "content_hash, encoding, fetched_at, meta) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    spider,
+                    year,
+                    team,
+                    digest,
+                    encoding,
+                    time.time(),
+                    json.dumps(meta) if meta is not None else None,
+                ),
+            )
+        return digest
+
+    def get(self, digest) -> bytes:
+        with open(self.object_path(digest), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def entries(self, spider, seasons=None) -> list[dict]:
+        """
+        This method will list the archived pages of a spider, optionally for
+        some seasons. Pages archived without their request meta get the
+        season and team as meta.
+        """
+        rows = self.connection.execute(
+            "SELECT url, year, team, content_hash, encoding, meta FROM responses "
+            "WHERE spider = ? ORDER BY year DESC, url",
+            (spider,),
+        ).fetchall()
+        keys = ("url", "year", "team", "content_hash", "encoding", "meta")
+        entries = [dict(zip(keys, row)) for row in rows]
+        for entry in entries:
+            if entry["meta"] is None:
+                entry["meta"] = {"year": entry["year"], "team": entry["team"]}
+            else:
+                entry["meta"] = json.loads(entry["meta"])
+        if seasons is not None:
+            seasons = set(seasons)
+            entries = [entry for entry in entries if entry["year"] in seasons]
+        return entries
+
+    def close(self):
+        self.connection.close()
@@ -1,16 +1,160 @@
+import asyncio
 import scrapy
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from multiprocessing import get_context
+from scrapy import signals
+
+from pro_football_reference.extensions import metric_observed
+from pro_football_reference.utils.pfr_offline import (
+    item_from_record,
+    parse_records,
+    plain_values,
+)
+
+
+def parse_seasons(seasons) -> list[int]:
+    """
+    This method will turn a season argument such as "1970-2023",
+    "2019,2021,2023" or "1990-1995,2001" into a sorted list of years.
+    """
+    years = set()
+    for part in str(seasons).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+            years.update(range(min(start, end), max(start, end) + 1))
+        else:
+            years.add(int(part))
+    return sorted(years)
 
 
 class ProFootballReferenceBase(scrapy.Spider):
 
     season_year: int = datetime.now().year
     override_season_year: int = 1
+    # optional season range or list for a backfill, e.g. -a seasons=1970-2023
+    seasons: str | None = None
+    # number of pages scheduled by start_requests, used for progress reporting
+    expected_pages: int | None = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # plain spider arguments (-a in_season=1, ...), passed on to parse pool workers
+        self.spider_args = plain_values(kwargs)
+        # (key, year) of the pages parsed, for spiders that keep a SeenIndex
+        self.scraped = []
+        # metric observations collected outside of a crawl (parse pool workers)
+        self.observations = None
+        # (year, team) of the pages skipped because they did not change
+        self.unchanged_pages = set()
+        # (year, team) of the team pages scheduled by start_requests
+        self.scheduled_pages = set()
+        self.season_years = None
+        # process pool the parse callback runs in when PARSE_PROCESSES is set
+        self.parse_pool = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if processes := crawler.settings.getint("PARSE_PROCESSES"):
+            # spawn, not fork: the parent has the reactor and its threads running
+            spider.parse_pool = ProcessPoolExecutor(
+                processes, mp_context=get_context("spawn")
+            )
+            crawler.signals.connect(
+                spider.close_parse_pool, signal=signals.spider_closed
+            )
+        return spider
+
+    def close_parse_pool(self):
+        self.parse_pool.shutdown(cancel_futures=True)
+
+    async def parse_in_pool(self, response):
+        """
+        This method will run the parse callback for a response in the
+        process pool and yield its items in the order parse produced them,
+        leaving the reactor thread free for downloads and pipeline I/O.
+        Only plain meta values (year, team, ...) and spider arguments are
+        sent to the worker. The worker's metric observations and scraped
+        pages are applied to this spider.
+        """
+        records, observations, scraped = await asyncio.wrap_future(
+            self.parse_pool.submit(
+                parse_records,
+                self.name,
+                response.url,
+                response.body,
+                plain_values(response.meta),
+                response.encoding,
+                self.spider_args,
+            )
+        )
+        for name, value, labels in observations:
+            self.observe(name, value, **labels)
+        self.scraped.extend(scraped)
+        for record in records:
+            yield item_from_record(record)
+
+    def observe(self, name, value, **labels):
+        """
+        This method will send a metric observation to CrawlMetrics. Outside
+        of a crawl it is kept on observations when a parse pool worker
+        collects them, and dropped otherwise (offline reparse).
+        """
+        crawler = getattr(self, "crawler", None)
+        if crawler is not None:
+            crawler.signals.send_catch_log(
+                signal=metric_observed, name=name, value=value, labels=labels
+            )
+        elif self.observations is not None:
+            self.observations.append((name, value, labels))
+
+    def mark_unchanged(self, request):
+        """This method will record a page that was not parsed because it did not change."""
+        self.unchanged_pages.add((request.meta["year"], request.meta.get("team")))
 
     def update_season_year(self):
         if datetime.now().month < 9 and int(self.override_season_year):
             self.season_year = int(self.season_year) - 1
 
+    def get_season_years(self) -> list[int]:
+        """
+        This method will return the seasons to crawl, newest first, so an
+        interrupted backfill has completed the most recent seasons.
+        """
+        if self.season_years is None:
+            if self.seasons:
+                self.season_years = sorted(parse_seasons(self.seasons), reverse=True)
+            else:
+                self.update_season_year()
+                self.season_years = [int(self.season_year)]
+        return self.season_years
+
+    def get_response_year(self, response) -> int:
+        """This method will return the season a response belongs to."""
+        return int(response.meta.get("year", self.season_year))
+
+    def schedule(self, requests) -> list[scrapy.Request]:
+        """
+        This method will fix the crawl order of the start requests with
+        descending priorities (the default scheduler queue is LIFO) and
+        record how many pages (and which team pages) the crawl expects. With
+        a parse pool the requests are routed to parse_in_pool instead of
+        parse.
+        """
+        requests = list(requests)
+        for position, request in enumerate(requests):
+            request.priority = -position
+            if "team" in request.meta:
+                self.scheduled_pages.add((request.meta["year"], request.meta["team"]))
+            if self.parse_pool is not None and request.callback is None:
+                request.callback = self.parse_in_pool
+        self.expected_pages = len(requests)
+        return requests
+
     @staticmethod
     def get_table_item(table, data_stat, table_part, index) -> str:
         return (
@@ -0,0 +1,260 @@
+"""
+This module will keep a catalog manifest per dataset next to its objects
+(bucket/dataset/_manifest.json in the storage backend, see pfr_storage).
+Every object the pipelines write is recorded with its partition, row count,
+byte size, content hash, schema version and per-column min/max statistics,
+so readers can pick the partitions they need without listing or opening
+the objects.
+
+Workers of a distributed crawl each write their own manifest
+(_manifest.<worker>.json) with the objects they wrote; a dataset's catalog
+is the union of its manifests, and the next manifest saved by a single
+process folds the worker manifests back into _manifest.json. Objects
+written before manifests existed are inherited by the first manifest
+built for the dataset, a worker's included.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date, datetime, timezone
+
+from pro_football_reference.utils.pfr_lazy import lazy_import
+
+pl = lazy_import("polars")
+
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_PATTERN = "_manifest*.json"
+
+
+def schema_version(df: pl.DataFrame) -> str:
+    """This method will identify a schema by the hash of its column names and dtypes."""
+    schema = ",".join(f"{name}:{dtype}" for name, dtype in df.schema.items())
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()[:12]
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def column_statistics(df: pl.DataFrame) -> dict:
+    """This method will return {column: {min, max, nulls}} for the scalar columns of a frame."""
+    columns = [
+        name
+        for name, dtype in df.schema.items()
+        if dtype.is_numeric() or dtype in (pl.String, pl.Date, pl.Boolean)
+    ]
+    if not columns or df.is_empty():
+        return {}
+    row = df.select(
+        *(pl.col(name).min().alias(f"{name}\0min") for name in columns),
+        *(pl.col(name).max().alias(f"{name}\0max") for name in columns),
+        *(pl.col(name).null_count().alias(f"{name}\0nulls") for name in columns),
+    ).row(0, named=True)
+    return {
+        name: {
+            "min": _json_value(row[f"{name}\0min"]),
+            "max": _json_value(row[f"{name}\0max"]),
+            "nulls": row[f"{name}\0nulls"],
+        }
+        for name in columns
+    }
+
+
+def _matches(value, condition) -> bool:
+    if isinstance(condition, tuple):
+        low, high = condition
+        return (low is None or value >= low) and (high is None or value <= high)
+    if isinstance(condition, (set, frozenset, list)):
+        return value in condition
+    return value == condition
+
+
+def _may_contain(statistics, condition) -> bool:
+    """This method will tell whether an object's min/max range can hold a matching value."""
+    low, high = statistics["min"], statistics["max"]
+    if low is None:
+        return False
+    try:
+        if isinstance(condition, tuple):
+            start, end = condition
+            return (start is None or high >= start) and (end is None or low <= end)
+        if isinstance(condition, (set, frozenset, list)):
+            return any(low <= value <= high for value in condition)
+        return low <= condition <= high
+    except TypeError:
+        # filter and statistics of different types (e.g. a date given as text)
+        return True
+
+
+def row_filter(filters) -> pl.Expr | None:
+    """This method will turn reader filters into a polars predicate."""
+    predicates = []
+    for column, condition in filters.items():
+        if isinstance(condition, tuple):
+            low, high = condition
+            if low is not None:
+                predicates.append(pl.col(column) >= low)
+            if high is not None:
+                predicates.append(pl.col(column) <= high)
+        elif isinstance(condition, (set, frozenset, list)):
+            predicates.append(pl.col(column).is_in(list(condition)))
+        else:
+            predicates.append(pl.col(column) == condition)
+    if not predicates:
+        return None
+    return pl.all_horizontal(predicates)
+
+
+class Catalog:
+    """
+    The manifests of the datasets in a bucket, cached after the first read.
+    Filters are given per column as a value, a set of values or an
+    inclusive (low, high) range where either end may be None.
+    """
+
+    def __init__(self, fs, bucket_name, worker_id=None):
+        # a pfr_storage backend (or any object with its glob/cat_file/pipe_file/rm)
+        self.fs = fs
+        self.bucket_name = bucket_name
+        self.worker_id = worker_id
+        self.manifests = {}
+        # manifest files each dataset was loaded from
+        self.sources = {}
+        # objects of each dataset found in storage rather than in a manifest
+        self.inherited = {}
+
+    def manifest_path(self, dataset) -> str:
+        name = MANIFEST_NAME
+        if self.worker_id:
+            name = name.replace(".json", f".{self.worker_id}.json")
+        return f"{self.bucket_name}/{dataset}/{name}"
+
+    def load(self, dataset) -> dict | None:
+        """This method will return a dataset's manifest, or None when it has none yet."""
+        if dataset not in self.manifests:
+            paths = sorted(
+                self.fs.glob(f"{self.bucket_name}/{dataset}/{MANIFEST_PATTERN}")
+            )
+            if not paths:
+                return None
+            manifest = self.create(dataset)
+            for path in paths:
+                objects = json.loads(self.fs.cat_file(path))["objects"]
+                manifest["objects"].update(objects)
+            self.sources[dataset] = paths
+        return self.manifests[dataset]
+
+    def create(self, dataset) -> dict:
+        self.manifests[dataset] = {"dataset": dataset, "objects": {}}
+        self.sources[dataset] = []
+        return self.manifests[dataset]
+
+    def record(
+        self, dataset, path, partition, kind, df, size, digest, inherited=False
+    ):
+        """
+        This method will add or replace the entry of a written object, or with
+        inherited=True of an object written before the dataset had a manifest.
+        """
+        manifest = self.load(dataset) or self.create(dataset)
+        if inherited:
+            self.inherited.setdefault(dataset, set()).add(path.split("://", 1)[-1])
+        manifest["objects"][path.split("://", 1)[-1]] = {
+            "partition": partition,
+            "kind": kind,
+            "rows": df.height,
+            "bytes": size,
+            "content_hash": digest,
+            "schema_version": schema_version(df),
+            "columns": column_statistics(df),
+            "written_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def remove(self, dataset, paths):
+        manifest = self.load(dataset)
+        if manifest is not None:
+            for path in paths:
+                manifest["objects"].pop(path.split("://", 1)[-1], None)
+
+    def save(self, dataset):
+        """
+        This method will write a dataset's manifest. A worker only writes the
+        objects it wrote itself and those it inherited, since no other
+        manifest lists them; a single process writes the whole catalog and
+        removes the worker manifests it has folded in.
+        """
+        manifest = dict(self.manifests[dataset])
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+        path = self.manifest_path(dataset)
+        if self.worker_id:
+            marker = f"-{self.worker_id}."
+            inherited = self.inherited.get(dataset, set())
+            manifest["objects"] = {
+                object_path: entry
+                for object_path, entry in manifest["objects"].items()
+                if object_path in inherited
+                or marker in object_path.rsplit("/", 1)[-1]
+            }
+        self.fs.pipe_file(path, json.dumps(manifest).encode("utf-8"))
+        if not self.worker_id:
+            folded = [source for source in self.sources[dataset] if source != path]
+            if folded:
+                self.fs.rm(folded)
+            self.sources[dataset] = [path]
+
+    def partition_objects(self, dataset, partition) -> tuple[list, list]:
+        """This method will return the base and delta objects (oldest first) of a partition."""
+        objects = {"base": [], "delta": []}
+        for path, entry in sorted(self.load(dataset)["objects"].items()):
+            if entry["partition"] == partition:
+                objects[entry["kind"]].append(path)
+        return objects["base"], objects["delta"]
+
+    def prune(self, dataset, **filters) -> list[tuple[dict, list, list]]:
+        """
+        This method will return (partition, bases, deltas) for every partition
+        that can hold rows matching the filters: partition values must match
+        and, for other columns, at least one object's min/max range must
+        overlap. A partition is kept or dropped as a whole so that its deltas
+        are always read with their base.
+        """
+        partitions = {}
+        for path, entry in sorted(self.load(dataset)["objects"].items()):
+            key = json.dumps(entry["partition"], sort_keys=True)
+            partitions.setdefault(key, (entry["partition"], []))[1].append(
+                (path, entry)
+            )
+        selected = []
+        for partition, objects in partitions.values():
+            if not all(
+                _matches(partition[column], condition)
+                for column, condition in filters.items()
+                if column in partition
+            ):
+                continue
+            column_filters = {
+                column: condition
+                for column, condition in filters.items()
+                if column not in partition
+            }
+            if column_filters and not any(
+                all(
+                    column not in entry["columns"]
+                    or _may_contain(entry["columns"][column], condition)
+                    for column, condition in column_filters.items()
+                )
+                for _, entry in objects
+            ):
+                continue
+            selected.append(
+                (
+                    partition,
+                    [path for path, entry in objects if entry["kind"] == "base"],
+                    [path for path, entry in objects if entry["kind"] == "delta"],
+                )
+            )
+        return selected
@@ -0,0 +1,97 @@
+"""
+This module will turn the scraped stat strings into typed columns.
+It runs on whole DataFrame columns at flush time rather than per item,
+using the dtype declared on each StatConfig (see STAT_DTYPES).
+"""
+
+from __future__ import annotations
+
+from pro_football_reference.utils.pfr_lazy import lazy_import
+
+pl = lazy_import("polars")
+
+
+def _number(column: pl.Expr, dtype) -> pl.Expr:
+    return column.str.strip_chars().str.replace_all(",", "").cast(dtype, strict=False)
+
+
+def _clock(column: pl.Expr) -> pl.Expr:
+    """This method will convert "2:45" clock values to seconds."""
+    parts = column.str.strip_chars().str.extract_groups(r"^(\d+):(\d{2})$")
+    minutes = parts.struct.field("1").cast(pl.Int64, strict=False)
+    seconds = parts.struct.field("2").cast(pl.Int64, strict=False)
+    return minutes * 60 + seconds
+
+
+def _field_position(column: pl.Expr) -> pl.Expr:
+    """
+    This method will convert field position to yards from the team's own
+    goal line: "Own 28.3" -> 28.3, "Opp 45.0" -> 55.0.
+    """
+    parts = column.str.strip_chars().str.extract_groups(
+        r"^(?:(Own|Opp)\s+)?(\d+(?:\.\d+)?)$"
+    )
+    yards = parts.struct.field("2").cast(pl.Float64, strict=False)
+    return (
+        pl.when(parts.struct.field("1") == "Opp").then(100 - yards).otherwise(yards)
+    )
+
+
+COERCERS = {
+    "int": lambda column: _number(column, pl.Int64),
+    "float": lambda column: _number(column, pl.Float64),
+    "pct": lambda column: _number(column.str.replace(r"%\s*$", ""), pl.Float64),
+    "clock": _clock,
+    "field_position": _field_position,
+    "date": lambda column: column.str.strip_chars().str.to_date(
+        "%Y-%m-%d", strict=False
+    ),
+    "str": lambda column: column,
+}
+
+# polars dtype names, resolved on use so importing this module stays cheap
+DTYPES = {
+    "int": "Int64",
+    "float": "Float64",
+    "pct": "Float64",
+    "clock": "Int64",
+    "field_position": "Float64",
+    "date": "Date",
+    "str": "String",
+}
+
+
+def coerce_columns(df: pl.DataFrame, dtypes: dict) -> tuple[pl.DataFrame, dict]:
+    """
+    This method will coerce every string column with a declared dtype and
+    return the typed DataFrame with a per-column report of nulls (missing
+    in the scrape) and failures (text that did not match the dtype).
+    Columns that are entirely null are cast to their declared dtype so
+    every batch of a dataset shares one schema.
+    """
+    empty = [
+        pl.col(name).cast(getattr(pl, DTYPES[dtypes[name]]))
+        for name, dtype in df.schema.items()
+        if dtype == pl.Null and name in dtypes
+    ]
+    if empty:
+        df = df.with_columns(empty)
+    targets = [
+        name
+        for name, dtype in df.schema.items()
+        if dtype == pl.String and dtypes.get(name, "str") != "str"
+    ]
+    if not targets:
+        return df, {}
+    coerced = df.with_columns(
+        COERCERS[dtypes[name]](pl.col(name)).alias(name) for name in targets
+    )
+    report = {}
+    for name in targets:
+        nulls = df[name].null_count()
+        report[name] = {
+            "dtype": dtypes[name],
+            "nulls": nulls,
+            "failures": coerced[name].null_count() - nulls,
+        }
+    return coerced, report
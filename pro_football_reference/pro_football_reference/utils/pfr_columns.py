@@ -0,0 +1,53 @@
+"""
+This module will buffer dataset rows column by column. Compact RowRecords
+append their values straight into the column lists and the DataFrame is
+built from those lists, without a dict per row.
+"""
+
+from __future__ import annotations
+
+from pro_football_reference.utils.pfr_lazy import lazy_import
+
+pl = lazy_import("polars")
+
+
+class ColumnBuffer:
+    """Per-column value lists for the buffered rows of one dataset."""
+
+    __slots__ = ("columns", "length", "nbytes")
+
+    def __init__(self):
+        self.columns = {}
+        self.length = 0
+        # approximate memory held, maintained by the pipeline when streaming
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, names, values):
+        """This method will append one row given as column names and values."""
+        columns = self.columns
+        for name, value in zip(names, values):
+            column = columns.get(name)
+            if column is None:
+                # a column first seen now is null for the earlier rows
+                column = columns[name] = [None] * self.length
+            column.append(value)
+        self.length += 1
+        if len(columns) > len(names):
+            for column in columns.values():
+                if len(column) < self.length:
+                    column.append(None)
+
+    def append_item(self, item):
+        """This method will append a dict-like item (only its populated fields)."""
+        self.append(tuple(item.keys()), tuple(item.values()))
+
+    def to_frame(self) -> pl.DataFrame:
+        return pl.DataFrame(self.columns)
+
+    def clear(self):
+        self.columns = {}
+        self.length = 0
+        self.nbytes = 0
@@ -0,0 +1,61 @@
+"""
+This module will persist what earlier runs fetched so that unchanged pages
+can be skipped. Page fingerprints (content hash, ETag, Last-Modified) are
+keyed by URL.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from datetime import date
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def season_is_final(year, today=None) -> bool:
+    """This method will tell whether a season (including its playoffs) is over."""
+    today = today or date.today()
+    return today >= date(int(year) + 1, 3, 1)
+
+
+class FingerprintStore:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            );
+            """
+        )
+
+    def get_page(self, url) -> dict | None:
+        row = self.connection.execute(
+            "SELECT content_hash, etag, last_modified, fetched_at FROM pages WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("content_hash", "etag", "last_modified", "fetched_at"), row))
+
+    def set_pages(self, pages):
+        """This method will save (url, content_hash, etag, last_modified) fingerprints."""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                [(*page, now) for page in pages],
+            )
+
+    def close(self):
+        self.connection.close()
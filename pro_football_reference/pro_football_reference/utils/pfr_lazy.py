@@ -0,0 +1,37 @@
+"""
+This module will defer the import of the heavy dataframe and storage
+libraries (polars, s3fs, fsspec) until they are first used. Commands that
+only load the spiders (scrapy list, scrapy check, the start of a crawl) no
+longer pay for them; the first flush or dataset read does.
+
+    pl = lazy_import("polars")
+
+Modules that annotate with the lazy module must use
+"from __future__ import annotations" so the annotations are not evaluated
+at import time.
+
+Spider modules import polars inside the methods that need it instead: the
+SpiderLoader inspects every attribute of a spider module, which executes a
+lazy module kept there.
+"""
+
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    This method will return a module that is only executed on its first
+    attribute access, or the module itself when it is already imported.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
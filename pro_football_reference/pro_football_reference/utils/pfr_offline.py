@@ -0,0 +1,77 @@
+"""
+This module will run spider callbacks on stored page bodies outside of a
+crawl. Callbacks return plain (item class name, values) records, or the
+RowRecords themselves, so they can cross process boundaries cheaply and
+be rebuilt into items in order.
+"""
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.project import get_project_settings
+
+from pro_football_reference import items
+from pro_football_reference.items import RowRecord
+
+_spiders = {}
+
+
+def plain_values(mapping) -> dict:
+    """
+    This method will keep the plain (str, int, float, bool) values of a
+    mapping, e.g. request meta or spider arguments, which can be sent to
+    another process or stored as JSON.
+    """
+    return {
+        key: value
+        for key, value in mapping.items()
+        if isinstance(value, (str, int, float, bool))
+    }
+
+
+def get_spider(spider_name, spider_args=None):
+    """
+    This method will return one spider instance per process for a spider
+    name and its arguments (e.g. in_season).
+    """
+    spider_args = spider_args or {}
+    key = (spider_name, tuple(sorted(spider_args.items())))
+    if key not in _spiders:
+        loader = SpiderLoader.from_settings(get_project_settings())
+        _spiders[key] = loader.load(spider_name)(**spider_args)
+    return _spiders[key]
+
+
+def parse_records(
+    spider_name, url, body, meta, encoding=None, spider_args=None
+) -> tuple[list, list, list]:
+    """
+    This method will run a spider's parse callback on a body and return its
+    item records with the side effects of the callback: the metric
+    observations and the pages it recorded as scraped, for the crawl's
+    spider to apply.
+    """
+    response = HtmlResponse(
+        url=url,
+        body=body,
+        encoding=encoding or "utf-8",
+        request=Request(url, meta=meta),
+    )
+    spider = get_spider(spider_name, spider_args)
+    spider.observations = []
+    spider.scraped = []
+    records = []
+    for output in spider.parse(response):
+        if isinstance(output, RowRecord):
+            records.append(output)
+        elif not isinstance(output, Request):
+            records.append((type(output).__name__, dict(output)))
+    return records, spider.observations, spider.scraped
+
+
+def item_from_record(record):
+    """This method will rebuild an item from a (item class name, values) record."""
+    if isinstance(record, RowRecord):
+        return record
+    item_class_name, values = record
+    return getattr(items, item_class_name)(**values)
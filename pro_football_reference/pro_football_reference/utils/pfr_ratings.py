@@ -0,0 +1,273 @@
+"""
+This module will rate the teams from the game_results dataset: an Elo
+rating per season (every team starts each season at the initial rating),
+an all-time Elo carried across seasons (regressed toward the initial rating
+between seasons) and season and all-time point differential per game.
+
+Elo depends on the order of the games, so the games are replayed one week
+at a time, all of a week's games at once as polars expressions. The
+ratings after the last replayed week are kept as a state, and an update
+only replays the weeks that came after it.
+"""
+
+from __future__ import annotations
+
+from pro_football_reference.utils.pfr_lazy import lazy_import
+
+pl = lazy_import("polars")
+
+# playoff rounds are ordered after the regular season weeks
+PLAYOFF_WEEKS = {"WildCard": 101, "Division": 102, "ConfChamp": 103, "SuperBowl": 104}
+OTHER_PLAYOFF_WEEK = 100
+
+STATE_COLUMNS = {
+    "team": "String",
+    "elo": "Float64",
+    "season_elo": "Float64",
+    "games": "Int64",
+    "point_differential": "Int64",
+    "season_games": "Int64",
+    "season_point_differential": "Int64",
+}
+
+
+def prepare_games(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    This method will type the game_results columns the ratings need and
+    order the weeks of a season (numbered weeks, then the playoff rounds).
+    """
+    week = pl.col("week").cast(pl.String).str.strip_chars()
+    points = [
+        pl.col(name).cast(pl.String).str.strip_chars().cast(pl.Int64, strict=False)
+        for name in ("winner_points", "loser_points")
+    ]
+    return (
+        df.select(
+            pl.col("year").cast(pl.Int64, strict=False),
+            week.alias("week"),
+            pl.coalesce(
+                week.cast(pl.Int64, strict=False),
+                week.replace_strict(PLAYOFF_WEEKS, default=None, return_dtype=pl.Int64),
+                pl.when(week.is_not_null()).then(pl.lit(OTHER_PLAYOFF_WEEK)),
+            ).alias("week_order"),
+            pl.col("winning_team").cast(pl.String),
+            pl.col("losing_team").cast(pl.String),
+            *points,
+        )
+        .filter(
+            pl.col("year").is_not_null()
+            & pl.col("week_order").is_not_null()
+            & pl.col("winning_team").is_not_null()
+            & pl.col("losing_team").is_not_null()
+        )
+        .with_columns(
+            pl.all_horizontal(
+                pl.col("winner_points").is_not_null(),
+                pl.col("loser_points").is_not_null(),
+            ).alias("played")
+        )
+    )
+
+
+def weeks_to_replay(games: pl.DataFrame, through) -> list[tuple[int, int]]:
+    """
+    This method will return the (year, week_order) of the weeks after the
+    state, in order. The latest season is only replayed up to its first week
+    with a game that has no score yet, so a week in progress is replayed
+    whole on the next update.
+    """
+    if games.is_empty():
+        return []
+    weeks = (
+        games.group_by("year", "week_order")
+        .agg(pl.col("played").all())
+        .sort("year", "week_order")
+    )
+    if through is not None:
+        year, week_order = through
+        weeks = weeks.filter(
+            (pl.col("year") > year)
+            | ((pl.col("year") == year) & (pl.col("week_order") > week_order))
+        )
+    latest = games["year"].max()
+    unplayed = (~pl.col("played") & (pl.col("year") == latest)).cast(pl.Int64)
+    weeks = weeks.filter(unplayed.cum_sum() == 0)
+    return list(weeks.select("year", "week_order").iter_rows())
+
+
+def empty_state() -> pl.DataFrame:
+    return pl.DataFrame(
+        schema={name: getattr(pl, dtype) for name, dtype in STATE_COLUMNS.items()}
+    )
+
+
+def _elo_shift(winner, loser, margin, k) -> pl.Expr:
+    """
+    This method will return the Elo points the winner takes from the loser:
+    k times the result minus the expected result, scaled by the margin of
+    victory (less so when the favourite wins) as in the FiveThirtyEight model.
+    """
+    expected = 1 / (1 + pl.lit(10.0).pow((loser - winner) / 400))
+    result = pl.when(margin == 0).then(0.5).otherwise(1.0)
+    favourite = 2.2 / ((winner - loser) * 0.001 + 2.2)
+    multiplier = (
+        pl.when(margin == 0)
+        .then(1.0)
+        .otherwise((margin.cast(pl.Float64) + 1).log() * favourite)
+    )
+    return k * multiplier * (result - expected)
+
+
+def play_week(state, games, k, initial) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    This method will apply the played games of one week to the ratings and
+    return the new state and the changes of the teams that played.
+    """
+    teams = pl.concat(
+        [
+            games.select(pl.col("winning_team").alias("team")),
+            games.select(pl.col("losing_team").alias("team")),
+        ]
+    ).unique()
+    new_teams = teams.join(state, on="team", how="anti").with_columns(
+        pl.lit(initial).alias("elo"),
+        pl.lit(initial).alias("season_elo"),
+        *(
+            pl.lit(0, dtype=pl.Int64).alias(name)
+            for name in (
+                "games",
+                "point_differential",
+                "season_games",
+                "season_point_differential",
+            )
+        ),
+    )
+    state = pl.concat([state, new_teams], how="diagonal_relaxed")
+
+    def ratings(side):
+        return state.select(
+            pl.col("team").alias(f"{side}_team"),
+            pl.col("elo").alias(f"{side}_elo"),
+            pl.col("season_elo").alias(f"{side}_season_elo"),
+        )
+
+    margin = pl.col("winner_points") - pl.col("loser_points")
+    shifts = (
+        games.rename({"winning_team": "winner_team", "losing_team": "loser_team"})
+        .join(ratings("winner"), on="winner_team")
+        .join(ratings("loser"), on="loser_team")
+        .select(
+            "winner_team",
+            "loser_team",
+            margin.alias("margin"),
+            _elo_shift(pl.col("winner_elo"), pl.col("loser_elo"), margin, k).alias(
+                "elo_shift"
+            ),
+            _elo_shift(
+                pl.col("winner_season_elo"), pl.col("loser_season_elo"), margin, k
+            ).alias("season_elo_shift"),
+        )
+    )
+    changes = (
+        pl.concat(
+            [
+                shifts.select(
+                    pl.col("winner_team").alias("team"),
+                    pl.col("elo_shift").alias("elo_change"),
+                    pl.col("season_elo_shift").alias("season_elo_change"),
+                    pl.col("margin").alias("margin"),
+                ),
+                shifts.select(
+                    pl.col("loser_team").alias("team"),
+                    (-pl.col("elo_shift")).alias("elo_change"),
+                    (-pl.col("season_elo_shift")).alias("season_elo_change"),
+                    (-pl.col("margin")).alias("margin"),
+                ),
+            ]
+        )
+        .group_by("team")
+        .agg(
+            pl.col("elo_change").sum(),
+            pl.col("season_elo_change").sum(),
+            pl.col("margin").sum(),
+            pl.len().cast(pl.Int64).alias("played"),
+        )
+    )
+    state = (
+        state.join(changes, on="team", how="left")
+        .with_columns(
+            pl.col("elo") + pl.col("elo_change").fill_null(0.0),
+            pl.col("season_elo") + pl.col("season_elo_change").fill_null(0.0),
+            pl.col("games") + pl.col("played").fill_null(0),
+            pl.col("point_differential") + pl.col("margin").fill_null(0),
+            pl.col("season_games") + pl.col("played").fill_null(0),
+            pl.col("season_point_differential") + pl.col("margin").fill_null(0),
+        )
+        .select(list(STATE_COLUMNS))
+    )
+    return state, changes.select("team", "elo_change")
+
+
+def start_season(state, initial, reversion) -> pl.DataFrame:
+    """This method will regress the all-time Elo and reset the season ratings."""
+    return state.with_columns(
+        (initial + (pl.col("elo") - initial) * (1 - reversion)).alias("elo"),
+        pl.lit(initial).alias("season_elo"),
+        pl.lit(0, dtype=pl.Int64).alias("season_games"),
+        pl.lit(0, dtype=pl.Int64).alias("season_point_differential"),
+    )
+
+
+def replay_ratings(
+    games,
+    state=None,
+    season=None,
+    through=None,
+    k=20.0,
+    initial=1500.0,
+    reversion=1 / 3,
+) -> tuple[pl.DataFrame, pl.DataFrame, int | None, tuple | None]:
+    """
+    This method will replay the weeks of game_results rows after the state
+    (all of them without a state) and return the ratings of every team that
+    played, one row per team and week, with the new state, its season and
+    the last replayed (year, week_order).
+    """
+    state = empty_state() if state is None else state
+    if games.is_empty():
+        return pl.DataFrame(), state, season, through
+    games = prepare_games(games)
+    rows = []
+    played = games.filter(pl.col("played"))
+    by_week = played.partition_by("year", "week_order", as_dict=True)
+    for year, week_order in weeks_to_replay(games, through):
+        if year != season:
+            state = start_season(state, initial, reversion)
+            season = year
+        week_games = by_week.get((year, week_order))
+        through = (year, week_order)
+        if week_games is None:
+            continue
+        state, changes = play_week(state, week_games, k, initial)
+        rows.append(
+            state.join(changes, on="team", how="inner").select(
+                pl.lit(year, dtype=pl.Int64).alias("year"),
+                pl.lit(week_games["week"][0]).alias("week"),
+                pl.lit(week_order, dtype=pl.Int64).alias("week_order"),
+                "team",
+                "elo",
+                "elo_change",
+                "season_elo",
+                "games",
+                (pl.col("point_differential") / pl.col("games")).alias(
+                    "point_differential_per_game"
+                ),
+                "season_games",
+                (pl.col("season_point_differential") / pl.col("season_games")).alias(
+                    "season_point_differential_per_game"
+                ),
+            )
+        )
+    if not rows:
+        return pl.DataFrame(), state, season, through
+    return pl.concat(rows), state, season, through
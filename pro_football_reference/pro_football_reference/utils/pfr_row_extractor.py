@@ -0,0 +1,131 @@
+"""
+This module compiles the StatConfig lists into extraction plans.
+A plan walks the cells of each <tr> once, maps data-stat to text and
+fills every configured attribute from that map instead of running a
+separate CSS query per stat.
+"""
+
+from functools import lru_cache
+
+
+def first_text(element) -> str | None:
+    """This method will return the first direct text node of an element (same as ::text + .get())."""
+    if element is None:
+        return None
+    if element.text is not None:
+        return element.text
+    for child in element:
+        if child.tail is not None:
+            return child.tail
+    return None
+
+
+def child_text(cell, tag) -> str | None:
+    """This method will return the first text node of the first direct child with the given tag."""
+    if cell is None:
+        return None
+    return first_text(cell.find(tag))
+
+
+def link_text(cell) -> str | None:
+    """
+    This method will return the text of the first link inside a cell (at any
+    depth, e.g. a bold winner), or the cell's own text when it has no link.
+    """
+    if cell is None:
+        return None
+    for anchor in cell.iter("a"):
+        return first_text(anchor)
+    return first_text(cell)
+
+
+def cell_link(cell) -> str | None:
+    """This method will return the href of the first link inside a cell."""
+    if cell is None:
+        return None
+    for anchor in cell.iter("a"):
+        href = anchor.get("href")
+        if href is not None:
+            return href
+    return None
+
+
+def header_cell_text(row, data_stat) -> str | None:
+    """
+    This method will return the text of a row's first <th> when it has the
+    given data-stat, without indexing the rest of the row.
+    """
+    cell = row.root.find("th")
+    if cell is None or cell.get("data-stat") != data_stat:
+        return None
+    return first_text(cell)
+
+
+def index_cells(row) -> dict:
+    """This method will map (table_part, data-stat) to the cell element for a single <tr>."""
+    cells = {}
+    for cell in row.root.iterchildren("th", "td"):
+        data_stat = cell.get("data-stat")
+        if data_stat is not None:
+            cells.setdefault((cell.tag, data_stat), cell)
+    return cells
+
+
+class ExtractionPlan:
+    """A StatConfig list compiled into per-row cell lookups."""
+
+    __slots__ = ("fields", "keys", "readers", "lookups")
+
+    def __init__(self, stats_config):
+        self.fields = tuple(config.attr for config in stats_config)
+        self.keys = tuple((config.table_part, config.stat) for config in stats_config)
+        self.readers = tuple(
+            link_text if config.link else first_text for config in stats_config
+        )
+        grouped = {}
+        for config, read in zip(stats_config, self.readers):
+            grouped.setdefault(config.index, []).append(
+                ((config.table_part, config.stat), config.attr, read)
+            )
+        self.lookups = tuple(
+            (index, tuple(row_lookups)) for index, row_lookups in grouped.items()
+        )
+
+    def extract_cells(self, cells) -> dict:
+        """This method will fill every configured attribute from an already indexed row."""
+        values = {}
+        for _, row_lookups in self.lookups:
+            for key, attr, read in row_lookups:
+                values[attr] = read(cells.get(key))
+        return values
+
+    def extract_cell_values(self, cells) -> tuple:
+        """This method will return the configured values of an indexed row in fields order."""
+        return tuple(read(cells.get(key)) for key, read in zip(self.keys, self.readers))
+
+    def extract(self, table) -> dict:
+        """
+        This method will fill every configured attribute from a row
+        or, for configs with an index, from the rows of a table.
+        """
+        values = {}
+        for index, row_lookups in self.lookups:
+            if index is None:
+                cells = index_cells(table)
+            elif index < len(table):
+                cells = index_cells(table[index])
+            else:
+                cells = {}
+            for key, attr, read in row_lookups:
+                values[attr] = read(cells.get(key))
+        return values
+
+
+@lru_cache(maxsize=None)
+def _compile_plan(stats_config: tuple) -> ExtractionPlan:
+    return ExtractionPlan(stats_config)
+
+
+def compile_plan(stats_config) -> ExtractionPlan:
+    """This method will compile a StatConfig list once and reuse the plan on later calls."""
+    return _compile_plan(tuple(stats_config))
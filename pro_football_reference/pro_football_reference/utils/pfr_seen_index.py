@@ -0,0 +1,58 @@
+"""
+This module will keep a persistent, compact index of the pages a spider
+has already scraped so that only new pages are requested on later runs.
+Keys are stored as 64-bit blake2b digests (sqlite INTEGER PRIMARY KEY),
+about 20 bytes per entry on disk whatever the key length.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+
+
+def key_digest(key) -> int:
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class SeenIndex:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "key INTEGER PRIMARY KEY, value INTEGER, seen_at REAL NOT NULL)"
+        )
+
+    def __contains__(self, key) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM seen WHERE key = ?", (key_digest(key),)
+            ).fetchone()
+            is not None
+        )
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def get(self, key, default=None):
+        """This method will return the value stored with a key (e.g. a season)."""
+        row = self.connection.execute(
+            "SELECT value FROM seen WHERE key = ?", (key_digest(key),)
+        ).fetchone()
+        return default if row is None else row[0]
+
+    def add_many(self, entries):
+        """This method will save (key, value) pairs, replacing earlier values."""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO seen VALUES (?, ?, ?)",
+                [(key_digest(key), value, now) for key, value in entries],
+            )
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,347 @@
+"""
+This module will keep the objects the pipelines write. A storage backend is
+picked with the STORAGE_CLASS setting and built with from_settings:
+
+    S3Storage      the S3 bucket (S3_BUCKET_NAME), or an S3 stand-in at
+                   S3_ENDPOINT_URL, through one shared s3fs client
+    LocalStorage   a directory (LOCAL_STORAGE_PATH) holding one folder per
+                   bucket, for offline runs and local benchmarks
+    MemoryStorage  a dict shared by the pipelines of one process, for tests
+
+Every backend takes object paths as "bucket/dataset/..." (a scheme prefix
+such as s3:// is ignored) and offers the glob, cat_file, pipe_file and rm
+calls the catalog and the pipelines use, plus pipe_files to write a batch
+of objects with retries. A missing path or a denied write is raised at
+once, since retrying it cannot succeed.
+
+It also holds the streaming compressors used for NDJSON objects: gzip from
+the standard library and zstd through the optional zstandard package.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import gzip
+import io
+import logging
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from functools import cached_property
+
+logger = logging.getLogger(__name__)
+
+# file name suffix of every supported NDJSON compression
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# write errors that are raised without a retry
+PERMANENT_ERRORS = (FileNotFoundError, PermissionError)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstd compression needs the zstandard package (pip install zstandard)"
+        ) from None
+    return zstandard
+
+
+def check_compression(compression):
+    """This method will reject an unknown compression before anything is written."""
+    if compression is None:
+        return
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression == "zstd":
+        _zstandard()
+
+
+class CountingWriter(io.RawIOBase):
+    """A write-only stream that counts the (uncompressed) bytes written through it."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.nbytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.stream.write(data)
+        self.nbytes += len(data)
+        return len(data)
+
+
+def compress_stream(buffer, compression):
+    """This method will wrap a binary buffer in a compressing writer."""
+    if compression == "gzip":
+        # mtime=0 keeps the output (and its content hash) stable between runs
+        return gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6, mtime=0)
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor(level=3).stream_writer(
+            buffer, closefd=False
+        )
+    raise ValueError(f"Unsupported compression: {compression}")
+
+
+def decompress(data, path) -> bytes:
+    """This method will decompress an object according to the suffix of its path."""
+    if path.endswith(COMPRESSION_SUFFIXES["gzip"]):
+        return gzip.decompress(data)
+    if path.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        return _zstandard().ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+    return data
+
+
+def strip_compression_suffix(name) -> str:
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name.removesuffix(suffix)
+    return name
+
+
+def _key(path) -> str:
+    return path.split("://", 1)[-1]
+
+
+def _glob_pattern(pattern) -> re.Pattern:
+    """This method will translate a glob with ** into a regex over object keys."""
+    parts = []
+    for token in re.split(r"(\*\*/|\*\*|\*|\?)", pattern):
+        if token == "**/":
+            parts.append("(?:.*/)?")
+        elif token == "**":
+            parts.append(".*")
+        elif token == "*":
+            parts.append("[^/]*")
+        elif token == "?":
+            parts.append("[^/]")
+        else:
+            parts.append(re.escape(token))
+    return re.compile("".join(parts) + r"\Z")
+
+
+class Storage(ABC):
+    """
+    The interface of a storage backend. Subclasses implement the single
+    object calls; pipe_files writes a batch one object at a time.
+    """
+
+    scheme = ""
+
+    def __init__(self, bucket_name):
+        self.bucket_name = bucket_name
+
+    def url(self, key) -> str:
+        """This method will return the path of a key in the bucket."""
+        return f"{self.scheme}{self.bucket_name}/{key}"
+
+    @abstractmethod
+    def glob(self, pattern) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def cat_file(self, path) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def pipe_file(self, path, data):
+        raise NotImplementedError
+
+    @abstractmethod
+    def rm(self, paths):
+        raise NotImplementedError
+
+    def pipe_files(self, objects, concurrency, retries) -> list[tuple[float, int]]:
+        """
+        This method will write (path, data) objects, retrying each one up to
+        retries times, and return (seconds, retries) per object.
+        """
+        results = []
+        for path, data in objects:
+            attempt = 0
+            while True:
+                started = time.monotonic()
+                try:
+                    self.pipe_file(path, data)
+                    break
+                except PERMANENT_ERRORS:
+                    raise
+                except OSError as error:
+                    if attempt >= retries:
+                        raise
+                    logger.warning("Retrying write of %s: %s", path, error)
+                    time.sleep(2**attempt)
+                    attempt += 1
+            results.append((time.monotonic() - started, attempt))
+        return results
+
+
+class S3Storage(Storage):
+    """
+    Objects in an S3 bucket. The s3fs client is created on first use and its
+    connection pool is shared by reads, writes and concurrent uploads.
+    """
+
+    scheme = "s3://"
+
+    def __init__(
+        self,
+        bucket_name,
+        aws_access_key_id=None,
+        aws_secret_access_key=None,
+        endpoint_url=None,
+        max_pool_connections=10,
+    ):
+        super().__init__(bucket_name)
+        self.aws_access_key_id = aws_access_key_id
+        self.aws_secret_access_key = aws_secret_access_key
+        self.endpoint_url = endpoint_url
+        self.max_pool_connections = max_pool_connections
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.get("S3_BUCKET_NAME"),
+            settings.get("AWS_ACCESS_KEY_ID"),
+            settings.get("AWS_SECRET_ACCESS_KEY"),
+            settings.get("S3_ENDPOINT_URL") or None,
+            max(settings.getint("PIPELINE_UPLOAD_CONCURRENCY", 8), 10),
+        )
+
+    @cached_property
+    def fs(self):
+        # imported on first use so the other backends run without s3fs
+        import s3fs
+
+        return s3fs.S3FileSystem(
+            key=self.aws_access_key_id or None,
+            secret=self.aws_secret_access_key or None,
+            endpoint_url=self.endpoint_url,
+            config_kwargs={"max_pool_connections": self.max_pool_connections},
+        )
+
+    def glob(self, pattern) -> list[str]:
+        return self.fs.glob(pattern)
+
+    def cat_file(self, path) -> bytes:
+        return self.fs.cat_file(path)
+
+    def pipe_file(self, path, data):
+        self.fs.pipe_file(path, data)
+
+    def rm(self, paths):
+        self.fs.rm(list(paths))
+
+    async def upload_object(self, semaphore, path, data, retries) -> tuple[float, int]:
+        async with semaphore:
+            attempt = 0
+            while True:
+                started = time.monotonic()
+                try:
+                    await self.fs._pipe_file(path, data)
+                    return time.monotonic() - started, attempt
+                except PERMANENT_ERRORS:
+                    raise
+                except OSError as error:
+                    if attempt >= retries:
+                        raise
+                    logger.warning("Retrying upload of %s: %s", path, error)
+                    await asyncio.sleep(2**attempt)
+                    attempt += 1
+
+    async def upload_all(self, objects, concurrency, retries) -> list[tuple]:
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(
+            *(
+                self.upload_object(semaphore, path, data, retries)
+                for path, data in objects
+            )
+        )
+
+    def pipe_files(self, objects, concurrency, retries) -> list[tuple[float, int]]:
+        """This method will upload the objects concurrently on the s3fs event loop."""
+        from fsspec.asyn import sync
+
+        if not objects:
+            return []
+        return sync(self.fs.loop, self.upload_all, objects, concurrency, retries)
+
+
+class LocalStorage(Storage):
+    """Objects as files under root/bucket/, written atomically."""
+
+    def __init__(self, bucket_name, root):
+        super().__init__(bucket_name)
+        self.root = root
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.get("S3_BUCKET_NAME") or "pro-football-reference",
+            settings.get("LOCAL_STORAGE_PATH", ".pfr_state/storage"),
+        )
+
+    def local_path(self, path) -> str:
+        return os.path.join(self.root, *_key(path).split("/"))
+
+    def glob(self, pattern) -> list[str]:
+        paths = glob.glob(self.local_path(pattern), recursive=True)
+        return sorted(
+            os.path.relpath(path, self.root).replace(os.sep, "/")
+            for path in paths
+            if os.path.isfile(path)
+        )
+
+    def cat_file(self, path) -> bytes:
+        try:
+            with open(self.local_path(path), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(path) from None
+
+    def pipe_file(self, path, data):
+        target = self.local_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(f"{target}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{target}.tmp", target)
+
+    def rm(self, paths):
+        for path in paths:
+            os.remove(self.local_path(path))
+
+
+class MemoryStorage(Storage):
+    """
+    Objects in a dict. Every instance shares the same objects, so a spider
+    can read back what another pipeline of the process wrote.
+    """
+
+    scheme = "memory://"
+    objects = {}
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings.get("S3_BUCKET_NAME") or "pro-football-reference")
+
+    def glob(self, pattern) -> list[str]:
+        regex = _glob_pattern(_key(pattern))
+        return sorted(key for key in self.objects if regex.match(key))
+
+    def cat_file(self, path) -> bytes:
+        try:
+            return self.objects[_key(path)]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def pipe_file(self, path, data):
+        self.objects[_key(path)] = bytes(data)
+
+    def rm(self, paths):
+        for path in paths:
+            self.objects.pop(_key(path), None)
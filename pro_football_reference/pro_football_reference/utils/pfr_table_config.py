@@ -2,14 +2,23 @@
 from collections import namedtuple
 
 # base config for each table item we want to extract
-StatConfig = namedtuple("StatConfig", ["index", "stat", "attr", "table_part"])
+# dtype declares how the scraped text is coerced at flush time (see utils/pfr_coercion.py):
+# "int", "float", "pct" ("45.2%"), "clock" ("2:45" -> seconds),
+# "field_position" ("Own 28.3" -> yards from own goal line), "date" or "str"
+# link reads the text of the link inside the cell (e.g. team names) instead of
+# the cell's own text
+StatConfig = namedtuple(
+    "StatConfig",
+    ["index", "stat", "attr", "table_part", "dtype", "link"],
+    defaults=["int", False],
+)
 
 GAME_RESULTS_CONFIG = [
-    StatConfig(None, "week_num", "week", "th"),
-    StatConfig(None, "game_day_of_week", "day_of_week", "td"),
-    StatConfig(None, "gametime", "game_time", "td"),
-    StatConfig(None, "winner", "winning_team", "td"),
-    StatConfig(None, "loser", "losing_team", "td"),
+    StatConfig(None, "week_num", "week", "th", "str"),
+    StatConfig(None, "game_day_of_week", "day_of_week", "td", "str"),
+    StatConfig(None, "gametime", "game_time", "td", "str"),
+    StatConfig(None, "winner", "winning_team", "td", "str", link=True),
+    StatConfig(None, "loser", "losing_team", "td", "str", link=True),
     StatConfig(None, "pts_lose", "loser_points", "td"),
     StatConfig(None, "yards_win", "winner_yards", "td"),
     StatConfig(None, "yards_lose", "loser_yards", "td"),
@@ -34,16 +43,16 @@ TEAM_STATS_AND_RANKINGS_CONFIG = [
     StatConfig(1, "pass_td", "passing_touchdowns_against", "td"),
     StatConfig(0, "pass_int", "interceptions_for", "td"),
     StatConfig(1, "pass_int", "interceptions_against", "td"),
-    StatConfig(0, "pass_net_yds_per_att", "net_yards_per_pass_attempt", "td"),
-    StatConfig(1, "pass_net_yds_per_att", "net_yards_per_pass_attempt_against", "td"),
+    StatConfig(0, "pass_net_yds_per_att", "net_yards_per_pass_attempt", "td", "float"),
+    StatConfig(1, "pass_net_yds_per_att", "net_yards_per_pass_attempt_against", "td", "float"),
     StatConfig(0, "rush_att", "rushing_attempts", "td"),
     StatConfig(1, "rush_att", "rushing_attempts_against", "td"),
     StatConfig(0, "rush_yds", "rushing_yards", "td"),
     StatConfig(1, "rush_yds", "rushing_yards_against", "td"),
     StatConfig(0, "rush_td", "rushing_touchdowns", "td"),
     StatConfig(1, "rush_td", "rushing_touchdowns_against", "td"),
-    StatConfig(0, "rush_yds_per_att", "net_yards_per_rush_attempt", "td"),
-    StatConfig(1, "rush_yds_per_att", "net_yards_per_rush_attempt_against", "td"),
+    StatConfig(0, "rush_yds_per_att", "net_yards_per_rush_attempt", "td", "float"),
+    StatConfig(1, "rush_yds_per_att", "net_yards_per_rush_attempt_against", "td", "float"),
     StatConfig(0, "penalties", "penalties", "td"),
     StatConfig(1, "penalties", "opponent_penalties", "td"),
     StatConfig(0, "penalties_yds", "penalty_yards", "td"),
@@ -52,46 +61,46 @@ TEAM_STATS_AND_RANKINGS_CONFIG = [
     StatConfig(1, "pen_fd", "opponent_first_downs_from_penalties", "td"),
     StatConfig(0, "drives", "number_of_drives", "td"),
     StatConfig(1, "drives", "opponent_number_of_drives", "td"),
-    StatConfig(0, "score_pct", "percentage_of_drives_ending_in_score", "td"),
-    StatConfig(1, "score_pct", "opponent_percentage_of_drives_ending_in_score", "td"),
-    StatConfig(0, "turnover_pct", "percentage_of_drives_ending_in_turnover", "td"),
-    StatConfig(0, "start_avg", "average_starting_field_position", "td"),
-    StatConfig(1, "start_avg", "opponent_average_starting_field_position", "td"),
-    StatConfig(0, "time_avg", "time_per_drive", "td"),
-    StatConfig(1, "time_avg", "opponent_time_per_drive", "td"),
-    StatConfig(0, "plays_per_drive", "plays_per_drive", "td"),
-    StatConfig(1, "plays_per_drive", "opponent_plays_per_drive", "td"),
-    StatConfig(0, "yds_per_drive", "yards_per_drive", "td"),
-    StatConfig(1, "yds_per_drive", "opponent_yards_per_drive", "td"),
-    StatConfig(0, "points_avg", "points_per_drive", "td"),
-    StatConfig(1, "points_avg", "opponent_points_per_drive", "td"),
+    StatConfig(0, "score_pct", "percentage_of_drives_ending_in_score", "td", "pct"),
+    StatConfig(1, "score_pct", "opponent_percentage_of_drives_ending_in_score", "td", "pct"),
+    StatConfig(0, "turnover_pct", "percentage_of_drives_ending_in_turnover", "td", "pct"),
+    StatConfig(0, "start_avg", "average_starting_field_position", "td", "field_position"),
+    StatConfig(1, "start_avg", "opponent_average_starting_field_position", "td", "field_position"),
+    StatConfig(0, "time_avg", "time_per_drive", "td", "clock"),
+    StatConfig(1, "time_avg", "opponent_time_per_drive", "td", "clock"),
+    StatConfig(0, "plays_per_drive", "plays_per_drive", "td", "float"),
+    StatConfig(1, "plays_per_drive", "opponent_plays_per_drive", "td", "float"),
+    StatConfig(0, "yds_per_drive", "yards_per_drive", "td", "float"),
+    StatConfig(1, "yds_per_drive", "opponent_yards_per_drive", "td", "float"),
+    StatConfig(0, "points_avg", "points_per_drive", "td", "float"),
+    StatConfig(1, "points_avg", "opponent_points_per_drive", "td", "float"),
 ]
 
 
 TEAM_CONVERSIONS_CONFIG = [
     StatConfig(0, "third_down_att", "third_down_attempts", "td"),
     StatConfig(0, "third_down_success", "third_down_conversions", "td"),
-    StatConfig(0, "third_down_pct", "third_down_conversion_percentage", "td"),
+    StatConfig(0, "third_down_pct", "third_down_conversion_percentage", "td", "pct"),
     StatConfig(0, "fourth_down_att", "fourth_down_attempts", "td"),
     StatConfig(0, "fourth_down_success", "fourth_down_conversions", "td"),
-    StatConfig(0, "fourth_down_pct", "fourth_down_conversion_percentage", "td"),
+    StatConfig(0, "fourth_down_pct", "fourth_down_conversion_percentage", "td", "pct"),
     StatConfig(0, "red_zone_att", "red_zone_attempts", "td"),
     StatConfig(0, "red_zone_scores", "red_zone_conversions", "td"),
-    StatConfig(0, "red_zone_pct", "red_zone_conversion_percentage", "td"),
+    StatConfig(0, "red_zone_pct", "red_zone_conversion_percentage", "td", "pct"),
     StatConfig(1, "third_down_att", "third_down_attempts_against", "td"),
     StatConfig(1, "third_down_success", "third_down_conversions_against", "td"),
-    StatConfig(1, "third_down_pct", "third_down_conversion_percentage_against", "td"),
+    StatConfig(1, "third_down_pct", "third_down_conversion_percentage_against", "td", "pct"),
     StatConfig(1, "fourth_down_att", "fourth_down_attempts_against", "td"),
     StatConfig(1, "fourth_down_success", "fourth_down_conversions_against", "td"),
-    StatConfig(1, "fourth_down_pct", "fourth_down_conversion_percentage_against", "td"),
+    StatConfig(1, "fourth_down_pct", "fourth_down_conversion_percentage_against", "td", "pct"),
     StatConfig(1, "red_zone_att", "red_zone_attempts_against", "td"),
     StatConfig(1, "red_zone_scores", "red_zone_conversions_against", "td"),
-    StatConfig(1, "red_zone_pct", "red_zone_conversion_percentage_against", "td"),
+    StatConfig(1, "red_zone_pct", "red_zone_conversion_percentage_against", "td", "pct"),
 ]
 
 PLAYER_CONFIG = [
     StatConfig(None, "age", "player_age", "td"),
-    StatConfig(None, "pos", "position", "td"),
+    StatConfig(None, "pos", "position", "td", "str"),
 ]
 
 PLAYER_PUNT_AND_KICK_RETURNER_CONFIG = [
@@ -100,12 +109,47 @@ PLAYER_PUNT_AND_KICK_RETURNER_CONFIG = [
     StatConfig(None, "punt_ret_yds", "punt_return_yards", "td"),
     StatConfig(None, "punt_ret_td", "punt_return_touchdowns", "td"),
     StatConfig(None, "punt_ret_long", "punt_return_long", "td"),
-    StatConfig(None, "punt_ret_yds_per_ret", "punt_return_yards_per_return", "td"),
+    StatConfig(None, "punt_ret_yds_per_ret", "punt_return_yards_per_return", "td", "float"),
     StatConfig(None, "kick_ret", "kick_returns", "td"),
     StatConfig(None, "kick_ret_yds", "kick_return_yards", "td"),
     StatConfig(None, "kick_ret_td", "kick_return_touchdowns", "td"),
     StatConfig(None, "kick_ret_long", "kick_return_long", "td"),
-    StatConfig(None, "kick_ret_yds_per_ret", "kick_return_yards_per_return", "td"),
+    StatConfig(None, "kick_ret_yds_per_ret", "kick_return_yards_per_return", "td", "float"),
     StatConfig(None, "all_purpose_yds", "all_purpose_yards", "td"),
-    StatConfig(None, "awards", "awards", "td"),
+    StatConfig(None, "awards", "awards", "td", "str"),
 ]
+
+
+BOXSCORE_TEAM_STATS_CONFIG = [
+    StatConfig(None, "stat", "stat", "th", "str"),
+    StatConfig(None, "vis_stat", "vis_stat", "td", "str"),
+    StatConfig(None, "home_stat", "home_stat", "td", "str"),
+]
+
+BOXSCORE_SCORING_CONFIG = [
+    StatConfig(None, "quarter", "quarter", "th", "str"),
+    StatConfig(None, "qtr_time_remain", "time_remaining", "td", "clock"),
+    StatConfig(None, "team", "team", "td", "str"),
+    StatConfig(None, "vis_team_score", "vis_team_score", "td"),
+    StatConfig(None, "home_team_score", "home_team_score", "td"),
+]
+
+# declared dtypes of every configured attr plus the fields the spiders fill directly
+STAT_DTYPES = {
+    config.attr: config.dtype
+    for stats_config in (
+        GAME_RESULTS_CONFIG,
+        TEAM_STATS_AND_RANKINGS_CONFIG,
+        TEAM_CONVERSIONS_CONFIG,
+        PLAYER_CONFIG,
+        PLAYER_PUNT_AND_KICK_RETURNER_CONFIG,
+        BOXSCORE_TEAM_STATS_CONFIG,
+        BOXSCORE_SCORING_CONFIG,
+    )
+    for config in stats_config
+} | {
+    "year": "int",
+    "game_date": "date",
+    "winner_points": "int",
+    "birth_date": "date",
+}
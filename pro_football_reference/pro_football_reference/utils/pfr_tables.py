@@ -0,0 +1,44 @@
+"""
+This module will locate tables by id in a single parse of a page.
+Pro Football Reference ships many of its tables inside HTML comments,
+so tables that are not found in the live markup are looked up in the
+comments, and the comments holding a requested table are parsed together
+in one second document.
+"""
+
+from parsel import Selector, SelectorList
+
+
+def find_tables(selector, table_ids) -> dict:
+    """This method will map each requested table id to the Selector of its <table>."""
+    wanted = set(table_ids)
+    tables = {}
+    for table in selector.xpath("//table[@id]"):
+        table_id = table.attrib["id"]
+        if table_id in wanted:
+            tables.setdefault(table_id, table)
+
+    missing = wanted - tables.keys()
+    if not missing:
+        return tables
+
+    texts = [
+        comment.root.text
+        for comment in selector.xpath("//comment()[contains(., '<table')]")
+        if any(f'id="{table_id}"' in comment.root.text for table_id in missing)
+    ]
+    if not texts:
+        return tables
+    for table in Selector(text="".join(texts)).xpath("//table[@id]"):
+        table_id = table.attrib["id"]
+        if table_id in missing:
+            tables[table_id] = table
+            missing.discard(table_id)
+    return tables
+
+
+def table_rows(table):
+    """This method will return the body rows of a table (same as "#id > tbody > tr")."""
+    if table is None:
+        return SelectorList()
+    return table.xpath("./tbody/tr")
@@ -0,0 +1,244 @@
+"""
+This module will check each dataset DataFrame before it is uploaded. The
+checks run on whole columns at flush time rather than per item:
+
+    duplicate_keys       rows sharing a dataset key (its merge_key)
+    null_columns         configured stat columns that are (almost) all null,
+                         e.g. after a data-stat was renamed on the site
+    teams_twice_in_week  game rows where a team plays twice in the same week
+    missing_teams        team seasons without rows, checked once every
+                         dataset was flushed
+
+A compact JSON report is written at close. With fail-fast an error raises
+DataValidationError before the dataset is uploaded.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+from pro_football_reference.utils.pfr_lazy import lazy_import
+
+pl = lazy_import("polars")
+
+logger = logging.getLogger(__name__)
+
+
+class DataValidationError(ValueError):
+    """A dataset failed its checks while VALIDATION_FAIL_FAST is enabled."""
+
+
+class DatasetValidator:
+    """
+    The checks of the datasets a pipeline writes and their report. Null rates
+    are only judged on batches of at least min_rows rows. The teams expected
+    in a season are the team pages the spider scheduled for it or, without
+    any, the franchises of TEAM_ABBREVIATIONS that played it (see
+    TEAM_FIRST_SEASONS and TEAM_INACTIVE_SEASONS), from teams_since on.
+    Stats the site did not track in early seasons make null_columns noisy for
+    old backfills; set max_null_rate to 1.0 to turn that check off.
+    """
+
+    def __init__(
+        self,
+        dtypes,
+        max_null_rate=0.99,
+        min_rows=32,
+        teams=(),
+        first_seasons=None,
+        inactive_seasons=None,
+        teams_since=1960,
+        fail_fast=False,
+        report_path=None,
+        stats=None,
+    ):
+        self.dtypes = dtypes
+        self.max_null_rate = max_null_rate
+        self.min_rows = min_rows
+        self.all_teams = list(teams)
+        self.first_seasons = first_seasons or {}
+        self.inactive_seasons = inactive_seasons or {}
+        self.teams_since = teams_since
+        self.fail_fast = fail_fast
+        self.report_path = report_path
+        self.stats = stats
+        self.datasets = {}
+        self.errors = []
+        # dataset -> {season: teams seen}
+        self.teams = {}
+
+    @classmethod
+    def from_settings(cls, settings, dtypes, stats=None):
+        return cls(
+            dtypes,
+            max_null_rate=settings.getfloat("VALIDATION_MAX_NULL_RATE", 0.99),
+            min_rows=settings.getint("VALIDATION_MIN_ROWS", 32),
+            teams=settings.getlist("TEAM_ABBREVIATIONS"),
+            first_seasons=settings.getdict("TEAM_FIRST_SEASONS"),
+            inactive_seasons=settings.getdict("TEAM_INACTIVE_SEASONS"),
+            teams_since=settings.getint("VALIDATION_TEAMS_SINCE", 1960),
+            fail_fast=settings.getbool("VALIDATION_FAIL_FAST"),
+            report_path=settings.get("VALIDATION_REPORT_PATH"),
+            stats=stats,
+        )
+
+    def fail(self, dataset, check, message):
+        error = f"{dataset}: {check}: {message}"
+        self.errors.append(error)
+        if self.stats is not None:
+            self.stats.inc_value(f"validation/{check}")
+        logger.error("Data validation failed for %s", error)
+        return error
+
+    def raise_errors(self, errors):
+        if errors and self.fail_fast:
+            raise DataValidationError("; ".join(errors))
+
+    def check_batch(self, c, df):
+        """This method will run the batch checks on the rows about to be written."""
+        dataset = c["path"]
+        entry = self.datasets.setdefault(
+            dataset, {"rows": 0, "duplicate_keys": 0, "nulls": {}}
+        )
+        entry["rows"] += df.height
+        errors = []
+
+        if c.get("unique_key", True):
+            duplicates = df.select(c["merge_key"]).is_duplicated().sum()
+            if duplicates:
+                entry["duplicate_keys"] += duplicates
+                key = "/".join(c["merge_key"])
+                message = f"{duplicates} rows share a {key} key"
+                errors.append(self.fail(dataset, "duplicate_keys", message))
+
+        columns = [name for name in df.columns if name in self.dtypes]
+        # games not played yet have no stats, so only played rows are judged
+        judged = df
+        if c.get("null_check_rows") in df.columns:
+            judged = df.filter(pl.col(c["null_check_rows"]).is_not_null())
+        if columns and judged.height:
+            nulls = judged.select(pl.col(columns).null_count()).row(0, named=True)
+            entry["judged_rows"] = entry.get("judged_rows", 0) + judged.height
+            for name, count in nulls.items():
+                entry["nulls"][name] = entry["nulls"].get(name, 0) + count
+            if judged.height >= self.min_rows:
+                empty = sorted(
+                    name
+                    for name, count in nulls.items()
+                    if count / judged.height > self.max_null_rate
+                )
+                if empty:
+                    errors.append(
+                        self.fail(
+                            dataset,
+                            "null_columns",
+                            f"{', '.join(empty)} null in over "
+                            f"{self.max_null_rate:.0%} of {judged.height} rows",
+                        )
+                    )
+
+        if {"year", "week", "winning_team", "losing_team"} <= set(df.columns):
+            appearances = pl.concat(
+                [
+                    df.select("year", "week", pl.col(side).alias("team"))
+                    for side in ("winning_team", "losing_team")
+                ]
+            ).drop_nulls()
+            twice = appearances.filter(appearances.is_duplicated()).unique()
+            if not twice.is_empty():
+                entry["teams_twice_in_week"] = twice.height
+                errors.append(
+                    self.fail(
+                        dataset,
+                        "teams_twice_in_week",
+                        ", ".join(
+                            f"{team} ({year} week {week})"
+                            for year, week, team in twice.head(5).iter_rows()
+                        ),
+                    )
+                )
+
+        if c.get("expect_all_teams"):
+            seasons = self.teams.setdefault(dataset, {})
+            for year, team in df.select("year", "team").unique().iter_rows():
+                seasons.setdefault(int(year), set()).add(team)
+        self.raise_errors(errors)
+
+    def expected_teams(self, year, scheduled_pages=()) -> set:
+        scheduled = {team for season, team in scheduled_pages if season == year}
+        if scheduled:
+            return scheduled
+        return {
+            team
+            for team in self.all_teams
+            if year >= self.first_seasons.get(team, 0)
+            and year not in self.inactive_seasons.get(team, ())
+        }
+
+    def check_teams(self, unchanged_pages=(), scheduled_pages=()):
+        """
+        This method will check that every team of a season has rows once all
+        datasets were flushed; team pages skipped because they did not change
+        count as present.
+        """
+        errors = []
+        for dataset, seasons in self.teams.items():
+            for year, teams in sorted(seasons.items()):
+                if year < self.teams_since:
+                    continue
+                unchanged = {team for season, team in unchanged_pages if season == year}
+                expected = self.expected_teams(year, scheduled_pages)
+                missing = sorted(expected - teams - unchanged)
+                self.datasets[dataset].setdefault("teams", {})[year] = len(
+                    teams | unchanged
+                )
+                if missing:
+                    errors.append(
+                        self.fail(
+                            dataset,
+                            "missing_teams",
+                            f"{year}: no rows for {', '.join(missing)}",
+                        )
+                    )
+        self.raise_errors(errors)
+
+    def report(self) -> dict:
+        datasets = {}
+        for dataset, entry in self.datasets.items():
+            rows = entry.get("judged_rows", 0)
+            summary = {key: value for key, value in entry.items() if key != "nulls"}
+            # only the columns with nulls, as rates over the judged rows of the crawl
+            summary["null_rates"] = {
+                name: round(count / rows, 3)
+                for name, count in sorted(entry["nulls"].items())
+                if count and rows
+            }
+            datasets[dataset] = summary
+        return {"datasets": datasets, "errors": self.errors}
+
+    def write_report(self, spider_name):
+        """This method will log a line per dataset and write the JSON report."""
+        report = self.report()
+        for dataset, summary in report["datasets"].items():
+            logger.info(
+                "Validated %s: %d rows, %d duplicate keys, %d columns with nulls",
+                dataset,
+                summary["rows"],
+                summary["duplicate_keys"],
+                len(summary["null_rates"]),
+            )
+        # nothing was checked (e.g. a derived dataset): keep the crawl's report
+        if not self.report_path or not self.datasets:
+            return
+        path = self.report_path.format(spider=spider_name)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        report["spider"] = spider_name
+        report["created_at"] = datetime.now(timezone.utc).isoformat()
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        os.replace(f"{path}.tmp", path)
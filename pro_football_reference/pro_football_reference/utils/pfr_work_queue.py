@@ -0,0 +1,139 @@
+"""
+This module will share the work units (one season page, or one team
+season page) of a crawl between several workers. Units are keyed by request
+fingerprint within a named queue, which makes the queue the shared
+dupefilter, and are leased to one worker at a time. A lease that is not
+renewed (the worker died) expires and the unit is handed out again.
+
+SqliteWorkQueue is the local stand-in: one sqlite file that every worker
+process can open (same host or a shared volume). Another backend only has
+to provide the same methods and a from_settings classmethod; it is picked
+with the WORK_QUEUE_CLASS setting.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+
+class SqliteWorkQueue:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # autocommit, transactions are opened explicitly with BEGIN IMMEDIATE
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS units (
+                queue TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                url TEXT NOT NULL,
+                callback TEXT,
+                meta TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                leased_at REAL,
+                PRIMARY KEY (queue, fingerprint)
+            );
+            CREATE INDEX IF NOT EXISTS units_by_state
+                ON units (queue, state, priority DESC);
+            """
+        )
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings.get("WORK_QUEUE_PATH"))
+
+    def put(self, queue, fingerprint, url, callback, meta, priority) -> bool:
+        """This method will add a unit and return False when the queue already has it."""
+        cursor = self.connection.execute(
+            "INSERT OR IGNORE INTO units "
+            "(queue, fingerprint, url, callback, meta, priority) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (queue, fingerprint, url, callback, json.dumps(meta), priority),
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, queue, worker, lease_seconds) -> dict | None:
+        """
+        This method will hand the highest priority pending (or expired) unit
+        to a worker, or return None when there is none.
+        """
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute(
+                "UPDATE units SET state = 'leased', worker = ?, leased_at = ? "
+                "WHERE rowid = ("
+                "  SELECT rowid FROM units WHERE queue = ? AND ("
+                "    state = 'pending' OR (state = 'leased' AND leased_at < ?)"
+                "  ) ORDER BY priority DESC LIMIT 1"
+                ") RETURNING fingerprint, url, callback, meta, priority",
+                (worker, now, queue, now - lease_seconds),
+            ).fetchone()
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        fingerprint, url, callback, meta, priority = row
+        return {
+            "fingerprint": fingerprint,
+            "url": url,
+            "callback": callback,
+            "meta": json.loads(meta),
+            "priority": priority,
+        }
+
+    def has_available(self, queue, lease_seconds) -> bool:
+        """This method will tell whether a lease call could return a unit now."""
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM units WHERE queue = ? AND ("
+                "  state = 'pending' OR (state = 'leased' AND leased_at < ?)"
+                ") LIMIT 1",
+                (queue, time.time() - lease_seconds),
+            ).fetchone()
+            is not None
+        )
+
+    def renew(self, queue, worker):
+        """This method will extend the leases a live worker holds."""
+        self.connection.execute(
+            "UPDATE units SET leased_at = ? "
+            "WHERE queue = ? AND worker = ? AND state = 'leased'",
+            (time.time(), queue, worker),
+        )
+
+    def complete(self, queue, worker):
+        """This method will mark every unit a worker holds as done."""
+        self.connection.execute(
+            "UPDATE units SET state = 'done' "
+            "WHERE queue = ? AND worker = ? AND state = 'leased'",
+            (queue, worker),
+        )
+
+    def release(self, queue, worker):
+        """This method will give a worker's units back to the queue."""
+        self.connection.execute(
+            "UPDATE units SET state = 'pending', worker = NULL, leased_at = NULL "
+            "WHERE queue = ? AND worker = ? AND state = 'leased'",
+            (queue, worker),
+        )
+
+    def counts(self, queue) -> dict:
+        """This method will return the number of units per state."""
+        return dict(
+            self.connection.execute(
+                "SELECT state, COUNT(*) FROM units WHERE queue = ? GROUP BY state",
+                (queue,),
+            ).fetchall()
+        )
+
+    def close(self):
+        self.connection.close()
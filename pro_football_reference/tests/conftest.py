@@ -0,0 +1,101 @@
+"""
+Shared fixtures: project settings writing to MemoryStorage and the spider
+callbacks run on the benchmark fixture pages.
+"""
+
+import os
+
+import pytest
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.utils.project import get_project_settings
+
+from benchmarks.synthetic import ERAS, FIXTURES_DIR
+from pro_football_reference.items import RowRecord
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from pro_football_reference.spiders.teams import TeamsPageSpider
+from pro_football_reference.utils.pfr_storage import MemoryStorage
+
+
+@pytest.fixture
+def settings(tmp_path):
+    settings = get_project_settings().copy()
+    settings.set("STORAGE_CLASS", f"{MemoryStorage.__module__}.MemoryStorage")
+    settings.set("S3_BUCKET_NAME", "pro-football-reference")
+    settings.set("VALIDATION_ENABLED", True)
+    settings.set("VALIDATION_REPORT_PATH", str(tmp_path / "{spider}.json"))
+    settings.set("VALIDATION_FAIL_FAST", True)
+    MemoryStorage.objects.clear()
+    yield settings
+    MemoryStorage.objects.clear()
+
+
+def fixture_response(name, url, meta) -> HtmlResponse:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        body = f.read()
+    return HtmlResponse(
+        url=url, body=body, encoding="utf-8", request=Request(url, meta=meta)
+    )
+
+
+def parse_game_results(seasons=tuple(ERAS), spider=None) -> list:
+    """This method will return the records GameResultsSpider parses from fixtures."""
+    spider = spider or GameResultsSpider()
+    records = []
+    for season in seasons:
+        response = fixture_response(
+            f"games_{season}.html",
+            f"https://www.pro-football-reference.com/years/{season}/games.htm",
+            {"year": season},
+        )
+        records.extend(spider.parse(response))
+    return records
+
+
+def unplayed(record) -> RowRecord:
+    """
+    This method will return a game row as the site lists the game before it
+    is played: no scores or stats, the visitor in the winner column and the
+    home team (here the eventual winner) in the loser column.
+    """
+    values = dict(zip(record.columns, record.values))
+    values.update(
+        {
+            column: None
+            for column in values
+            if column.startswith(("winner_", "loser_"))
+        },
+        winning_team=values["losing_team"],
+        losing_team=values["winning_team"],
+        boxscore_link=None,
+    )
+    return RowRecord(record.item_class, record.columns, tuple(values.values()))
+
+
+def parse_team_pages(seasons=tuple(ERAS), spider=None) -> list:
+    """
+    This method will schedule the fixture team pages (one team, buf, per
+    season) like start_requests does and return the records parsed from them.
+    """
+    spider = spider or TeamsPageSpider()
+    requests = spider.schedule(
+        Request(
+            f"https://www.pro-football-reference.com/teams/buf/{season}.htm",
+            meta={"year": season, "team": "buf"},
+        )
+        for season in seasons
+    )
+    records = []
+    for request in requests:
+        response = fixture_response(
+            f"team_buf_{request.meta['year']}.html", request.url, request.meta
+        )
+        records.extend(spider.parse(response))
+    return records
+
+
+def feed(pipeline, records, spider):
+    """This method will run records through a pipeline and close it like a crawl."""
+    for record in records:
+        pipeline.process_item(record, spider)
+    pipeline.close_spider(spider)
@@ -0,0 +1,64 @@
+import sqlite3
+
+from pro_football_reference import reparse
+from pro_football_reference.utils.pfr_archive import ResponseArchive
+
+BOXSCORE_URL = "https://www.pro-football-reference.com/boxscores/202309070kan.htm"
+BOXSCORE_META = {"year": 2023, "boxscore_link": "/boxscores/202309070kan.htm"}
+
+
+def test_entries_keep_the_request_meta(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    archive.put(BOXSCORE_URL, b"<html></html>", "boxscores", 2023, meta=BOXSCORE_META)
+    [entry] = archive.entries("boxscores")
+    assert entry["meta"] == BOXSCORE_META
+    archive.close()
+
+
+def test_archives_without_meta_are_upgraded(tmp_path):
+    connection = sqlite3.connect(tmp_path / "index.sqlite")
+    connection.execute(
+        "CREATE TABLE responses (url TEXT PRIMARY KEY, spider TEXT NOT NULL, "
+        "year INTEGER, team TEXT, content_hash TEXT NOT NULL, encoding TEXT, "
+        "fetched_at REAL NOT NULL)"
+    )
+    url = "https://www.pro-football-reference.com/teams/buf/2023.htm"
+    connection.execute(
+        "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (url, "teams_page", 2023, "buf", "x", None, 0),
+    )
+    connection.commit()
+    connection.close()
+    archive = ResponseArchive(str(tmp_path))
+    [entry] = archive.entries("teams_page")
+    assert entry["meta"] == {"year": 2023, "team": "buf"}
+    archive.close()
+
+
+def test_reparse_hands_the_meta_back_to_the_callback(tmp_path):
+    archive = ResponseArchive(str(tmp_path))
+    archive.put(BOXSCORE_URL, b"<html></html>", "boxscores", 2023, meta=BOXSCORE_META)
+    archive.put(
+        "https://www.pro-football-reference.com/boxscores/202309100atl.htm",
+        b"<html></html>",
+        "boxscores",
+        2023,
+    )
+    entries = archive.entries("boxscores")
+    archive.close()
+    reparse._init_worker(str(tmp_path))
+    # pages archived without meta fall back to the link in their URL
+    assert [reparse._parse_entry(("boxscores", entry)) for entry in entries] == [[], []]
+
+
+def test_reparse_players_without_meta_use_the_url(tmp_path):
+    url = "https://www.pro-football-reference.com/players/A/AlleJo02.htm"
+    body = b'<div id="meta"><div><h1><span>Josh Allen</span></h1></div></div>'
+    archive = ResponseArchive(str(tmp_path))
+    archive.put(url, body, "players", 2023)
+    entries = archive.entries("players")
+    archive.close()
+    reparse._init_worker(str(tmp_path))
+    [(_, item)] = reparse._parse_entry(("players", entries[0]))
+    assert item["player_link"] == "/players/A/AlleJo02.htm"
+    assert item["player_name"] == "Josh Allen"
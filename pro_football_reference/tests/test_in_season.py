@@ -0,0 +1,22 @@
+from pro_football_reference.pipelines import GameResultsPipeline
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from tests.conftest import feed, parse_game_results, unplayed
+
+
+def test_a_week_becomes_final_once_its_games_are_played(settings):
+    settings.set("RATINGS_ENABLED", False)
+    spider = GameResultsSpider(seasons="2023", in_season="1")
+    spider.settings = settings
+    records = parse_game_results([2023], spider)
+    week = dict(zip(records[0].columns, records[0].values))["week"]
+
+    # a home win in the week is still listed the unplayed way round first
+    feed(
+        GameResultsPipeline.from_settings(settings),
+        [unplayed(records[0]), *records[1:]],
+        spider,
+    )
+    assert week not in spider.get_final_weeks()[2023]
+
+    feed(GameResultsPipeline.from_settings(settings), records, spider)
+    assert week in spider.get_final_weeks()[2023]
@@ -0,0 +1,37 @@
+import json
+from types import SimpleNamespace
+
+from scrapy.utils.test import get_crawler
+
+from pro_football_reference.extensions import MemoryProfiler
+from pro_football_reference.pipelines import GameResultsPipeline
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from tests.conftest import parse_game_results
+
+
+def test_the_report_keeps_the_largest_buffers_of_the_crawl(settings, tmp_path):
+    settings.set("RATINGS_ENABLED", False)
+    pipeline = GameResultsPipeline.from_settings(settings)
+    crawler = get_crawler(GameResultsSpider)
+    crawler.stats.open_spider(None)
+    profiler = MemoryProfiler(
+        crawler.stats, 60, str(tmp_path / "{spider}.json"), frames=1
+    )
+    profiler.crawler = SimpleNamespace(
+        engine=SimpleNamespace(
+            scraper=SimpleNamespace(itemproc=SimpleNamespace(middlewares=[pipeline]))
+        )
+    )
+    spider = GameResultsSpider()
+    records = parse_game_results([2023], spider)
+    profiler.spider_opened(spider)
+    for record in records:
+        pipeline.process_item(record, spider)
+    profiler.sample(spider)
+    pipeline.close_spider(spider)
+    profiler.spider_closed(spider, "finished")
+
+    report = json.loads((tmp_path / "game_results.json").read_text())
+    assert report["samples"][-1]["datasets"]["game_results"]["rows"] == 0
+    assert report["datasets"]["game_results"]["max_rows"] == len(records)
+    assert report["datasets"]["game_results"]["max_bytes"] > 0
@@ -0,0 +1,64 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import FIXTURES_DIR
+from pro_football_reference.spiders.boxscores import BoxscoreSpider
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from pro_football_reference.utils.pfr_offline import get_spider, parse_records
+from tests.conftest import fixture_response
+
+GAMES_URL = "https://www.pro-football-reference.com/years/2023/games.htm"
+BOXSCORE_URL = "https://www.pro-football-reference.com/boxscores/202309070kan.htm"
+
+
+def games_body() -> bytes:
+    with open(f"{FIXTURES_DIR}/games_2023.html", "rb") as f:
+        return f.read()
+
+
+def collect(spider, response) -> list:
+    async def run():
+        return [item async for item in spider.parse_in_pool(response)]
+
+    return asyncio.run(run())
+
+
+def test_workers_build_the_spider_with_its_arguments():
+    spider = get_spider("game_results", {"in_season": "1"})
+    assert spider.in_season == "1"
+    assert get_spider("game_results", {"in_season": "1"}) is spider
+    assert get_spider("game_results") is not spider
+
+
+def test_parse_records_return_the_observations_and_scraped_pages():
+    meta = {"year": 2023, "final_weeks": "1,2"}
+    records, observations, scraped = parse_records(
+        "game_results", GAMES_URL, games_body(), meta, spider_args={"in_season": "1"}
+    )
+    assert records
+    assert ("final_week_rows_skipped", 32, {}) in observations
+    assert scraped == []
+
+    meta = {"year": 2023, "boxscore_link": "/boxscores/202309070kan.htm"}
+    _, _, scraped = parse_records("boxscores", BOXSCORE_URL, b"<html></html>", meta)
+    assert scraped == [("/boxscores/202309070kan.htm", 2023)]
+
+
+def test_parse_in_pool_applies_the_worker_side_effects():
+    spider = BoxscoreSpider()
+    spider.parse_pool = ThreadPoolExecutor(1)
+    meta = {"year": 2023, "boxscore_link": "/boxscores/202309070kan.htm"}
+    collect(spider, fixture_response("games_2023.html", BOXSCORE_URL, meta))
+    spider.parse_pool.shutdown()
+    assert spider.scraped == [("/boxscores/202309070kan.htm", 2023)]
+
+    spider = GameResultsSpider(in_season="1")
+    spider.parse_pool = ThreadPoolExecutor(1)
+    # without a crawler the spider keeps what observe receives
+    spider.observations = []
+    meta = {"year": 2023, "final_weeks": "1"}
+    response = fixture_response("games_2023.html", GAMES_URL, meta)
+    items = collect(spider, response)
+    spider.parse_pool.shutdown()
+    assert len(items) == len(list(GameResultsSpider().parse(response)))
+    assert spider.observations[-1] == ("final_week_rows_skipped", 16, {})
@@ -0,0 +1,74 @@
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from pro_football_reference.pipelines import GameResultsPipeline
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from pro_football_reference.utils.pfr_ratings import replay_ratings, weeks_to_replay
+from tests.conftest import feed, parse_game_results, unplayed
+
+
+def test_game_results_read_team_names_from_links():
+    games = pl.DataFrame(
+        [dict(zip(record.columns, record.values)) for record in parse_game_results()]
+    )
+    assert games["winning_team"].null_count() == 0
+    assert games["losing_team"].null_count() == 0
+    assert "Buffalo Bills" in games["winning_team"].to_list()
+    assert games.filter(pl.col("year") == 1978)["winning_team"].n_unique() > 20
+
+
+def test_crawl_writes_team_ratings(settings):
+    settings.set("RATINGS_ENABLED", True)
+    spider = GameResultsSpider()
+    pipeline = GameResultsPipeline.from_settings(settings)
+    feed(pipeline, parse_game_results(), spider)
+
+    games = pipeline.read_dataset("game_results")
+    ratings = pipeline.ratings.read_dataset("team_ratings")
+    # every team that played a week has a rating row for it
+    assert ratings.height == 2 * games.height
+    assert ratings.filter(pl.col("year") == 2023)["team"].n_unique() == 32
+    assert ratings["elo"].null_count() == 0
+    # Elo is zero-sum within a season
+    season = ratings.filter(pl.col("year") == 1978)
+    last = season.group_by("team").agg(pl.col("season_elo").last())
+    assert abs(last["season_elo"].mean() - 1500) < 1e-6
+
+
+def test_ratings_move_past_a_week_once_its_games_are_played(settings):
+    settings.set("RATINGS_ENABLED", True)
+    spider = GameResultsSpider()
+    records = parse_game_results([2023], spider)
+    # the first crawl lists a game of week 1 unplayed, so the season waits there
+    feed(
+        GameResultsPipeline.from_settings(settings),
+        [unplayed(records[0]), *records[1:]],
+        spider,
+    )
+    pipeline = GameResultsPipeline.from_settings(settings)
+    assert pipeline.ratings.read_dataset("team_ratings").is_empty()
+
+    feed(pipeline, records, spider)
+    games = pipeline.read_dataset("game_results")
+    ratings = pipeline.ratings.read_dataset("team_ratings")
+    assert ratings.height == 2 * games.height
+    assert pipeline.ratings.load_state()["through"][0] == 2023
+
+
+def test_incremental_replay_matches_full_replay():
+    games = pl.DataFrame(
+        [dict(zip(record.columns, record.values)) for record in parse_game_results()]
+    )
+    full, full_state, _, _ = replay_ratings(games)
+
+    rows, state, season, through = replay_ratings(games.filter(pl.col("year") < 2023))
+    more, state, _, _ = replay_ratings(
+        games.filter(pl.col("year") == 2023), state, season, through
+    )
+    order = ["year", "week_order", "team"]
+    assert_frame_equal(pl.concat([rows, more]).sort(order), full.sort(order))
+    assert_frame_equal(state.sort("team"), full_state.sort("team"))
+
+
+def test_weeks_to_replay_without_games():
+    assert weeks_to_replay(pl.DataFrame(), None) == []
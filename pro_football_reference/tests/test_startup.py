@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+LIST_SPIDERS = """
+import sys
+from scrapy.spiderloader import SpiderLoader
+from scrapy.utils.project import get_project_settings
+SpiderLoader.from_settings(get_project_settings()).list()
+print("polars.dataframe" in sys.modules)
+"""
+
+
+def test_loading_the_spiders_does_not_import_polars():
+    result = subprocess.run(
+        [sys.executable, "-c", LIST_SPIDERS], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from pro_football_reference.utils import pfr_storage
+from pro_football_reference.utils.pfr_storage import (
+    MemoryStorage,
+    S3Storage,
+    Storage,
+)
+
+PATH = "pro-football-reference/game_results/2023/game_results.json"
+
+
+class FlakyStorage(MemoryStorage):
+    """A MemoryStorage whose writes fail with the given errors first."""
+
+    def __init__(self, errors):
+        super().__init__("pro-football-reference")
+        self.errors = list(errors)
+        self.attempts = 0
+
+    def pipe_file(self, path, data):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        super().pipe_file(path, data)
+
+
+class FlakyFileSystem:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.attempts = 0
+
+    async def _pipe_file(self, path, data):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    async def sleep(seconds):
+        return None
+
+    monkeypatch.setattr(pfr_storage.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(pfr_storage.asyncio, "sleep", sleep)
+    MemoryStorage.objects.clear()
+
+
+def test_a_backend_must_implement_the_object_calls():
+    with pytest.raises(TypeError):
+        Storage("pro-football-reference")
+
+
+def test_pipe_files_retry_a_failed_write():
+    storage = FlakyStorage([ConnectionResetError("reset")])
+    [(_, retries)] = storage.pipe_files([(PATH, b"{}")], concurrency=1, retries=2)
+    assert retries == 1
+    assert storage.cat_file(PATH) == b"{}"
+
+
+@pytest.mark.parametrize("error", [FileNotFoundError, PermissionError])
+def test_pipe_files_raise_a_permanent_error_at_once(error):
+    storage = FlakyStorage([error(PATH)])
+    with pytest.raises(error):
+        storage.pipe_files([(PATH, b"{}")], concurrency=1, retries=2)
+    assert storage.attempts == 1
+
+
+@pytest.mark.parametrize("error", [FileNotFoundError, PermissionError])
+def test_s3_uploads_raise_a_permanent_error_at_once(error):
+    storage = S3Storage("pro-football-reference")
+    storage.fs = FlakyFileSystem([error(PATH)])
+
+    async def upload():
+        return await storage.upload_object(asyncio.Semaphore(1), PATH, b"{}", 2)
+
+    with pytest.raises(error):
+        asyncio.run(upload())
+    assert storage.fs.attempts == 1
+
+    storage.fs = FlakyFileSystem([ConnectionResetError("reset")])
+    assert asyncio.run(upload())[1] == 1
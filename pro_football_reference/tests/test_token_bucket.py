@@ -0,0 +1,34 @@
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.conf import build_component_list
+from scrapy.utils.test import get_crawler
+
+from pro_football_reference.middlewares import TokenBucketMiddleware
+from pro_football_reference.spiders.game_results import GameResultsSpider
+
+URL = "https://www.pro-football-reference.com/years/2023/games.htm"
+
+
+def test_pages_served_by_the_cache_take_no_token(settings):
+    middlewares = build_component_list(settings.getwithbase("DOWNLOADER_MIDDLEWARES"))
+    # process_request runs in this order, so a cache hit returns before the bucket
+    assert middlewares.index(
+        "scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware"
+    ) < middlewares.index("pro_football_reference.middlewares.TokenBucketMiddleware")
+
+
+def test_cached_responses_do_not_count_towards_a_recovery():
+    spider = GameResultsSpider()
+    middleware = TokenBucketMiddleware(
+        MemoryStatsCollector(get_crawler(GameResultsSpider)),
+        rate_per_minute=18,
+        recover_after=1,
+    )
+    middleware.back_off(0, spider)
+    request = Request(URL)
+    cached = HtmlResponse(URL, request=request, flags=["cached"])
+    middleware.process_response(request, cached, spider)
+    assert middleware.rate * 60 == 9
+    middleware.process_response(request, HtmlResponse(URL, request=request), spider)
+    assert middleware.rate * 60 == 10
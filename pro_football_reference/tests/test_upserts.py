@@ -0,0 +1,249 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from pro_football_reference.items import PlayerBioItem, RowRecord
+from pro_football_reference.pipelines import (
+    BoxscorePipeline,
+    GameResultsPipeline,
+    PlayersPipeline,
+    game_matchup,
+)
+from pro_football_reference.spiders.players import PlayersSpider
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from pro_football_reference.utils.pfr_storage import MemoryStorage
+from tests.conftest import parse_game_results, unplayed
+
+GAMES = GameResultsPipeline.config[0]
+SCORING = {"merge_key": ["boxscore_link"]}
+
+
+@pytest.fixture
+def pipeline(settings):
+    settings.set("RATINGS_ENABLED", False)
+    settings.set("PIPELINE_COMPACT_AFTER_DELTAS", 3)
+    return GameResultsPipeline.from_settings(settings)
+
+
+def games_frame(**changes) -> pl.DataFrame:
+    df = pl.DataFrame(
+        {
+            "year": [2023, 2023, 2023],
+            "week": ["1", "1", "2"],
+            "winning_team": ["Buffalo Bills", "Miami Dolphins", "Buffalo Bills"],
+            "losing_team": ["New York Jets", "Dallas Cowboys", "Miami Dolphins"],
+            "winner_points": ["24", "31", "17"],
+        }
+    )
+    df = df.with_columns(pl.Series(name, values) for name, values in changes.items())
+    return df.with_columns(game_matchup().alias("matchup"))
+
+
+def with_points(record, points) -> RowRecord:
+    values = dict(zip(record.columns, record.values), winner_points=points)
+    return RowRecord(record.item_class, record.columns, tuple(values.values()))
+
+
+def test_changed_rows_of_an_empty_state_are_every_row(pipeline):
+    df = games_frame()
+    assert_frame_equal(pipeline.changed_rows(GAMES, pl.DataFrame(), df), df)
+
+
+def test_changed_rows_skip_unchanged_keys(pipeline):
+    state = games_frame()
+    df = games_frame(winner_points=["24", "34", "17"])
+    changed = pipeline.changed_rows(GAMES, state, df)
+    assert changed["winning_team"].to_list() == ["Miami Dolphins"]
+    assert pipeline.changed_rows(GAMES, state, state).is_empty()
+
+
+def test_changed_rows_include_new_keys(pipeline):
+    state = games_frame()[:2]
+    changed = pipeline.changed_rows(GAMES, state, games_frame())
+    assert changed["week"].to_list() == ["2"]
+
+
+def test_changed_rows_return_the_whole_group_of_a_changed_key(pipeline):
+    state = pl.DataFrame({"boxscore_link": ["a", "a", "b"], "points": ["7", "3", "7"]})
+    df = pl.DataFrame({"boxscore_link": ["a", "a", "b"], "points": ["7", "6", "7"]})
+    changed = pipeline.changed_rows(SCORING, state, df)
+    assert changed["points"].to_list() == ["7", "6"]
+
+
+def test_merge_frames_take_each_key_from_the_newest_frame(pipeline):
+    old = games_frame()
+    new = games_frame(winner_points=["27", "31", "17"])[:1]
+    merged = pipeline.merge_frames(GAMES, [old, new]).sort("week", "winning_team")
+    assert merged["winner_points"].to_list() == ["27", "31", "17"]
+
+
+def test_merge_frames_replace_a_group_as_a_whole(pipeline):
+    old = pl.DataFrame({"boxscore_link": ["a", "a", "b"], "points": ["7", "3", "7"]})
+    new = pl.DataFrame({"boxscore_link": ["a"], "points": ["6"]})
+    merged = pipeline.merge_frames(SCORING, [old, new]).sort("boxscore_link")
+    assert merged["points"].to_list() == ["6", "7"]
+
+
+def test_games_of_a_week_written_in_separate_flushes_are_all_kept(pipeline):
+    spider = GameResultsSpider()
+    records = parse_game_results([2023], spider)
+    week = [r for r in records if dict(zip(r.columns, r.values))["week"] == "1"]
+    for half in (week[: len(week) // 2], week[len(week) // 2 :]):
+        for record in half:
+            pipeline.process_item(record, spider)
+        pipeline.write_datasets(spider)
+    assert pipeline.read_dataset("game_results").height == len(week) == 16
+
+
+def test_a_game_played_after_an_unplayed_crawl_replaces_its_row(pipeline):
+    spider = GameResultsSpider()
+    records = parse_game_results([2023], spider)
+    game = dict(zip(records[0].columns, records[0].values))
+    # the first crawl sees the game unplayed, its home team listed as the loser
+    for crawl in ([unplayed(records[0]), *records[1:]], records):
+        for record in crawl:
+            pipeline.process_item(record, spider)
+        pipeline.write_datasets(spider)
+
+    games = pipeline.read_dataset("game_results", [2023])
+    assert games.height == len(records)
+    rows = games.filter(
+        pl.col("winning_team").is_in([game["winning_team"], game["losing_team"]])
+        & pl.col("losing_team").is_in([game["winning_team"], game["losing_team"]])
+        & (pl.col("week").cast(pl.String) == game["week"])
+    )
+    assert rows.select("winning_team", "winner_points").rows() == [
+        (game["winning_team"], game["winner_points"])
+    ]
+
+
+def test_a_flush_reads_only_the_state_of_its_keys(pipeline):
+    spider = GameResultsSpider()
+    records = parse_game_results([2023], spider)
+    for record in records:
+        pipeline.process_item(record, spider)
+    pipeline.write_datasets(spider)
+    c = pipeline.config[0]
+    partition = {"year": 2023}
+    bases, deltas = pipeline.partition_objects(c, partition)
+    keys = pipeline.read_dataset("game_results", [2023]).select(c["merge_key"])[:2]
+    state = pipeline.read_partition(c, partition, bases, deltas, keys)
+    assert sorted(state.select(c["merge_key"]).rows()) == sorted(keys.rows())
+
+    # a flush of a changed game and an unchanged one writes only the change
+    pipeline.process_item(with_points(records[0], "50"), spider)
+    pipeline.process_item(records[1], spider)
+    pipeline.write_datasets(spider)
+    bases, deltas = pipeline.partition_objects(c, partition)
+    assert len(deltas) == 1
+    assert pipeline.read_object(deltas[0], partition).height == 1
+    assert pipeline.read_dataset("game_results", [2023]).height == len(records)
+
+
+@pytest.mark.parametrize("output_format", ["ndjson", "parquet"])
+def test_compaction_replaces_the_deltas_with_one_base(settings, output_format):
+    settings.set("RATINGS_ENABLED", False)
+    settings.set("PIPELINE_COMPACT_AFTER_DELTAS", 3)
+    settings.set("PIPELINE_OUTPUT_FORMAT", output_format)
+    pipeline = GameResultsPipeline.from_settings(settings)
+    spider = GameResultsSpider()
+    records = parse_game_results([1998], spider)
+
+    def objects():
+        return sorted(
+            key
+            for key in MemoryStorage.objects
+            if "/1998/" in key or "year=1998" in key
+        )
+
+    # a base, two deltas with a changed game each, then a compaction
+    for points in (None, "50", "51", "52"):
+        batch = records if points is None else [with_points(records[0], points)]
+        for record in batch:
+            pipeline.process_item(record, spider)
+        pipeline.write_datasets(spider)
+        if points == "51":
+            assert sum(".delta-" in key for key in objects()) == 2
+
+    assert [key.rsplit("/", 1)[-1].split(".")[1] for key in objects()] == [
+        "parquet" if output_format == "parquet" else "json"
+    ]
+    games = pipeline.read_dataset("game_results", [1998])
+    assert games.height == len(records)
+    first = dict(zip(records[0].columns, records[0].values))
+    row = games.filter(
+        (pl.col("winning_team") == first["winning_team"])
+        & (pl.col("losing_team") == first["losing_team"])
+        & (pl.col("week").cast(pl.String) == first["week"])
+    )
+    assert row["winner_points"].cast(pl.String).to_list() == ["52"]
+    manifest = pipeline.catalog.load("game_results")
+    assert all(entry["kind"] == "base" for entry in manifest["objects"].values())
+
+
+def test_a_worker_keeps_the_objects_written_before_manifests(settings):
+    settings.set("RATINGS_ENABLED", False)
+    spider = GameResultsSpider()
+    records = parse_game_results([2023], spider)
+    pipeline = GameResultsPipeline.from_settings(settings)
+    for record in records:
+        pipeline.process_item(record, spider)
+    pipeline.write_datasets(spider)
+    # data written before the catalog existed
+    for key in [key for key in MemoryStorage.objects if "_manifest" in key]:
+        del MemoryStorage.objects[key]
+
+    settings.set("PFR_WORKER_ID", "w1")
+    worker = GameResultsPipeline.from_settings(settings)
+    worker.process_item(with_points(records[0], "50"), spider)
+    worker.write_datasets(spider)
+
+    settings.set("PFR_WORKER_ID", None)
+    games = GameResultsPipeline.from_settings(settings).read_dataset("game_results")
+    assert games.height == len(records)
+    assert "50" in games["winner_points"].cast(pl.String).to_list()
+
+
+@pytest.mark.parametrize("output_format", ["ndjson", "parquet"])
+def test_a_player_seen_in_a_later_season_keeps_one_bio(settings, output_format):
+    settings.set("PIPELINE_OUTPUT_FORMAT", output_format)
+    pipeline = PlayersPipeline.from_settings(settings)
+    spider = PlayersSpider()
+    for year, weight in ((2022, "230lb"), (2023, "237lb")):
+        pipeline.process_item(
+            PlayerBioItem(
+                year=year,
+                player_link="/players/A/AlleJo02.htm",
+                player_name="Josh Allen",
+                weight=weight,
+            ),
+            spider,
+        )
+        pipeline.write_datasets(spider)
+
+    bios = pipeline.read_dataset("player_bio")
+    assert bios.select("year", "weight").rows() == [(2023, "237lb")]
+    assert pipeline.read_dataset("player_bio", [2022]).is_empty()
+
+
+def test_boxscore_rows_share_their_key(settings):
+    pipeline = BoxscorePipeline.from_settings(settings)
+    assert all(c["unique_key"] is False for c in pipeline.config)
+
+
+@pytest.mark.parametrize(
+    "compression, name", [(None, "game_results.json"), ("gzip", "game_results.json.gz")]
+)
+def test_objects_are_only_compressed_when_a_deployment_opts_in(
+    settings, compression, name
+):
+    settings.set("RATINGS_ENABLED", False)
+    settings.set("PIPELINE_COMPRESSION", compression)
+    pipeline = GameResultsPipeline.from_settings(settings)
+    spider = GameResultsSpider()
+    records = parse_game_results([2023], spider)
+    for record in records:
+        pipeline.process_item(record, spider)
+    pipeline.write_datasets(spider)
+    assert f"pro-football-reference/game_results/2023/{name}" in MemoryStorage.objects
+    assert pipeline.read_dataset("game_results").height == len(records)
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from scrapy import Request
+
+from pro_football_reference.pipelines import GameResultsPipeline, TeamsPagePipeline
+from pro_football_reference.spiders.game_results import GameResultsSpider
+from pro_football_reference.spiders.teams import TeamsPageSpider
+from pro_football_reference.utils.pfr_validation import DataValidationError
+from tests.conftest import feed, parse_game_results, parse_team_pages
+
+
+def read_report(settings, spider) -> dict:
+    with open(settings.get("VALIDATION_REPORT_PATH").format(spider=spider.name)) as f:
+        return json.load(f)
+
+
+def test_game_results_fixture_crawl_passes_validation(settings):
+    spider = GameResultsSpider()
+    feed(GameResultsPipeline.from_settings(settings), parse_game_results(), spider)
+    report = read_report(settings, spider)
+    assert report["errors"] == []
+    games = report["datasets"]["game_results"]
+    assert games["duplicate_keys"] == 0
+    assert "teams_twice_in_week" not in games
+
+
+def test_teams_page_fixture_crawl_passes_validation(settings):
+    spider = TeamsPageSpider()
+    records = parse_team_pages(spider=spider)
+    feed(TeamsPagePipeline.from_settings(settings), records, spider)
+    report = read_report(settings, spider)
+    assert report["errors"] == []
+    assert report["datasets"]["team_stats_and_rankings"]["teams"] == {
+        "1978": 1,
+        "1998": 1,
+        "2023": 1,
+    }
+
+
+def test_a_scheduled_team_page_without_rows_fails(settings):
+    spider = TeamsPageSpider()
+    records = parse_team_pages(spider=spider)
+    spider.schedule(
+        [
+            Request(
+                "https://www.pro-football-reference.com/teams/mia/2023.htm",
+                meta={"year": 2023, "team": "mia"},
+            )
+        ]
+    )
+    with pytest.raises(DataValidationError, match="2023: no rows for mia"):
+        feed(TeamsPagePipeline.from_settings(settings), records, spider)